@@ -0,0 +1,58 @@
+"""add daily category spend rollup
+
+Revision ID: 3b7f52c0d8a6
+Revises: e9a63d2921f1
+Create Date: 2026-10-16 11:02:17.553410
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7f52c0d8a6'
+down_revision = 'e9a63d2921f1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The table may already exist from Base.metadata.create_all on startup
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS daily_category_spend (
+            user_id UUID NOT NULL REFERENCES users (user_id),
+            day DATE NOT NULL,
+            category VARCHAR(50) NOT NULL,
+            total_amount BIGINT NOT NULL DEFAULT 0,
+            transaction_count INTEGER NOT NULL DEFAULT 0,
+            item_total DOUBLE PRECISION NOT NULL DEFAULT 0,
+            item_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, day, category)
+        )
+        """
+    )
+
+    # Existing transactions carry no date, so their history is booked on the
+    # migration day (UTC, like every timestamp in the schema)
+    op.execute(
+        """
+        INSERT INTO daily_category_spend
+            (user_id, day, category, total_amount, transaction_count, item_total, item_count)
+        SELECT t.user_id, timezone('utc', now())::date, t.category,
+               SUM(t.amount), COUNT(*),
+               COALESCE(SUM(i.item_total), 0), COALESCE(SUM(i.item_count), 0)
+        FROM transactions t
+        LEFT JOIN (
+            SELECT transaction_id, SUM(amount * quantity) AS item_total, COUNT(*) AS item_count
+            FROM transaction_items
+            GROUP BY transaction_id
+        ) i ON i.transaction_id = t.transaction_id
+        GROUP BY t.user_id, t.category
+        ON CONFLICT (user_id, day, category) DO NOTHING
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS daily_category_spend")
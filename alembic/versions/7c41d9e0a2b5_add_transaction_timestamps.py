@@ -0,0 +1,91 @@
+"""add transaction timestamps
+
+Revision ID: 7c41d9e0a2b5
+Revises: 3b7f52c0d8a6
+Create Date: 2026-10-16 12:40:05.871936
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c41d9e0a2b5'
+down_revision = '3b7f52c0d8a6'
+branch_labels = None
+depends_on = None
+
+# Rows updated per statement during the backfill, to keep locks and WAL bursts short
+BACKFILL_BATCH_SIZE = 10000
+
+
+def upgrade() -> None:
+    # Added nullable first so the ALTER is a catalog-only change on large tables
+    op.execute("ALTER TABLE transactions ADD COLUMN IF NOT EXISTS occurred_at TIMESTAMP WITHOUT TIME ZONE")
+    op.execute("ALTER TABLE transactions ADD COLUMN IF NOT EXISTS created_at TIMESTAMP WITHOUT TIME ZONE")
+
+    # Existing rows carry no date: both timestamps become the migration time
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        while True:
+            result = connection.execute(
+                sa.text(
+                    """
+                    UPDATE transactions
+                    SET occurred_at = COALESCE(occurred_at, created_at, timezone('utc', now())),
+                        created_at = COALESCE(created_at, timezone('utc', now()))
+                    WHERE transaction_id IN (
+                        SELECT transaction_id FROM transactions
+                        WHERE occurred_at IS NULL OR created_at IS NULL
+                        LIMIT :batch_size
+                    )
+                    """
+                ),
+                {"batch_size": BACKFILL_BATCH_SIZE}
+            )
+            if result.rowcount == 0:
+                break
+
+    op.alter_column('transactions', 'occurred_at', nullable=False)
+    op.alter_column('transactions', 'created_at', nullable=False)
+
+    # The rollup was backfilled on the previous migration's (local) date, which
+    # need not be the UTC day set above, and misses rows written in between.
+    # Rebuild it from occurred_at, blocking transaction writes meanwhile so no
+    # concurrent create is counted twice or lost.
+    op.execute("LOCK TABLE transactions IN SHARE MODE")
+    op.execute("DELETE FROM daily_category_spend")
+    op.execute(
+        """
+        INSERT INTO daily_category_spend
+            (user_id, day, category, total_amount, transaction_count, item_total, item_count)
+        SELECT t.user_id, t.occurred_at::date, t.category,
+               SUM(t.amount), COUNT(*),
+               COALESCE(SUM(i.item_total), 0), COALESCE(SUM(i.item_count), 0)
+        FROM transactions t
+        LEFT JOIN (
+            SELECT transaction_id, SUM(amount * quantity) AS item_total, COUNT(*) AS item_count
+            FROM transaction_items
+            GROUP BY transaction_id
+        ) i ON i.transaction_id = t.transaction_id
+        GROUP BY t.user_id, t.occurred_at::date, t.category
+        """
+    )
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_transactions_user_id_occurred_at "
+            "ON transactions (user_id, occurred_at, transaction_id)"
+        )
+        # Keyset pagination by transaction_id is replaced by (occurred_at, transaction_id)
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_transactions_user_id_transaction_id")
+
+
+def downgrade() -> None:
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_transactions_user_id_transaction_id "
+        "ON transactions (user_id, transaction_id)"
+    )
+    op.execute("DROP INDEX IF EXISTS ix_transactions_user_id_occurred_at")
+    op.drop_column('transactions', 'created_at')
+    op.drop_column('transactions', 'occurred_at')
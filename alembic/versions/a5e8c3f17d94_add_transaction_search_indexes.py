@@ -0,0 +1,63 @@
+"""add transaction search indexes
+
+Revision ID: a5e8c3f17d94
+Revises: 7c41d9e0a2b5
+Create Date: 2026-10-16 14:18:52.306417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a5e8c3f17d94'
+down_revision = '7c41d9e0a2b5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Stored generated columns are filled by this ALTER (a table rewrite) and
+    # kept current by PostgreSQL afterwards
+    op.execute(
+        "ALTER TABLE transactions ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('simple'::regconfig, coalesce(name, '') || ' ' || coalesce(category, ''))) STORED"
+    )
+    op.execute(
+        "ALTER TABLE transaction_items ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('simple'::regconfig, coalesce(name, ''))) STORED"
+    )
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_transactions_search_vector "
+            "ON transactions USING gin (search_vector)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_transactions_name_trgm "
+            "ON transactions USING gin (name gin_trgm_ops)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_transaction_items_transaction_id "
+            "ON transaction_items (transaction_id)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_transaction_items_search_vector "
+            "ON transaction_items USING gin (search_vector)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_transaction_items_name_trgm "
+            "ON transaction_items USING gin (name gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_transaction_items_name_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_transaction_items_search_vector")
+    op.execute("DROP INDEX IF EXISTS ix_transaction_items_transaction_id")
+    op.execute("DROP INDEX IF EXISTS ix_transactions_name_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_transactions_search_vector")
+    op.execute("ALTER TABLE transaction_items DROP COLUMN IF EXISTS search_vector")
+    op.execute("ALTER TABLE transactions DROP COLUMN IF EXISTS search_vector")
@@ -0,0 +1,32 @@
+"""add user collection versions
+
+Revision ID: c2d94f6b8e17
+Revises: a5e8c3f17d94
+Create Date: 2026-10-16 15:27:39.402118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2d94f6b8e17'
+down_revision = 'a5e8c3f17d94'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The table may already exist from Base.metadata.create_all on startup
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS user_collection_versions (
+            user_id UUID PRIMARY KEY REFERENCES users (user_id),
+            version BIGINT NOT NULL DEFAULT 0
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS user_collection_versions")
@@ -0,0 +1,29 @@
+"""add transactions user_id pagination index
+
+Revision ID: e9a63d2921f1
+Revises: dd85c29bf54e
+Create Date: 2026-10-16 09:12:40.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e9a63d2921f1'
+down_revision = 'dd85c29bf54e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The table itself is created by Base.metadata.create_all on startup,
+    # so the index may already exist on fresh databases.
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_transactions_user_id_transaction_id "
+        "ON transactions (user_id, transaction_id)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_transactions_user_id_transaction_id")
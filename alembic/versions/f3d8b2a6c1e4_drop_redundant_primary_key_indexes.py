@@ -0,0 +1,35 @@
+"""drop redundant primary key indexes
+
+Revision ID: f3d8b2a6c1e4
+Revises: c2d94f6b8e17
+Create Date: 2026-10-17 10:41:03.527914
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3d8b2a6c1e4'
+down_revision = 'c2d94f6b8e17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The primary keys are already unique btree indexes on the same column;
+    # the copies only cost another index insert per imported row
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_transactions_transaction_id")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_transaction_items_transaction_item_id")
+
+
+def downgrade() -> None:
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_transaction_items_transaction_item_id "
+        "ON transaction_items (transaction_item_id)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_transactions_transaction_id "
+        "ON transactions (transaction_id)"
+    )
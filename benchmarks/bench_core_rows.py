@@ -0,0 +1,120 @@
+"""
+ORM entities vs Core rows
+
+Loads a user's transactions through the AsyncSession the list endpoints
+use, once as ORM entities (select(Transaction)) and once as Core rows
+(transaction_rows_query()), and reports rows per second and the peak
+memory allocated per row while the result is held.
+
+    python -m benchmarks.bench_core_rows [--rows 10000 100000]
+
+Runs against the database in AZURE_POSTGRESQL_CONNECTIONSTRING (migrated
+to head). It creates a throwaway user with the largest row count, and
+deletes the user and its rows when it finishes.
+"""
+
+import argparse
+import asyncio
+import gc
+import statistics
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import select, delete
+from src.config.db import SessionLocal, AsyncSessionLocal, engine, async_engine
+from src.transactions.collection_version_model import UserCollectionVersion
+from src.transactions.spending_rollup_model import DailyCategorySpend
+from src.transactions.transaction_bulk import bulk_insert_transactions
+from src.transactions.transaction_model import Transaction
+from src.transactions.transaction_rows import transaction_rows_query
+from src.transactions.transaction_schema import TransactionCreate
+from src.users.user_model import User
+
+INSERT_CHUNK_SIZE = 10000
+
+def create_user(rows: int) -> uuid.UUID:
+    user_id = uuid.uuid4()
+    start = datetime(2024, 1, 1)
+    with SessionLocal() as db:
+        db.add(User(user_id=user_id, name="Benchmark", email=f"{user_id}@example.com", password="x"))
+        db.commit()
+        for offset in range(0, rows, INSERT_CHUNK_SIZE):
+            bulk_insert_transactions(db, user_id, [
+                TransactionCreate(
+                    name=f"Transaction {n}",
+                    amount=n,
+                    category="groceries",
+                    occurred_at=start + timedelta(minutes=n)
+                )
+                for n in range(offset, min(rows, offset + INSERT_CHUNK_SIZE))
+            ])
+            db.commit()
+    return user_id
+
+def drop_user(user_id: uuid.UUID) -> None:
+    with SessionLocal() as db:
+        for model in (Transaction, DailyCategorySpend, UserCollectionVersion, User):
+            db.execute(delete(model).where(model.user_id == user_id))
+        db.commit()
+
+async def load(query, rows: int, orm: bool, trace: bool = False) -> float:
+    """
+    Run query in a fresh session
+
+    Returns:
+        Seconds taken, or peak bytes allocated per row when trace is set
+        (tracing slows Python down, so memory and time are measured apart)
+    """
+    async with AsyncSessionLocal() as db:
+        gc.collect()
+        if trace:
+            tracemalloc.start()
+        start = time.perf_counter()
+        result = await db.execute(query.limit(rows))
+        loaded = result.scalars().all() if orm else result.all()
+        elapsed = time.perf_counter() - start
+        if trace:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        assert len(loaded) == rows
+        del loaded
+    return peak / rows if trace else elapsed
+
+async def bench(user_id: uuid.UUID, rows: int, rounds: int) -> None:
+    variants = [
+        ("ORM entities", select(Transaction), True),
+        ("Core rows", transaction_rows_query(), False),
+    ]
+    for name, query, orm in variants:
+        query = query.where(Transaction.user_id == user_id).order_by(
+            Transaction.occurred_at.desc(), Transaction.transaction_id.desc()
+        )
+        # Warm up the connection pool and statement caches
+        await load(query, min(rows, 100), orm)
+        seconds = statistics.median([await load(query, rows, orm) for _ in range(rounds)])
+        per_row = await load(query, rows, orm, trace=True)
+        print(f"{rows:>7} rows  {name:<13} {rows / seconds:9.0f} rows/s  {per_row:6.0f} B/row")
+
+async def run(user_id: uuid.UUID, row_counts: list, rounds: int) -> None:
+    try:
+        for rows in row_counts:
+            await bench(user_id, rows, rounds)
+    finally:
+        await async_engine.dispose()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    user_id = create_user(max(args.rows))
+    try:
+        asyncio.run(run(user_id, args.rows, args.rounds))
+    finally:
+        drop_user(user_id)
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Rate limiter overhead
+
+Measures the cost of Limiter.hit for each storage backend and of a
+limiter.limit-decorated endpoint against the bare endpoint, then the
+throughput of the mmap backend shared by several worker processes.
+
+    python -m benchmarks.bench_rate_limiter [--redis redis://localhost:6379/15]
+
+The Redis backend is only measured when --redis is given; its keys are
+cleared before and after the run, so point it at a scratch database.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+from starlette.requests import Request
+from src.config.rate_limit import Limiter, get_remote_address, parse_rate
+from src.config.rate_limit_storage import storage_from_uri
+
+# Generous enough that no hit is rejected during the run
+LIMIT = parse_rate("1000000000/second")
+
+def fake_request(n: int) -> Request:
+    return Request({
+        "type": "http",
+        "method": "POST",
+        "path": "/",
+        "headers": [],
+        "client": (f"10.0.{n // 256 % 256}.{n % 256}", 1234),
+    })
+
+async def time_per_call(call, iterations: int) -> float:
+    """Median microseconds per call over five rounds"""
+    rounds = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for n in range(iterations):
+            await call(n)
+        rounds.append((time.perf_counter() - start) / iterations * 1e6)
+    return statistics.median(rounds)
+
+async def bench_storage(uri: str, iterations: int, keys: int) -> None:
+    storage = storage_from_uri(uri)
+    await storage.reset()
+    limiter = Limiter(key_func=get_remote_address, storage=storage)
+
+    async def hit(n: int) -> None:
+        await limiter.hit("bench", str(n % keys), LIMIT)
+
+    async def endpoint(request: Request) -> dict:
+        return {"ok": True}
+
+    limited = limiter.limit(LIMIT.text)(endpoint)
+    requests = [fake_request(n) for n in range(keys)]
+
+    async def bare(n: int) -> None:
+        await endpoint(request=requests[n % keys])
+
+    async def decorated(n: int) -> None:
+        await limited(request=requests[n % keys])
+
+    hit_us = await time_per_call(hit, iterations)
+    bare_us = await time_per_call(bare, iterations)
+    decorated_us = await time_per_call(decorated, iterations)
+    print(f"{uri.split(':')[0]:<8} hit {hit_us:7.2f} us   endpoint {bare_us:5.2f} -> {decorated_us:7.2f} us")
+    await storage.reset()
+
+def _mmap_worker(uri: str, iterations: int, keys: int, start, results) -> None:
+    limiter = Limiter(key_func=get_remote_address, storage=storage_from_uri(uri))
+
+    async def run() -> float:
+        begin = time.perf_counter()
+        for n in range(iterations):
+            await limiter.hit("bench", f"{os.getpid()}:{n % keys}", LIMIT)
+        return time.perf_counter() - begin
+
+    start.wait()
+    results.put(asyncio.run(run()))
+
+def bench_mmap_workers(path: str, workers: int, iterations: int, keys: int) -> None:
+    uri = f"mmap://{path}"
+    context = multiprocessing.get_context("spawn")
+    start = context.Event()
+    results = context.Queue()
+    processes = [
+        context.Process(target=_mmap_worker, args=(uri, iterations, keys, start, results))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    start.set()
+    elapsed = max(results.get() for _ in processes)
+    for process in processes:
+        process.join()
+    print(f"mmap, {workers} worker processes: {workers * iterations / elapsed:10.0f} hits/s")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--keys", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--redis", help="Redis URI to also measure the Redis backend")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "ratelimit")
+        uris = ["memory://", f"mmap://{path}"]
+        if args.redis:
+            uris.append(args.redis)
+        for uri in uris:
+            # Redis round trips are far slower; keep its run short
+            iterations = args.iterations if not uri.startswith("redis") else args.iterations // 20
+            asyncio.run(bench_storage(uri, iterations, args.keys))
+        bench_mmap_workers(path, args.workers, args.iterations, args.keys)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+List response serialization
+
+Renders the same transactions (with items and images) to JSON bytes four
+ways and reports microseconds per transaction:
+- uncached: a TypeAdapter built for every response, validate, dump, json
+- cached: serialize_rows with FAST_JSON_RESPONSES off (type_adapter), json
+- fast path: row_serializer + dumps (orjson when installed)
+- fast path + json: row_serializer + the stdlib json module
+
+    python -m benchmarks.bench_serialization [--transactions 1000] [--items 3]
+
+Rows are attribute objects, like the ORM objects and Core rows the routes
+serialize, so no database is needed. Every variant must produce the same
+JSON document.
+"""
+
+import argparse
+import json
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import List
+from pydantic import TypeAdapter
+from src.config import serialization
+from src.config.serialization import dumps, row_serializer, _default
+from src.transactions.transaction_schema import TransactionResponse
+
+def make_transactions(count: int, items: int, images: int) -> list:
+    user_id = uuid.uuid4()
+    start = datetime(2024, 1, 1)
+    transactions = []
+    for n in range(count):
+        transaction_id = uuid.uuid4()
+        transactions.append(SimpleNamespace(
+            transaction_id=transaction_id,
+            name=f"Transaction {n}",
+            amount=n,
+            category="groceries",
+            user_id=user_id,
+            occurred_at=start + timedelta(minutes=n),
+            created_at=start + timedelta(minutes=n, seconds=5),
+            items=[
+                SimpleNamespace(
+                    transaction_item_id=uuid.uuid4(),
+                    name=f"Item {i}",
+                    amount=1.25 * (i + 1),
+                    quantity=i + 1,
+                    transaction_id=transaction_id
+                )
+                for i in range(items)
+            ],
+            images=[
+                SimpleNamespace(
+                    id=uuid.uuid4(),
+                    image_id=f"img{n}-{i}",
+                    url=f"https://i.ibb.co/{n}/{i}.png",
+                    transaction_id=transaction_id
+                )
+                for i in range(images)
+            ],
+        ))
+    return transactions
+
+def stdlib_json(content) -> bytes:
+    """What starlette's JSONResponse renders"""
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":"), default=_default).encode("utf-8")
+
+def uncached(rows: list) -> bytes:
+    adapter = TypeAdapter(List[TransactionResponse])
+    return stdlib_json(adapter.dump_python(adapter.validate_python(rows, from_attributes=True), mode="json"))
+
+def cached(rows: list) -> bytes:
+    return stdlib_json(serialization.serialize_rows(TransactionResponse, rows))
+
+def fast_path(rows: list) -> bytes:
+    serialize = row_serializer(TransactionResponse)
+    return dumps([serialize(row) for row in rows])
+
+def fast_path_stdlib_json(rows: list) -> bytes:
+    serialize = row_serializer(TransactionResponse)
+    return stdlib_json([serialize(row) for row in rows])
+
+def time_per_row(render, rows: list, rounds: int) -> float:
+    """Median microseconds per transaction"""
+    render(rows)
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        render(rows)
+        timings.append((time.perf_counter() - start) / len(rows) * 1e6)
+    return statistics.median(timings)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transactions", type=int, default=1000)
+    parser.add_argument("--items", type=int, default=3)
+    parser.add_argument("--images", type=int, default=1)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    # serialize_rows takes the TypeAdapter path; the fast path is called directly
+    serialization.FAST_JSON_RESPONSES = False
+    rows = make_transactions(args.transactions, args.items, args.images)
+    variants = [
+        ("uncached TypeAdapter", uncached),
+        ("cached TypeAdapter", cached),
+        ("fast path", fast_path),
+        ("fast path + stdlib json", fast_path_stdlib_json),
+    ]
+
+    expected = json.loads(uncached(rows))
+    for name, render in variants:
+        assert json.loads(render(rows)) == expected, f"{name} renders a different document"
+
+    print(f"{args.transactions} transactions, {args.items} items and {args.images} images each"
+          f" (orjson {'installed' if serialization.orjson else 'missing'})")
+    for name, render in variants:
+        print(f"{name:<24} {time_per_row(render, rows, args.rounds):8.1f} us per transaction")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Transaction create latency
+
+Times POST /api/v1/transactions/ with 0, 5 and 50 items and reports p50
+and p99. Requests go through the app in-process (TestClient, lifespan
+running), authenticated as a throwaway user, so the numbers cover
+parsing, the database round trips and serialization but not the network.
+
+    python -m benchmarks.bench_transaction_create [--samples 350] [--items 0 5 50]
+
+Runs against the database in AZURE_POSTGRESQL_CONNECTIONSTRING (migrated
+to head). The user and its transactions are deleted when it finishes.
+"""
+
+import argparse
+import json
+import statistics
+import time
+import uuid
+from sqlalchemy import select, delete
+from src.config.db import SessionLocal
+from src.transaction_items.transaction_items_model import TransactionItem
+from src.transactions.collection_version_model import UserCollectionVersion
+from src.transactions.spending_rollup_model import DailyCategorySpend
+from src.transactions.transaction_model import Transaction
+from src.users.user_model import User
+
+def create_user() -> uuid.UUID:
+    user_id = uuid.uuid4()
+    with SessionLocal() as db:
+        db.add(User(user_id=user_id, name="Benchmark", email=f"{user_id}@example.com", password="x"))
+        db.commit()
+    return user_id
+
+def drop_user(user_id: uuid.UUID) -> None:
+    with SessionLocal() as db:
+        owned = select(Transaction.transaction_id).where(Transaction.user_id == user_id)
+        db.execute(delete(TransactionItem).where(TransactionItem.transaction_id.in_(owned)))
+        for model in (Transaction, DailyCategorySpend, UserCollectionVersion, User):
+            db.execute(delete(model).where(model.user_id == user_id))
+        db.commit()
+
+def percentile(samples: list, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def bench(client, items: int, samples: int) -> None:
+    form = {
+        "name": "Coffee",
+        "amount": "4",
+        "category": "food",
+        "items": json.dumps([{"name": "Cup", "amount": 4.0, "quantity": 1}] * items),
+    }
+    # Warm up connections, statement caches and the rollup row
+    for _ in range(10):
+        client.post("/api/v1/transactions/", data=form)
+
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        response = client.post("/api/v1/transactions/", data=form)
+        timings.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 201, response.text
+    print(f"{items:>4} items  p50 {statistics.median(timings):6.1f} ms  p99 {percentile(timings, 0.99):6.1f} ms")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=350)
+    parser.add_argument("--items", type=int, nargs="+", default=[0, 5, 50])
+    args = parser.parse_args()
+
+    from fastapi.testclient import TestClient
+    import server
+    from src.transactions.transaction_routes import get_current_user
+
+    user_id = create_user()
+    server.app.dependency_overrides[get_current_user] = lambda: user_id
+    try:
+        with TestClient(server.app) as client:
+            for items in args.items:
+                bench(client, items, args.samples)
+    finally:
+        server.app.dependency_overrides.clear()
+        drop_user(user_id)
+
+if __name__ == "__main__":
+    main()
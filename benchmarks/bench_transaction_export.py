@@ -0,0 +1,186 @@
+"""
+Export throughput
+
+Streams GET /api/v1/transactions/export through the ASGI app in-process
+(no network, no test client buffering) as CSV and NDJSON, with and
+without gzip, and reports rows per second, bytes sent and the peak
+resident memory of the process while the export runs. The ledger is
+flattened to one row per item, and every generated transaction has one
+item, so --rows is both the transaction and the exported row count.
+
+    python -m benchmarks.bench_transaction_export [--rows 1000000]
+
+Also reports how fast the export query alone is read through the same
+server-side cursor without encoding anything, which bounds what the
+endpoint can reach.
+
+Runs against the database in AZURE_POSTGRESQL_CONNECTIONSTRING (migrated
+to head). The user and its rows are deleted when it finishes.
+"""
+
+import argparse
+import asyncio
+import os
+import threading
+import time
+import uuid
+import zlib
+from datetime import datetime, timedelta
+from sqlalchemy import select, delete
+from src.config.db import SessionLocal, AsyncSessionLocal, async_engine
+from src.transaction_items.transaction_items_model import TransactionItem
+from src.transactions.collection_version_model import UserCollectionVersion
+from src.transactions.spending_rollup_model import DailyCategorySpend
+from src.transactions.transaction_bulk import bulk_insert_transactions
+from src.transactions.transaction_export import EXPORT_BATCH_SIZE, _export_query
+from src.transactions.transaction_model import Transaction
+from src.transactions.transaction_schema import TransactionCreate
+from src.users.user_model import User
+
+INSERT_CHUNK_SIZE = 10000
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+def create_user(rows: int) -> uuid.UUID:
+    user_id = uuid.uuid4()
+    start = datetime(2024, 1, 1)
+    with SessionLocal() as db:
+        db.add(User(user_id=user_id, name="Benchmark", email=f"{user_id}@example.com", password="x"))
+        db.commit()
+        for offset in range(0, rows, INSERT_CHUNK_SIZE):
+            bulk_insert_transactions(db, user_id, [
+                TransactionCreate(
+                    name=f"Transaction {n}",
+                    amount=n % 1000,
+                    category="groceries",
+                    occurred_at=start + timedelta(seconds=n),
+                    items=[{"name": "Milk", "amount": 1.5, "quantity": 2}]
+                )
+                for n in range(offset, min(rows, offset + INSERT_CHUNK_SIZE))
+            ])
+            db.commit()
+    return user_id
+
+def drop_user(user_id: uuid.UUID) -> None:
+    with SessionLocal() as db:
+        owned = select(Transaction.transaction_id).where(Transaction.user_id == user_id)
+        db.execute(delete(TransactionItem).where(TransactionItem.transaction_id.in_(owned)))
+        for model in (Transaction, DailyCategorySpend, UserCollectionVersion, User):
+            db.execute(delete(model).where(model.user_id == user_id))
+        db.commit()
+
+def rss_bytes() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * PAGE_SIZE
+
+class PeakRSS:
+    """Samples the resident set size in a background thread"""
+
+    def __enter__(self):
+        self.start = self.peak = rss_bytes()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def _sample(self) -> None:
+        while not self._stop.wait(0.01):
+            self.peak = max(self.peak, rss_bytes())
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, rss_bytes())
+
+async def export(app, export_format: str, gzip: bool) -> dict:
+    """
+    Run one export request against the ASGI app and consume the body as it is sent
+
+    TestClient collects the whole response before returning it, which would
+    make the benchmark's own buffer the biggest thing in memory.
+    """
+    query = f"format={export_format}&gzip={str(gzip).lower()}".encode()
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/api/v1/transactions/export", "raw_path": b"/api/v1/transactions/export",
+        "query_string": query, "root_path": "", "headers": [(b"host", b"benchmark")],
+        "client": ("127.0.0.1", 50000), "server": ("benchmark", 80),
+    }
+    decompressor = zlib.decompressobj(31) if gzip else None
+    stats = {"status": None, "sent": 0, "lines": 0}
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # The client stays connected until the response is complete
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            stats["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            body = message.get("body", b"")
+            stats["sent"] += len(body)
+            stats["lines"] += (decompressor.decompress(body) if decompressor else body).count(b"\n")
+
+    await app(scope, receive, send)
+    await async_engine.dispose()
+    return stats
+
+def bench_endpoint(app, export_format: str, gzip: bool, rows: int) -> None:
+    with PeakRSS() as rss:
+        start = time.perf_counter()
+        stats = asyncio.run(export(app, export_format, gzip))
+        elapsed = time.perf_counter() - start
+
+    assert stats["status"] == 200, stats
+    exported = stats["lines"] - (1 if export_format == "csv" else 0)
+    assert exported == rows, (exported, rows)
+    label = f"{export_format}{' +gzip' if gzip else ''}"
+    print(
+        f"endpoint {label:<12} {rows / elapsed:9.0f} rows/s  {stats['sent'] / elapsed / 1e6:6.1f} MB/s sent  "
+        f"peak RSS {rss.peak / 2**20:6.0f} MiB (+{(rss.peak - rss.start) / 2**20:.0f})"
+    )
+
+async def read_query(user_id: uuid.UUID, rows: int) -> None:
+    """Read the export query through the server-side cursor and drop the rows"""
+    read = 0
+    with PeakRSS() as rss:
+        start = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(_export_query(user_id, None, None).execution_options(yield_per=EXPORT_BATCH_SIZE))
+            async for partition in result.partitions():
+                read += len(partition)
+        elapsed = time.perf_counter() - start
+    await async_engine.dispose()
+
+    assert read == rows, (read, rows)
+    print(
+        f"query only            {rows / elapsed:9.0f} rows/s                    "
+        f"peak RSS {rss.peak / 2**20:6.0f} MiB (+{(rss.peak - rss.start) / 2**20:.0f})"
+    )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--formats", nargs="+", default=["csv", "ndjson"])
+    args = parser.parse_args()
+
+    import server
+    from src.transactions.transaction_routes import get_current_user
+
+    user_id = create_user(args.rows)
+    server.app.dependency_overrides[get_current_user] = lambda: user_id
+    try:
+        asyncio.run(read_query(user_id, args.rows))
+        for export_format in args.formats:
+            for gzip in (False, True):
+                bench_endpoint(server.app, export_format, gzip, args.rows)
+    finally:
+        server.app.dependency_overrides.clear()
+        drop_user(user_id)
+
+if __name__ == "__main__":
+    main()
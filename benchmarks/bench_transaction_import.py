@@ -0,0 +1,126 @@
+"""
+Bulk import throughput
+
+Posts generated CSV and NDJSON bodies (one item per transaction) to
+POST /api/v1/transactions/import in-process and reports transactions and
+rows (transactions + items) per second. The body is sent in 64 KiB chunks
+so it is parsed while it streams in, as from a real client.
+
+    python -m benchmarks.bench_transaction_import [--transactions 50000]
+
+Also reports how long the database alone takes to COPY the same rows,
+which bounds what the endpoint can reach on the current schema (the
+search_vector columns, their GIN indexes and the item foreign key are
+maintained row by row).
+
+Runs against the database in AZURE_POSTGRESQL_CONNECTIONSTRING (migrated
+to head). The user and its rows are deleted when it finishes.
+"""
+
+import argparse
+import io
+import json
+import time
+import uuid
+from datetime import datetime
+from sqlalchemy import select, delete
+from src.config.db import SessionLocal, engine
+from src.transaction_items.transaction_items_model import TransactionItem
+from src.transactions.collection_version_model import UserCollectionVersion
+from src.transactions.spending_rollup_model import DailyCategorySpend
+from src.transactions.transaction_bulk import TRANSACTION_COPY_COLUMNS, ITEM_COPY_COLUMNS, _copy_line
+from src.transactions.transaction_model import Transaction
+from src.users.user_model import User
+
+CHUNK_BYTES = 64 * 1024
+
+def create_user() -> uuid.UUID:
+    user_id = uuid.uuid4()
+    with SessionLocal() as db:
+        db.add(User(user_id=user_id, name="Benchmark", email=f"{user_id}@example.com", password="x"))
+        db.commit()
+    return user_id
+
+def drop_user(user_id: uuid.UUID) -> None:
+    with SessionLocal() as db:
+        owned = select(Transaction.transaction_id).where(Transaction.user_id == user_id)
+        db.execute(delete(TransactionItem).where(TransactionItem.transaction_id.in_(owned)))
+        for model in (Transaction, DailyCategorySpend, UserCollectionVersion, User):
+            db.execute(delete(model).where(model.user_id == user_id))
+        db.commit()
+
+def make_body(import_format: str, count: int) -> bytes:
+    if import_format == "ndjson":
+        return "".join(
+            json.dumps({
+                "name": f"Transaction {n}",
+                "amount": n % 1000,
+                "category": "groceries",
+                "occurred_at": "2024-05-01T10:00:00Z",
+                "items": [{"name": "Milk", "amount": 1.5, "quantity": 2}]
+            }) + "\n"
+            for n in range(count)
+        ).encode()
+    rows = [f"Transaction {n},{n % 1000},groceries,2024-05-01T10:00:00Z,Milk,1.5,2,{n}\n" for n in range(count)]
+    header = "name,amount,category,occurred_at,item_name,item_amount,item_quantity,transaction_id\n"
+    return (header + "".join(rows)).encode()
+
+def chunks(body: bytes):
+    for offset in range(0, len(body), CHUNK_BYTES):
+        yield body[offset:offset + CHUNK_BYTES]
+
+def bench_endpoint(client, import_format: str, count: int) -> None:
+    body = make_body(import_format, count)
+    start = time.perf_counter()
+    response = client.post("/api/v1/transactions/import", params={"format": import_format}, content=chunks(body))
+    elapsed = time.perf_counter() - start
+    report = response.json()
+    assert response.status_code == 200 and report["imported"] == count, report
+    rows = report["imported"] + report["items"]
+    print(f"endpoint {import_format:<7} {count / elapsed:9.0f} transactions/s  {rows / elapsed:9.0f} rows/s")
+
+def bench_copy_only(user_id: uuid.UUID, count: int) -> None:
+    """Time the two COPYs alone, with pre-encoded rows, and roll them back"""
+    now = datetime.utcnow()
+    transaction_ids = [uuid.uuid4() for _ in range(count)]
+    transactions = "".join(
+        _copy_line((transaction_id, f"Transaction {n}", n % 1000, "groceries", user_id, now, now))
+        for n, transaction_id in enumerate(transaction_ids)
+    )
+    items = "".join(_copy_line((uuid.uuid4(), "Milk", 1.5, 2, transaction_id)) for transaction_id in transaction_ids)
+
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        start = time.perf_counter()
+        cursor.copy_expert(f"COPY transactions ({', '.join(TRANSACTION_COPY_COLUMNS)}) FROM STDIN", io.StringIO(transactions))
+        cursor.copy_expert(f"COPY transaction_items ({', '.join(ITEM_COPY_COLUMNS)}) FROM STDIN", io.StringIO(items))
+        elapsed = time.perf_counter() - start
+        connection.rollback()
+    finally:
+        connection.close()
+    print(f"COPY only        {count / elapsed:9.0f} transactions/s  {2 * count / elapsed:9.0f} rows/s")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transactions", type=int, default=50000)
+    parser.add_argument("--formats", nargs="+", default=["csv", "ndjson"])
+    args = parser.parse_args()
+
+    from fastapi.testclient import TestClient
+    import server
+    from src.transactions.transaction_routes import get_current_user
+
+    user_id = create_user()
+    server.app.dependency_overrides[get_current_user] = lambda: user_id
+    try:
+        with TestClient(server.app) as client:
+            for import_format in args.formats:
+                bench_endpoint(client, import_format, args.transactions)
+        bench_copy_only(user_id, args.transactions)
+    finally:
+        server.app.dependency_overrides.clear()
+        drop_user(user_id)
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,14 @@ from fastapi import FastAPI, Depends, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
-from slowapi.errors import RateLimitExceeded
-from sqlalchemy.orm import Session
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from contextlib import asynccontextmanager
 import uvicorn
 import os
 
 # Import database configuration
-from src.config.db import get_db, Base, engine
+from src.config.db import get_async_db, Base, engine, async_engine
 
 # Import routers
 from src.users.user_routes import router as user_router
@@ -16,16 +17,56 @@ from src.transactions.transaction_routes import router as transaction_router
 from src.transaction_items.transaction_items_routes import router as transaction_items_router
 from src.images.image_route import router as image_router
 
+# Import shared HTTP client for image uploads
+from src.images.imgbb_service import start_imgbb_client, close_imgbb_client
+
+# Import token revocation cache
+from src.users.services.token_revocation_cache import start_revocation_cache, stop_revocation_cache
+
+# Import password hashing pool
+from src.users.core.user_password_hash import start_password_hasher, stop_password_hasher, get_password_hash_stats
+
+# Import expired token sweeper
+from src.users.services.token_blacklist_sweeper import start_blacklist_sweeper, stop_blacklist_sweeper
+
+# Import response cache
+from src.config.cache import response_cache
+
+# Import fast JSON rendering
+from src.config.serialization import FastJSONResponse, FAST_JSON_RESPONSES
+
+# Import upload body size limit and per-user upload quotas
+from src.images.upload_stream import UploadSizeLimitMiddleware, MAX_IMPORT_REQUEST_BYTES, IMPORT_PATHS
+from src.images.upload_quota import UploadQuotaMiddleware
+
 # Import error handler
 from src.users.core.error_handler import format_error_response, format_validation_error_response
 
 # Import rate limiting
-from src.config.rate_limit import limiter, rate_limit_exceeded_handler
+from src.config.rate_limit import limiter, rate_limit_exceeded_handler, RateLimitExceeded
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="Expense Tracker API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start up and tear down shared resources"""
+    await start_password_hasher()
+    await start_imgbb_client()
+    await start_revocation_cache()
+    start_blacklist_sweeper()
+    yield
+    await stop_blacklist_sweeper()
+    await stop_revocation_cache()
+    await close_imgbb_client()
+    stop_password_hasher()
+    await async_engine.dispose()
+
+app = FastAPI(
+    title="Expense Tracker API",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse if FAST_JSON_RESPONSES else JSONResponse
+)
 
 # Add rate limiter to app state
 app.state.limiter = limiter
@@ -57,6 +98,14 @@ app.include_router(transaction_router)
 app.include_router(transaction_items_router)
 app.include_router(image_router)
 
+# Charge per-user upload quotas before any upload body is read
+app.add_middleware(UploadQuotaMiddleware)
+
+# Reject oversized upload bodies while they stream in; added last so it runs
+# first and an over-limit Content-Length is refused before any quota is charged
+app.add_middleware(UploadSizeLimitMiddleware)
+app.add_middleware(UploadSizeLimitMiddleware, max_body_bytes=MAX_IMPORT_REQUEST_BYTES, paths=IMPORT_PATHS)
+
 # CORS middleware configuration
 app.add_middleware(
     CORSMiddleware,
@@ -64,6 +113,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Retry-After", "ETag", "Idempotent-Replayed"],
 )
 
 @app.get("/")
@@ -71,11 +121,11 @@ async def root():
     return {"message": "Welcome to Expense Tracker API"}
 
 @app.get("/health")
-async def health_check(db: Session = Depends(get_db)):
+async def health_check(db: AsyncSession = Depends(get_async_db)):
     """Check if the database connection is working"""
     try:
         # Try to execute a simple query
-        db.execute("SELECT 1")
+        await db.execute(text("SELECT 1"))
         return {
             "status": "healthy",
             "database": "connected"
@@ -86,6 +136,16 @@ async def health_check(db: Session = Depends(get_db)):
             detail=f"Database connection failed: {str(e)}"
         )
 
+@app.get("/health/password-hashing")
+async def password_hashing_stats():
+    """Queue depth and throughput of the password hashing pool"""
+    return get_password_hash_stats()
+
+@app.get("/health/cache")
+async def cache_stats():
+    """Hit, miss and eviction counters of the response cache"""
+    return response_cache.stats()
+
 if __name__ == "__main__":
     uvicorn.run(
         "server:app",
@@ -0,0 +1,441 @@
+"""
+Response Cache
+
+Read-through cache for list endpoints, chosen with RESPONSE_CACHE_URI:
+- memory://?max_entries=10000   default, per worker LRU with TTL and a size bound
+- redis://host:port/db          shared by all workers and hosts
+
+Entries live in scopes (e.g. "items:<transaction_id>"). Write controllers
+invalidate whole scopes after they commit, so a scope never serves data
+older than the last write to it. With the per-worker memory backend the
+other workers' entries stay until they expire, so read paths also key
+their entries on the owner's collection version (see collection_version.py),
+which every write bumps in the database.
+Values must be JSON-serializable (UUIDs and datetimes are encoded as strings).
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+from urllib.parse import urlparse, parse_qs
+from dotenv import load_dotenv
+from src.config.serialization import dumps
+
+load_dotenv()
+
+RESPONSE_CACHE_URI = os.getenv("RESPONSE_CACHE_URI", "memory://")
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", 60))
+
+class CacheBackend(ABC):
+    """Base class for response cache backends"""
+
+    def __init__(self, ttl: float = RESPONSE_CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0
+        }
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: Set[asyncio.Future] = set()
+
+    async def get(self, scope: str, key: Hashable) -> Optional[Any]:
+        """
+        Look up a cached value
+
+        Args:
+            scope: Invalidation scope of the entry
+            key: Entry key within the scope
+
+        Returns:
+            The cached value, or None on a miss
+        """
+        value, _ = await self._lookup(scope, key)
+        return value
+
+    async def set(self, scope: str, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store a value
+
+        Args:
+            scope: Invalidation scope of the entry
+            key: Entry key within the scope
+            value: JSON-serializable value
+            ttl: Seconds until the entry expires (defaults to the backend TTL)
+        """
+        await self._store(scope, key, value, None, ttl)
+
+    @abstractmethod
+    async def add(self, scope: str, key: Hashable, value: Any, ttl: Optional[float] = None, pin: bool = False) -> bool:
+        """
+        Store a value only if the key holds none
+
+        Args:
+            scope: Invalidation scope of the entry
+            key: Entry key within the scope
+            value: JSON-serializable value
+            ttl: Seconds until the entry expires (defaults to the backend TTL)
+            pin: Never evict the entry to make room for others; it stays until
+                it expires or is replaced, deleted or invalidated
+
+        Returns:
+            True if the value was stored, False if the key already had one
+        """
+
+    @abstractmethod
+    async def delete(self, scope: str, key: Hashable) -> None:
+        """Drop one entry"""
+
+    async def get_or_load(
+        self,
+        scope: str,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None
+    ) -> Any:
+        """
+        Return a cached value, loading and storing it on a miss
+
+        A value loaded while its scope was invalidated is returned but not
+        stored, so a slow read can never put pre-write data back in the cache.
+
+        Args:
+            scope: Invalidation scope of the entry
+            key: Entry key within the scope
+            loader: Coroutine function producing the JSON-serializable value
+            ttl: Seconds until the entry expires (defaults to the backend TTL)
+        """
+        value, token = await self._lookup(scope, key)
+        if value is not None:
+            return value
+        value = await loader()
+        await self._store(scope, key, value, token, ttl)
+        return value
+
+    @abstractmethod
+    async def _lookup(self, scope: str, key: Hashable) -> Tuple[Optional[Any], Any]:
+        """Return (value or None, token identifying the scope's state at lookup time)"""
+
+    @abstractmethod
+    async def _store(self, scope: str, key: Hashable, value: Any, token: Any, ttl: Optional[float]) -> None:
+        """Store a value, unless the scope was invalidated since token was taken (None: always store)"""
+
+    @abstractmethod
+    async def invalidate(self, *scopes: str) -> None:
+        """Drop every entry in the given scopes"""
+
+    def invalidate_nowait(self, *scopes: str) -> None:
+        """
+        Invalidate scopes from synchronous code
+
+        Runs on the event loop the cache is used from, so its connections
+        stay bound to that loop. Before the cache has been used from a loop
+        (e.g. a write in a worker thread before any read), it invalidates
+        synchronously instead.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if loop is not None:
+            future = loop.create_task(self.invalidate(*scopes))
+        elif self._loop is not None and not self._loop.is_closed():
+            future = asyncio.run_coroutine_threadsafe(self.invalidate(*scopes), self._loop)
+        else:
+            self._invalidate_blocking(scopes)
+            return
+
+        # Keep a reference until done so the task is not garbage collected
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+
+    @abstractmethod
+    def _invalidate_blocking(self, scopes) -> None:
+        """Invalidate scopes without an event loop (blocks the calling thread)"""
+
+    def _remember_loop(self) -> None:
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+
+    def stats(self) -> dict:
+        """Hit, miss and eviction counters"""
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            "backend": type(self).__name__,
+            **self._stats,
+            "hit_ratio": round(self._stats["hits"] / lookups, 4) if lookups else None
+        }
+
+class MemoryCache(CacheBackend):
+    """
+    In-process LRU cache with per-entry TTL; each worker keeps its own entries
+
+    Pinned entries are skipped by LRU eviction, so the cache can hold more
+    than max_entries while many are pinned.
+    """
+
+    def __init__(self, max_entries: int = 10_000, ttl: float = RESPONSE_CACHE_TTL_SECONDS):
+        super().__init__(ttl)
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[float, Any]]" = OrderedDict()
+        self._scopes: Dict[str, Set[Hashable]] = {}
+        self._pinned: Set[Tuple[str, Hashable]] = set()
+        # Sequence number of the last invalidation of each scope; loads that
+        # started before it are not stored. Bounded by resetting the floor.
+        self._sequence = 0
+        self._floor = 0
+        self._invalidated_at: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    async def _lookup(self, scope: str, key: Hashable) -> Tuple[Optional[Any], Any]:
+        with self._lock:
+            entry = self._entries.get((scope, key))
+            if entry is not None and entry[0] <= time.monotonic():
+                self._remove(scope, key)
+                self._stats["expirations"] += 1
+                entry = None
+
+            if entry is None:
+                self._stats["misses"] += 1
+                return None, self._sequence
+
+            self._entries.move_to_end((scope, key))
+            self._stats["hits"] += 1
+            return entry[1], self._sequence
+
+    async def _store(self, scope: str, key: Hashable, value: Any, token: Any, ttl: Optional[float]) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if token is not None and (token < self._floor or self._invalidated_at.get(scope, 0) > token):
+                return
+            self._put(scope, key, expires_at, value)
+
+    def _put(self, scope: str, key: Hashable, expires_at: float, value: Any, pin: bool = False) -> None:
+        """Store an entry and evict the least recently used ones over the bound (lock held)"""
+        self._entries[(scope, key)] = (expires_at, value)
+        self._entries.move_to_end((scope, key))
+        self._scopes.setdefault(scope, set()).add(key)
+        if pin:
+            self._pinned.add((scope, key))
+        else:
+            self._pinned.discard((scope, key))
+        self._stats["sets"] += 1
+
+        while len(self._entries) > self.max_entries:
+            oldest = next((entry for entry in self._entries if entry not in self._pinned), None)
+            if oldest is None:
+                break
+            del self._entries[oldest]
+            self._forget(*oldest)
+            self._stats["evictions"] += 1
+
+    async def add(self, scope: str, key: Hashable, value: Any, ttl: Optional[float] = None, pin: bool = False) -> bool:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            entry = self._entries.get((scope, key))
+            if entry is not None and entry[0] > time.monotonic():
+                return False
+            self._put(scope, key, expires_at, value, pin)
+            return True
+
+    async def delete(self, scope: str, key: Hashable) -> None:
+        with self._lock:
+            self._remove(scope, key)
+
+    async def invalidate(self, *scopes: str) -> None:
+        self._invalidate(scopes)
+
+    def invalidate_nowait(self, *scopes: str) -> None:
+        # Nothing to wait for in memory, so invalidate before returning
+        self._invalidate(scopes)
+
+    def _invalidate_blocking(self, scopes) -> None:
+        self._invalidate(scopes)
+
+    def _invalidate(self, scopes) -> None:
+        with self._lock:
+            self._sequence += 1
+            if len(self._invalidated_at) >= self.max_entries:
+                # Forget per-scope history; every load already in flight is discarded instead
+                self._invalidated_at.clear()
+                self._floor = self._sequence
+            for scope in scopes:
+                for key in self._scopes.pop(scope, ()):
+                    self._entries.pop((scope, key), None)
+                    self._pinned.discard((scope, key))
+                self._invalidated_at[scope] = self._sequence
+                self._stats["invalidations"] += 1
+
+    def _remove(self, scope: str, key: Hashable) -> None:
+        self._entries.pop((scope, key), None)
+        self._forget(scope, key)
+
+    def _forget(self, scope: str, key: Hashable) -> None:
+        self._pinned.discard((scope, key))
+        keys = self._scopes.get(scope)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._scopes[scope]
+
+    def stats(self) -> dict:
+        return {
+            **super().stats(),
+            "entries": len(self._entries),
+            "pinned": len(self._pinned),
+            "max_entries": self.max_entries
+        }
+
+class RedisCache(CacheBackend):
+    """
+    Networked cache shared by every worker on every host
+
+    Each scope has a generation counter that is part of its entry keys;
+    invalidating a scope increments the counter, so old entries are never
+    read again and expire on their own TTL.
+    """
+
+    # KEYS[1] = generation key, ARGV[1] = entry key prefix, ARGV[2] = entry key suffix
+    GET_SCRIPT = """
+        local generation = redis.call('GET', KEYS[1]) or '0'
+        return {generation, redis.call('GET', ARGV[1] .. generation .. ':' .. ARGV[2])}
+    """
+    # ARGV[3] = value, ARGV[4] = ttl in milliseconds, ARGV[5] = expected generation ('' for any)
+    SET_SCRIPT = """
+        local generation = redis.call('GET', KEYS[1]) or '0'
+        if ARGV[5] ~= '' and ARGV[5] ~= generation then return 0 end
+        redis.call('SET', ARGV[1] .. generation .. ':' .. ARGV[2], ARGV[3], 'PX', ARGV[4])
+        return 1
+    """
+
+    # Same as SET_SCRIPT, but only when the entry does not exist
+    ADD_SCRIPT = """
+        local generation = redis.call('GET', KEYS[1]) or '0'
+        if redis.call('SET', ARGV[1] .. generation .. ':' .. ARGV[2], ARGV[3], 'PX', ARGV[4], 'NX') then return 1 end
+        return 0
+    """
+    DELETE_SCRIPT = """
+        local generation = redis.call('GET', KEYS[1]) or '0'
+        return redis.call('DEL', ARGV[1] .. generation .. ':' .. ARGV[2])
+    """
+
+    def __init__(self, uri: str, prefix: str = "cache:", ttl: float = RESPONSE_CACHE_TTL_SECONDS):
+        import redis.asyncio as redis
+
+        super().__init__(ttl)
+        self.uri = uri
+        self.prefix = prefix
+        self._client = redis.from_url(uri)
+        # Blocking client for invalidations made before any event loop used the cache
+        self._sync_client = None
+        self._get_script = self._client.register_script(self.GET_SCRIPT)
+        self._set_script = self._client.register_script(self.SET_SCRIPT)
+        self._add_script = self._client.register_script(self.ADD_SCRIPT)
+        self._delete_script = self._client.register_script(self.DELETE_SCRIPT)
+
+    def _keys(self, scope: str, key: Hashable) -> Tuple[str, str, str]:
+        """Return (generation key, entry key prefix, entry key suffix)"""
+        digest = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+        return f"{self.prefix}gen:{scope}", f"{self.prefix}{scope}:", digest
+
+    async def _lookup(self, scope: str, key: Hashable) -> Tuple[Optional[Any], Any]:
+        self._remember_loop()
+        generation_key, entry_prefix, entry_suffix = self._keys(scope, key)
+        generation, raw = await self._get_script(keys=[generation_key], args=[entry_prefix, entry_suffix])
+        if not raw:
+            # Redis turns a nil inside a script reply into False
+            self._stats["misses"] += 1
+            return None, generation
+        self._stats["hits"] += 1
+        return json.loads(raw), generation
+
+    async def _store(self, scope: str, key: Hashable, value: Any, token: Any, ttl: Optional[float]) -> None:
+        self._remember_loop()
+        generation_key, entry_prefix, entry_suffix = self._keys(scope, key)
+        ttl_ms = max(1, int((self.ttl if ttl is None else ttl) * 1000))
+        stored = await self._set_script(
+            keys=[generation_key],
+            args=[entry_prefix, entry_suffix, dumps(value), ttl_ms, token or ""]
+        )
+        if stored:
+            self._stats["sets"] += 1
+
+    async def add(self, scope: str, key: Hashable, value: Any, ttl: Optional[float] = None, pin: bool = False) -> bool:
+        # pin needs nothing here: entries are only dropped by their TTL (with no maxmemory eviction policy)
+        self._remember_loop()
+        generation_key, entry_prefix, entry_suffix = self._keys(scope, key)
+        ttl_ms = max(1, int((self.ttl if ttl is None else ttl) * 1000))
+        stored = await self._add_script(
+            keys=[generation_key],
+            args=[entry_prefix, entry_suffix, dumps(value), ttl_ms]
+        )
+        if stored:
+            self._stats["sets"] += 1
+        return bool(stored)
+
+    async def delete(self, scope: str, key: Hashable) -> None:
+        self._remember_loop()
+        generation_key, entry_prefix, entry_suffix = self._keys(scope, key)
+        await self._delete_script(keys=[generation_key], args=[entry_prefix, entry_suffix])
+
+    async def invalidate(self, *scopes: str) -> None:
+        self._remember_loop()
+        async with self._client.pipeline(transaction=False) as pipe:
+            for scope in scopes:
+                pipe.incr(f"{self.prefix}gen:{scope}")
+            await pipe.execute()
+        self._stats["invalidations"] += len(scopes)
+
+    def _invalidate_blocking(self, scopes) -> None:
+        # The asyncio client's connections belong to one loop, so never drive it from a temporary one
+        if self._sync_client is None:
+            import redis
+
+            self._sync_client = redis.from_url(self.uri)
+        with self._sync_client.pipeline(transaction=False) as pipe:
+            for scope in scopes:
+                pipe.incr(f"{self.prefix}gen:{scope}")
+            pipe.execute()
+        self._stats["invalidations"] += len(scopes)
+
+def cache_from_uri(uri: Optional[str]) -> CacheBackend:
+    """
+    Build a cache backend from a URI
+
+    Examples:
+        memory://?max_entries=10000
+        redis://localhost:6379/1
+    """
+    parsed = urlparse(uri or "memory://")
+    if parsed.scheme == "memory":
+        max_entries = int(parse_qs(parsed.query).get("max_entries", ["10000"])[0])
+        return MemoryCache(max_entries=max_entries)
+    if parsed.scheme in ("redis", "rediss"):
+        return RedisCache(uri)
+
+    raise ValueError(f"Unsupported response cache: {uri}")
+
+# Process-wide cache shared by the read endpoints
+response_cache = cache_from_uri(RESPONSE_CACHE_URI)
+
+def transactions_scope(user_id) -> str:
+    """Scope of a user's transaction list pages"""
+    return f"transactions:{user_id}"
+
+def items_scope(transaction_id) -> str:
+    """Scope of a transaction's item list"""
+    return f"items:{transaction_id}"
+
+def images_scope(transaction_id) -> str:
+    """Scope of a transaction's image list"""
+    return f"images:{transaction_id}"
@@ -1,5 +1,7 @@
 import os
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
@@ -21,6 +23,32 @@ engine = create_engine(
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def build_async_database_url(database_url: str) -> str:
+    """
+    Convert the sync connection string into an asyncpg one
+
+    asyncpg does not understand libpq's sslmode parameter, so it is mapped to ssl.
+    """
+    url = make_url(database_url).set(drivername="postgresql+asyncpg")
+    sslmode = url.query.get("sslmode")
+    if sslmode:
+        url = url.difference_update_query(["sslmode"]).update_query_dict({"ssl": sslmode})
+    return url.render_as_string(hide_password=False)
+
+ASYNC_DATABASE_URL = os.getenv('ASYNC_DATABASE_URL') or build_async_database_url(DATABASE_URL)
+
+# Async engine used by routes that must not block the event loop
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_size=int(os.getenv('ASYNC_DB_POOL_SIZE', 20)),
+    max_overflow=int(os.getenv('ASYNC_DB_MAX_OVERFLOW', 40)),
+    pool_pre_ping=True,
+    pool_recycle=3600
+)
+
+# Async session factory
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 # Base class for models
 Base = declarative_base()
 
@@ -30,4 +58,9 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    """Dependency to get async DB session"""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,171 @@
+"""
+Idempotency Keys
+
+Lets clients retry a POST safely by sending an Idempotency-Key header:
+- the first request with a key runs and its response (status and JSON body)
+  is stored for IDEMPOTENCY_TTL_SECONDS
+- a retry with the same key gets the stored response back, marked with
+  Idempotent-Replayed: true, without running the route again
+- a retry that arrives while the first request is still running waits for
+  it in the same worker, and gets 409 Conflict in another worker
+- reusing a key with a different payload is rejected with 422
+
+Keys are scoped per user and per path. The store is chosen with
+IDEMPOTENCY_STORE_URI (same URIs as RESPONSE_CACHE_URI, see cache.py):
+- memory://?max_entries=10000   default, per worker. A retry that lands on
+  another worker is not recognized and runs again. Claims of running
+  requests are pinned so LRU eviction never drops them, but stored
+  responses beyond max_entries are evicted before their TTL.
+- redis://host:port/db          shared by every worker and host; use it
+  whenever more than one worker serves these endpoints
+"""
+
+import asyncio
+import hashlib
+import os
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+from uuid import UUID
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from dotenv import load_dotenv
+from src.config.cache import cache_from_uri
+from src.config.serialization import FastJSONResponse, FAST_JSON_RESPONSES, dumps
+
+load_dotenv()
+
+IDEMPOTENCY_STORE_URI = os.getenv("IDEMPOTENCY_STORE_URI", "memory://?max_entries=10000")
+# How long a stored response can be replayed
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", 24 * 3600))
+# How long a key stays claimed by a request that never finishes (e.g. a crashed worker)
+IDEMPOTENCY_LOCK_SECONDS = float(os.getenv("IDEMPOTENCY_LOCK_SECONDS", 300))
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+# Process-wide store of claimed keys and finished responses
+idempotency_store = cache_from_uri(IDEMPOTENCY_STORE_URI)
+
+# (scope, key) -> (fingerprint, future of the stored response) for requests running in this worker
+_in_flight: Dict[Tuple[str, Hashable], Tuple[str, asyncio.Future]] = {}
+
+def idempotency_scope(user_id: UUID) -> str:
+    """Scope of a user's idempotency keys"""
+    return f"idempotency:{user_id}"
+
+def request_fingerprint(*parts: Any) -> str:
+    """Short hash identifying a request payload"""
+    return hashlib.sha256(dumps(parts)).hexdigest()[:32]
+
+def _response(stored: Dict[str, Any], replayed: bool) -> JSONResponse:
+    response_class = FastJSONResponse if FAST_JSON_RESPONSES else JSONResponse
+    headers = {REPLAYED_HEADER: "true"} if replayed else None
+    return response_class(content=stored["body"], status_code=stored["status"], headers=headers)
+
+def _check_fingerprint(stored_fingerprint: str, fingerprint: str) -> None:
+    if stored_fingerprint != fingerprint:
+        raise HTTPException(
+            status_code=422,
+            detail="Idempotency-Key was already used with a different request payload"
+        )
+
+async def idempotent_response(
+    user_id: UUID,
+    idempotency_key: Optional[str],
+    path: str,
+    fingerprint: str,
+    handler: Callable[[], Awaitable[Tuple[int, Any]]]
+) -> JSONResponse:
+    """
+    Run a POST handler at most once per Idempotency-Key
+
+    Args:
+        user_id: Owner of the key
+        idempotency_key: Value of the Idempotency-Key header (None runs the handler as usual)
+        path: Route path, so one key cannot replay another endpoint's response
+        fingerprint: request_fingerprint of the payload
+        handler: Coroutine function returning (status code, JSON-ready body)
+
+    Returns:
+        The handler's response, or the stored one on a retry
+
+    Raises:
+        HTTPException: 400 for an invalid key, 409 while the key is being
+            processed by another worker, 422 for a key reused with another payload
+    """
+    if idempotency_key is None:
+        status_code, body = await handler()
+        return _response({"status": status_code, "body": body}, replayed=False)
+
+    if not 0 < len(idempotency_key) <= IDEMPOTENCY_KEY_MAX_LENGTH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Idempotency-Key must be 1 to {IDEMPOTENCY_KEY_MAX_LENGTH} characters"
+        )
+
+    scope = idempotency_scope(user_id)
+    key = (path, idempotency_key)
+
+    running = _in_flight.get((scope, key))
+    if running is not None:
+        # Same key already running in this worker: share its outcome
+        running_fingerprint, future = running
+        _check_fingerprint(running_fingerprint, fingerprint)
+        stored, _ = await asyncio.shield(future)
+        return _response(stored, replayed=True)
+
+    future = asyncio.get_running_loop().create_future()
+    # Mark the exception as retrieved when nobody else was waiting for it
+    future.add_done_callback(lambda done: done.cancelled() or done.exception())
+    _in_flight[(scope, key)] = (fingerprint, future)
+    try:
+        stored, replayed = await _run_once(scope, key, fingerprint, handler)
+        future.set_result((stored, replayed))
+        return _response(stored, replayed)
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        if not future.done():
+            # Cancelled (e.g. client disconnected): let waiting retries try again
+            future.set_exception(HTTPException(
+                status_code=409,
+                detail="The original request with this Idempotency-Key was interrupted, retry"
+            ))
+        del _in_flight[(scope, key)]
+
+async def _run_once(
+    scope: str,
+    key: Hashable,
+    fingerprint: str,
+    handler: Callable[[], Awaitable[Tuple[int, Any]]]
+) -> Tuple[Dict[str, Any], bool]:
+    """Replay a stored response or claim the key, run the handler and store its response"""
+    claim = {"state": "running", "fingerprint": fingerprint}
+    # Pinned: evicting a running claim would let a retry run the handler a second time
+    if not await idempotency_store.add(scope, key, claim, ttl=IDEMPOTENCY_LOCK_SECONDS, pin=True):
+        stored = await idempotency_store.get(scope, key)
+        if stored is not None:
+            _check_fingerprint(stored["fingerprint"], fingerprint)
+            if stored["state"] == "done":
+                return stored, True
+            raise HTTPException(
+                status_code=409,
+                detail="A request with this Idempotency-Key is still being processed"
+            )
+        # The entry expired in between: claim it again
+        if not await idempotency_store.add(scope, key, claim, ttl=IDEMPOTENCY_LOCK_SECONDS, pin=True):
+            raise HTTPException(
+                status_code=409,
+                detail="A request with this Idempotency-Key is still being processed"
+            )
+
+    try:
+        status_code, body = await handler()
+    except BaseException:
+        # Nothing was stored: a retry with the same key runs again
+        await asyncio.shield(idempotency_store.delete(scope, key))
+        raise
+
+    stored = {"state": "done", "fingerprint": fingerprint, "status": status_code, "body": body}
+    await idempotency_store.set(scope, key, stored, ttl=IDEMPOTENCY_TTL_SECONDS)
+    return stored, False
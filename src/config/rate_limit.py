@@ -2,16 +2,134 @@
 Rate Limiting Configuration
 
 Protects against brute-force attacks by limiting login attempts
+
+Limiter state lives in a pluggable storage backend (see rate_limit_storage.py)
+chosen with RATE_LIMIT_STORAGE_URI, so limits hold across gunicorn workers:
+- memory://                 default, per worker
+- mmap:///path/to/file      shared by all workers on one host
+- redis://host:port/db      shared by all hosts
 """
 
-from slowapi import Limiter
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
+import functools
+import math
+import os
+from dataclasses import dataclass
+from typing import Callable, Optional
 from fastapi import Request
 from fastapi.responses import JSONResponse
+from dotenv import load_dotenv
+from src.config.rate_limit_storage import RateLimitStorage, storage_from_uri
+
+load_dotenv()
+
+RATE_LIMIT_STORAGE_URI = os.getenv("RATE_LIMIT_STORAGE_URI", "memory://")
+
+_PERIODS = {
+    "second": 1,
+    "minute": 60,
+    "hour": 3600,
+    "day": 86400,
+}
+
+@dataclass(frozen=True)
+class RateLimitItem:
+    """A parsed limit such as "5/minute" """
+    amount: int
+    period: int
+    text: str
+
+def parse_rate(rate: str) -> RateLimitItem:
+    """
+    Parse a limit string of the form "<amount>/<second|minute|hour|day>"
+
+    Raises:
+        ValueError: If the string is malformed
+    """
+    try:
+        amount, unit = rate.split("/")
+        period = _PERIODS[unit.strip().rstrip("s")]
+        return RateLimitItem(amount=int(amount), period=period, text=rate)
+    except (ValueError, KeyError):
+        raise ValueError(f"Invalid rate limit: {rate}")
+
+class RateLimitExceeded(Exception):
+    """Raised when a request goes over its rate limit"""
+
+    def __init__(self, limit: RateLimitItem, retry_after: float, message: Optional[str] = None):
+        super().__init__(f"Rate limit exceeded: {limit.text}")
+        self.limit = limit
+        self.retry_after = retry_after
+        self.message = message
+
+def get_remote_address(request: Request) -> str:
+    """Rate limit key: client IP address"""
+    return request.client.host if request.client else "127.0.0.1"
+
+class Limiter:
+    """Sliding-window (GCRA) rate limiter backed by a shared storage"""
+
+    def __init__(self, key_func: Callable[[Request], str], storage: RateLimitStorage):
+        self.key_func = key_func
+        self.storage = storage
+
+    async def hit(self, scope: str, key: str, limit: RateLimitItem, cost: float = 1, message: Optional[str] = None) -> None:
+        """
+        Consume cost units of a limit
+
+        Args:
+            scope: Namespace of the limit (usually the endpoint)
+            key: Who is being limited (IP address, user id, ...)
+            limit: Parsed limit
+            cost: Units consumed by this request
+            message: Error message returned when the limit is exhausted
+
+        Raises:
+            RateLimitExceeded: If the limit is exhausted
+        """
+        retry_after = await self.storage.acquire(f"{scope}:{key}", limit.period, limit.amount, cost)
+        if retry_after > 0:
+            raise RateLimitExceeded(limit, retry_after, message)
+
+    async def refund(self, scope: str, key: str, limit: RateLimitItem, cost: float = 1) -> None:
+        """
+        Give back cost units taken by hit, for a request that turned out not to count
+
+        Args:
+            scope: Namespace of the limit
+            key: Who was limited
+            limit: Parsed limit
+            cost: Units to give back
+        """
+        await self.storage.acquire(f"{scope}:{key}", limit.period, limit.amount, -cost)
+
+    def limit(self, rate: str, key_func: Optional[Callable[[Request], str]] = None):
+        """
+        Decorate an endpoint with a rate limit
+
+        The endpoint must take a `request: Request` argument.
+        """
+        limit = parse_rate(rate)
+
+        def decorator(func):
+            scope = f"{func.__module__}.{func.__name__}"
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                request = kwargs.get("request")
+                if request is None:
+                    request = next((arg for arg in args if isinstance(arg, Request)), None)
+                if request is None:
+                    raise RuntimeError(f"{scope} needs a `request: Request` argument to be rate limited")
+
+                await self.hit(scope, (key_func or self.key_func)(request), limit)
+                return await func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
 
-# Create limiter instance
-limiter = Limiter(key_func=get_remote_address)
+# Create limiter instance (storage connects lazily, in each worker after fork)
+limiter = Limiter(key_func=get_remote_address, storage=storage_from_uri(RATE_LIMIT_STORAGE_URI))
 
 # Custom exception handler for rate limit exceeded
 async def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded) -> JSONResponse:
@@ -23,10 +141,13 @@ async def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded)
         status_code=429,
         content={
             "status": 429,
-            "msg": "Too many login attempts. Please try again later."
-        }
+            "msg": exc.message or "Too many login attempts. Please try again later."
+        },
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))}
     )
 
 # Rate limit configurations
 SIGNIN_RATE_LIMIT = "5/minute"  # Max 5 signin attempts per minute per IP
 SIGNUP_RATE_LIMIT = "3/minute"  # Max 3 signup attempts per minute per IP
+UPLOAD_COUNT_RATE_LIMIT = os.getenv("UPLOAD_COUNT_RATE_LIMIT", "60/hour")  # Max image uploads per user
+UPLOAD_BYTES_RATE_LIMIT = os.getenv("UPLOAD_BYTES_RATE_LIMIT", f"{500 * 1024 * 1024}/hour")  # Max uploaded bytes per user
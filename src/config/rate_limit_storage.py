@@ -0,0 +1,257 @@
+"""
+Rate Limit Storage
+
+Backends that hold rate limiter state. All of them use GCRA (generic cell
+rate algorithm): a sliding-window limit tracked with a single timestamp per
+key, so every check is O(1) in time and space.
+
+Backends:
+- memory://                 in-process, for a single worker
+- mmap:///path/to/file      shared memory file, for several workers on one host
+- redis://host:port/db      networked, for several hosts
+"""
+
+import asyncio
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+from urllib.parse import urlparse, parse_qs
+
+class RateLimitStorage(ABC):
+    """Base class for rate limiter storage backends"""
+
+    @abstractmethod
+    async def acquire(self, key: str, period: float, limit: float, cost: float = 1) -> float:
+        """
+        Try to consume cost units from a key's allowance
+
+        Args:
+            key: Rate limit key
+            period: Window length in seconds
+            limit: Units allowed per window
+            cost: Units consumed by this request (negative to give units back)
+
+        Returns:
+            0 if allowed, otherwise seconds until the request would be allowed
+        """
+
+    @abstractmethod
+    async def reset(self) -> None:
+        """Forget all rate limit state"""
+
+def gcra(tat: float, now: float, period: float, limit: float, cost: float):
+    """
+    Apply one GCRA step
+
+    Args:
+        tat: Stored theoretical arrival time for the key (0 if unknown)
+        now: Current time
+
+    Returns:
+        Tuple of (new_tat, retry_after); new_tat is None when the request is rejected
+    """
+    emission_interval = period / limit
+    new_tat = max(tat, now) + emission_interval * cost
+    retry_after = new_tat - now - period
+    if retry_after > 0:
+        return None, retry_after
+    return new_tat, 0.0
+
+class MemoryStorage(RateLimitStorage):
+    """In-process storage; each worker keeps its own counts"""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._tats: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    async def acquire(self, key: str, period: float, limit: float, cost: float = 1) -> float:
+        now = time.time()
+        with self._lock:
+            new_tat, retry_after = gcra(self._tats.get(key, 0.0), now, period, limit, cost)
+            if new_tat is not None:
+                if key not in self._tats and len(self._tats) >= self.max_keys:
+                    self._evict(now)
+                self._tats[key] = new_tat
+            return retry_after
+
+    def _evict(self, now: float) -> None:
+        """Drop keys whose allowance has fully recovered"""
+        expired = [key for key, tat in self._tats.items() if tat <= now]
+        for key in expired:
+            del self._tats[key]
+        if len(self._tats) >= self.max_keys:
+            self._tats.clear()
+
+    async def reset(self) -> None:
+        with self._lock:
+            self._tats.clear()
+
+class MMapStorage(RateLimitStorage):
+    """
+    Shared-memory storage for several worker processes on one host
+
+    The file holds a fixed-size open-addressing table of (key fingerprint, tat)
+    slots. Access is serialized across processes with flock. The lock is
+    taken without blocking and retried with a short backoff, so a worker
+    waiting for it keeps serving other requests.
+
+    The file is opened on first use in each process, never at import: flock
+    locks belong to the open file description, so a descriptor inherited
+    across fork would let the parent and every forked worker hold the lock
+    at the same time.
+    """
+
+    SLOT = struct.Struct("<Qd")
+    PROBE_LIMIT = 16
+    # Backoff between attempts to take a contended lock, in seconds
+    LOCK_RETRY_MIN = 0.0002
+    LOCK_RETRY_MAX = 0.01
+
+    def __init__(self, path: str, slots: int = 65536):
+        self.path = path
+        self.slots = slots
+        self._pid = None
+        self._fd = None
+        self._map = None
+        self._lock = threading.Lock()
+
+    def _open(self) -> None:
+        """Open the file and map it for the current process"""
+        size = self.SLOT.size * self.slots
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(fd).st_size < size:
+            os.ftruncate(fd, size)
+        # The parent's descriptor and mapping are left alone; they are still its own
+        self._map = mmap.mmap(fd, size, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+        self._fd = fd
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def _try_lock(self) -> bool:
+        """Take the thread lock and the file lock without waiting"""
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            self._lock.release()
+            return False
+
+    @asynccontextmanager
+    async def _locked(self):
+        """Hold the table for this thread and process; the body must not await"""
+        if self._pid != os.getpid():
+            self._open()
+        delay = self.LOCK_RETRY_MIN
+        while not self._try_lock():
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.LOCK_RETRY_MAX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            self._lock.release()
+
+    @staticmethod
+    def _fingerprint(key: str) -> int:
+        # 0 marks an empty slot
+        return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little") or 1
+
+    def _find_slot(self, fingerprint: int, now: float):
+        """Return (slot_index, stored_tat) for a key, reusing a free or stale slot if it is new"""
+        start = fingerprint % self.slots
+        candidate = None
+        candidate_tat = None
+        for probe in range(self.PROBE_LIMIT):
+            index = (start + probe) % self.slots
+            stored_fingerprint, tat = self.SLOT.unpack_from(self._map, index * self.SLOT.size)
+            if stored_fingerprint == fingerprint:
+                return index, tat
+            if stored_fingerprint == 0 or tat <= now:
+                if candidate is None or candidate_tat > 0:
+                    candidate, candidate_tat = index, 0.0
+            elif candidate is None or tat < candidate_tat:
+                # Table is crowded here: fall back to the slot closest to expiry
+                candidate, candidate_tat = index, tat
+        return candidate, 0.0
+
+    async def acquire(self, key: str, period: float, limit: float, cost: float = 1) -> float:
+        fingerprint = self._fingerprint(key)
+        async with self._locked():
+            now = time.time()
+            index, tat = self._find_slot(fingerprint, now)
+            new_tat, retry_after = gcra(tat, now, period, limit, cost)
+            if new_tat is not None:
+                self.SLOT.pack_into(self._map, index * self.SLOT.size, fingerprint, new_tat)
+            return retry_after
+
+    async def reset(self) -> None:
+        async with self._locked():
+            self._map[:] = bytes(len(self._map))
+
+class RedisStorage(RateLimitStorage):
+    """Networked storage shared by every worker on every host"""
+
+    # Runs atomically on the server, using the server clock
+    SCRIPT = """
+        local now_parts = redis.call('TIME')
+        local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+        local period = tonumber(ARGV[1])
+        local interval = period / tonumber(ARGV[2])
+        local tat = tonumber(redis.call('GET', KEYS[1])) or now
+        if tat < now then tat = now end
+        local new_tat = tat + interval * tonumber(ARGV[3])
+        local retry_after = new_tat - now - period
+        if retry_after > 0 then return tostring(retry_after) end
+        if new_tat <= now then
+            redis.call('DEL', KEYS[1])
+        else
+            redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+        end
+        return '0'
+    """
+
+    def __init__(self, uri: str, prefix: str = "ratelimit:"):
+        import redis.asyncio as redis
+
+        self.prefix = prefix
+        self._client = redis.from_url(uri)
+        self._script = self._client.register_script(self.SCRIPT)
+
+    async def acquire(self, key: str, period: float, limit: float, cost: float = 1) -> float:
+        result = await self._script(keys=[self.prefix + key], args=[period, limit, cost])
+        return float(result)
+
+    async def reset(self) -> None:
+        async for key in self._client.scan_iter(match=self.prefix + "*"):
+            await self._client.delete(key)
+
+def storage_from_uri(uri: Optional[str]) -> RateLimitStorage:
+    """
+    Build a storage backend from a URI
+
+    Examples:
+        memory://
+        mmap:///tmp/expense-tracker-ratelimit?slots=65536
+        redis://localhost:6379/0
+    """
+    if not uri or uri.startswith("memory://"):
+        return MemoryStorage()
+
+    parsed = urlparse(uri)
+    if parsed.scheme == "mmap":
+        slots = int(parse_qs(parsed.query).get("slots", ["65536"])[0])
+        return MMapStorage(parsed.path, slots=slots)
+    if parsed.scheme in ("redis", "rediss"):
+        return RedisStorage(uri)
+
+    raise ValueError(f"Unsupported rate limit storage: {uri}")
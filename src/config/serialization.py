@@ -0,0 +1,146 @@
+"""
+Response Serialization
+
+Fast path for large list responses, switched on with FAST_JSON_RESPONSES=true:
+- responses are rendered with orjson (falls back to the stdlib json module)
+- rows loaded by our own queries are serialized straight from their
+  attributes, without a second round of Pydantic validation
+
+With the switch off, rows go through cached TypeAdapters and FastAPI's
+normal response validation.
+"""
+
+import functools
+import json
+import os
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Type, get_args, get_origin
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+from dotenv import load_dotenv
+
+load_dotenv()
+
+FAST_JSON_RESPONSES = os.getenv("FAST_JSON_RESPONSES", "false").lower() in ("1", "true", "yes")
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _default(value: Any) -> Any:
+    """Encode the non-JSON types our models use the way Pydantic does"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+def dumps(content: Any) -> bytes:
+    """Encode content as compact JSON bytes"""
+    if orjson is not None:
+        # default covers asyncpg's own UUID type, which orjson does not recognize
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, separators=(",", ":"), default=_default).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson when it is installed"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+_MISSING = object()
+
+@functools.lru_cache(maxsize=None)
+def type_adapter(tp: Any) -> TypeAdapter:
+    """Build a TypeAdapter once per type instead of once per request"""
+    return TypeAdapter(tp)
+
+def _field_serializer(annotation: Any) -> Optional[Callable[[Any], Any]]:
+    """Serializer for a field holding a model or a list of models (None for plain values)"""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        serialize = row_serializer(annotation)
+        return lambda value: None if value is None else serialize(value)
+
+    origin = get_origin(annotation)
+    args = [arg for arg in get_args(annotation) if arg is not type(None)]
+    if origin in (list, List) and args:
+        serialize_item = _field_serializer(args[0])
+        if serialize_item is not None:
+            return lambda values: [serialize_item(value) for value in values or ()]
+    elif args and len(args) == 1:
+        # Optional[Model]
+        return _field_serializer(args[0])
+    return None
+
+@functools.lru_cache(maxsize=None)
+def row_serializer(model: Type[BaseModel]) -> Callable[[Any], Dict[str, Any]]:
+    """
+    Build a function that turns a trusted row into the model's JSON-ready dict
+
+    The row is read attribute by attribute (ORM object, Core row or dict);
+    fields it lacks take the model's default. Nothing is validated, so only
+    use it for rows produced by our own queries.
+    """
+    plan = []
+    for name, field in model.model_fields.items():
+        if field.is_required():
+            default = None
+        elif field.default_factory is not None:
+            default = field.default_factory
+        else:
+            default = (lambda value: lambda: value)(field.default)
+        plan.append((name, _field_serializer(field.annotation), default))
+
+    def serialize(row: Any) -> Dict[str, Any]:
+        get = row.get if isinstance(row, dict) else functools.partial(getattr, row)
+        result = {}
+        for name, serialize_field, default in plan:
+            value = get(name, _MISSING)
+            if value is _MISSING:
+                value = default() if default is not None else None
+            if serialize_field is not None:
+                value = serialize_field(value)
+            result[name] = value
+        return result
+
+    return serialize
+
+def serialize_rows(model: Type[BaseModel], rows: Iterable[Any]) -> List[Dict[str, Any]]:
+    """
+    Turn rows into JSON-ready dicts shaped like model
+
+    Args:
+        model: Response model the rows are shaped like
+        rows: ORM objects or Core rows from our own queries
+
+    Returns:
+        List of dicts that can be cached or rendered as-is
+    """
+    if FAST_JSON_RESPONSES:
+        serialize = row_serializer(model)
+        return [serialize(row) for row in rows]
+
+    adapter = type_adapter(List[model])
+    return adapter.dump_python(adapter.validate_python(list(rows), from_attributes=True), mode="json")
+
+def list_response(model: Type[BaseModel], rows: Iterable[Any], response: Optional[Response] = None) -> Any:
+    """
+    Return value for a route declared with response_model=List[model]
+
+    On the fast path the body is rendered here and FastAPI's response
+    validation is skipped; otherwise rows are returned for FastAPI to handle.
+
+    Args:
+        model: Item model of the route's response_model
+        rows: Already serialized dicts, ORM objects or Core rows
+        response: The route's injected Response, whose headers are kept
+    """
+    if not FAST_JSON_RESPONSES:
+        return rows
+    serialize = row_serializer(model)
+    content = [row if isinstance(row, dict) else serialize(row) for row in rows]
+    fast_response = FastJSONResponse(content=content)
+    if response is not None:
+        # FastAPI does not merge the injected Response into a returned one
+        fast_response.headers.raw.extend(response.headers.raw)
+    return fast_response
@@ -1,22 +1,82 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.images.image_model import Image
-from src.images.imgbb_service import ImgBBService
-from fastapi import HTTPException
-from typing import List
+from src.images.imgbb_service import get_imgbb_service
+from src.images.upload_stream import open_upload_stream
+from src.transactions.collection_version import bump_version_for_transaction, get_version_for_transaction_async
+from src.config.cache import response_cache, images_scope, transactions_scope
+from src.images.image_schema import ImageResponse
+from src.config.serialization import serialize_rows
+from src.transactions.transaction_rows import IMAGE_COLUMNS
+from fastapi import HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from typing import List, Tuple, Dict, Any, Union, BinaryIO, Optional
+import asyncio
+import os
+
+# Maximum number of ImgBB uploads running at once for a single request
+IMAGE_UPLOAD_CONCURRENCY = int(os.getenv("IMAGE_UPLOAD_CONCURRENCY", 4))
+
+def _image_from_imgbb(imgbb_response: Dict[str, Any], transaction_id = None) -> Image:
+    """Build an Image row from an ImgBB upload response"""
+    return Image(
+        image_id=imgbb_response.get('id'),
+        url=imgbb_response.get('url'),
+        display_url=imgbb_response.get('display_url'),
+        delete_url=imgbb_response.get('delete_url'),
+        filename=imgbb_response.get('image', {}).get('filename'),
+        mime=imgbb_response.get('image', {}).get('mime'),
+        size=imgbb_response.get('size'),
+        expiration=imgbb_response.get('expiration'),
+        transaction_id=transaction_id
+    )
+
+def _invalidate_reads(transaction_id, owner_id: Optional[Any]) -> None:
+    """Drop cached reads that include a transaction's images"""
+    if transaction_id is None:
+        return
+    scopes = [images_scope(transaction_id)]
+    if owner_id is not None:
+        scopes.append(transactions_scope(owner_id))
+    response_cache.invalidate_nowait(*scopes)
+
+def _save_images(db: Session, images: List[Image], transaction_id = None, refresh: bool = False) -> Optional[Any]:
+    """
+    Insert image rows and bump their owner's collection version in one commit
+
+    Blocking; run it with run_in_threadpool from async code.
+
+    Returns:
+        The owner's user_id, or None when the images belong to no transaction
+    """
+    try:
+        db.add_all(images)
+        owner_id = bump_version_for_transaction(db, transaction_id)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    if refresh:
+        # Load generated columns here rather than lazily on the event loop
+        for image in images:
+            db.refresh(image)
+    return owner_id
 
 class ImageController:
     
     @staticmethod
-    def upload_image(image_data: bytes, name: str = None, expiration: int = None, transaction_id = None, db: Session = None) -> Image:
+    async def upload_image(image_data: Union[bytes, BinaryIO], name: str = None, expiration: int = None, transaction_id = None, db: Session = None, content_type: str = None) -> Image:
         """
         Upload image to ImgBB and save metadata to database
         
         Args:
-            image_data: Binary image data
+            image_data: Binary image data or a readable file object
             name: Optional image name
             expiration: Optional expiration time in seconds
             transaction_id: Optional transaction ID to associate with image
             db: Database session
+            content_type: Optional MIME type of the image
         
         Returns:
             Image object with ImgBB data
@@ -25,36 +85,76 @@ class ImageController:
             HTTPException: If upload fails
         """
         try:
-            imgbb_service = ImgBBService()
-            imgbb_response = imgbb_service.upload_image(image_data, name, expiration)
+            imgbb_service = get_imgbb_service()
+            imgbb_response = await imgbb_service.upload_image(image_data, name, expiration, content_type)
             
-            image = Image(
-                image_id=imgbb_response.get('id'),
-                url=imgbb_response.get('url'),
-                display_url=imgbb_response.get('display_url'),
-                delete_url=imgbb_response.get('delete_url'),
-                filename=imgbb_response.get('image', {}).get('filename'),
-                mime=imgbb_response.get('image', {}).get('mime'),
-                size=imgbb_response.get('size'),
-                expiration=imgbb_response.get('expiration'),
-                transaction_id=transaction_id
-            )
+            image = _image_from_imgbb(imgbb_response, transaction_id)
             
-            db.add(image)
-            db.commit()
-            db.refresh(image)
+            owner_id = await run_in_threadpool(_save_images, db, [image], transaction_id, True)
+            _invalidate_reads(transaction_id, owner_id)
             
             return image
         
         except Exception as e:
-            db.rollback()
             raise HTTPException(
                 status_code=500,
                 detail=f"Failed to upload image: {str(e)}"
             )
     
     @staticmethod
-    def upload_image_from_url(image_url: str, name: str = None, expiration: int = None, transaction_id = None, db: Session = None) -> Image:
+    async def upload_images(
+        files: List[UploadFile],
+        transaction_id = None,
+        db: Session = None,
+        concurrency: int = IMAGE_UPLOAD_CONCURRENCY
+    ) -> Tuple[List[Image], List[Dict[str, str]]]:
+        """
+        Upload several images to ImgBB concurrently and save their metadata in one batch
+        
+        A failed upload does not stop the others; it is reported back per file.
+        
+        Args:
+            files: Uploaded image files
+            transaction_id: Optional transaction ID to associate with the images
+            db: Database session
+            concurrency: Maximum number of uploads in flight at once
+        
+        Returns:
+            Tuple of (saved Image objects, list of {"filename", "error"} for failed files)
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        
+        async def upload_one(file: UploadFile) -> Dict[str, Any]:
+            async with semaphore:
+                # Inside the gather, so a missing client or API key is reported per file too
+                return await get_imgbb_service().upload_image(
+                    open_upload_stream(file),
+                    file.filename,
+                    content_type=file.content_type
+                )
+        
+        results = await asyncio.gather(*(upload_one(file) for file in files), return_exceptions=True)
+        
+        images = []
+        errors = []
+        for file, result in zip(files, results):
+            if isinstance(result, Exception):
+                errors.append({"filename": file.filename, "error": str(result)})
+            else:
+                images.append(_image_from_imgbb(result, transaction_id))
+        
+        if images:
+            try:
+                owner_id = await run_in_threadpool(_save_images, db, images, transaction_id)
+                _invalidate_reads(transaction_id, owner_id)
+            except Exception as e:
+                errors.extend({"filename": image.filename, "error": f"Failed to save image: {str(e)}"} for image in images)
+                images = []
+        
+        return images, errors
+    
+    @staticmethod
+    async def upload_image_from_url(image_url: str, name: str = None, expiration: int = None, transaction_id = None, db: Session = None) -> Image:
         """
         Upload image to ImgBB from URL and save metadata to database
         
@@ -72,42 +172,30 @@ class ImageController:
             HTTPException: If upload fails
         """
         try:
-            imgbb_service = ImgBBService()
-            imgbb_response = imgbb_service.upload_image_from_url(image_url, name, expiration)
+            imgbb_service = get_imgbb_service()
+            imgbb_response = await imgbb_service.upload_image_from_url(image_url, name, expiration)
             
-            image = Image(
-                image_id=imgbb_response.get('id'),
-                url=imgbb_response.get('url'),
-                display_url=imgbb_response.get('display_url'),
-                delete_url=imgbb_response.get('delete_url'),
-                filename=imgbb_response.get('image', {}).get('filename'),
-                mime=imgbb_response.get('image', {}).get('mime'),
-                size=imgbb_response.get('size'),
-                expiration=imgbb_response.get('expiration'),
-                transaction_id=transaction_id
-            )
+            image = _image_from_imgbb(imgbb_response, transaction_id)
             
-            db.add(image)
-            db.commit()
-            db.refresh(image)
+            owner_id = await run_in_threadpool(_save_images, db, [image], transaction_id, True)
+            _invalidate_reads(transaction_id, owner_id)
             
             return image
         
         except Exception as e:
-            db.rollback()
             raise HTTPException(
                 status_code=500,
                 detail=f"Failed to upload image: {str(e)}"
             )
     
     @staticmethod
-    def get_image(image_id: int, db: Session) -> Image:
+    async def get_image_async(image_id, db: AsyncSession) -> Image:
         """
         Get image by ID
         
         Args:
             image_id: Image ID
-            db: Database session
+            db: Async database session
         
         Returns:
             Image object
@@ -115,7 +203,8 @@ class ImageController:
         Raises:
             HTTPException: If image not found
         """
-        image = db.query(Image).filter(Image.id == image_id).first()
+        result = await db.execute(select(Image).where(Image.id == image_id))
+        image = result.scalars().first()
         if not image:
             raise HTTPException(
                 status_code=404,
@@ -124,18 +213,28 @@ class ImageController:
         return image
     
     @staticmethod
-    def get_images_by_transaction(transaction_id, db: Session) -> List[Image]:
+    async def get_images_by_transaction_cached(transaction_id, db: AsyncSession) -> List[Dict[str, Any]]:
         """
-        Get all images for a transaction
+        Get all images for a transaction through the response cache
+        
+        Entries are keyed on the owner's collection version, which every image
+        write bumps, so a worker never serves images older than the last commit.
         
         Args:
             transaction_id: Transaction ID
-            db: Database session
+            db: Async database session
         
         Returns:
-            List of Image objects
+            List of serialized images
         """
-        return db.query(Image).filter(Image.transaction_id == transaction_id).all()
+        version = await get_version_for_transaction_async(db, transaction_id)
+        
+        async def load() -> List[Dict[str, Any]]:
+            # Plain column rows: nothing here is modified, so no ORM objects are built
+            result = await db.execute(select(*IMAGE_COLUMNS).where(Image.transaction_id == transaction_id))
+            return serialize_rows(ImageResponse, result.all())
+        
+        return await response_cache.get_or_load(images_scope(transaction_id), version, load)
     
     @staticmethod
     def delete_image(image_id: int, db: Session) -> dict:
@@ -159,7 +258,11 @@ class ImageController:
                 detail="Image not found"
             )
         
+        # Read before the commit expires the deleted object
+        transaction_id, delete_url = image.transaction_id, image.delete_url
+        owner_id = bump_version_for_transaction(db, transaction_id)
         db.delete(image)
         db.commit()
+        _invalidate_reads(transaction_id, owner_id)
         
-        return {"message": "Image deleted successfully", "delete_url": image.delete_url}
\ No newline at end of file
+        return {"message": "Image deleted successfully", "delete_url": delete_url}
\ No newline at end of file
@@ -1,13 +1,17 @@
 from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, Header, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from uuid import UUID
-from src.config.db import get_db
+from src.config.db import get_db, get_async_db
 from src.images.image_controller import ImageController
 from src.images.image_schema import ImageResponse, ImageUploadRequest
+from src.images.upload_stream import UploadRoute, open_upload_stream
 from src.users.core.jwt_token import verify_token
+from src.config.serialization import list_response
 
-def get_current_user(authorization: str = Header(None), db: Session = Depends(get_db)) -> UUID:
+async def get_current_user(authorization: str = Header(None), db: AsyncSession = Depends(get_async_db)) -> UUID:
     """Extract and verify user_id from JWT token"""
     if not authorization:
         raise HTTPException(
@@ -28,7 +32,7 @@ def get_current_user(authorization: str = Header(None), db: Session = Depends(ge
             detail="Invalid authorization header format"
         )
     
-    payload = verify_token(token, db)
+    payload = await verify_token(token, db)
     if not payload:
         raise HTTPException(
             status_code=401,
@@ -44,7 +48,7 @@ def get_current_user(authorization: str = Header(None), db: Session = Depends(ge
     
     return UUID(user_id)
 
-router = APIRouter(prefix="/api/v1/images", tags=["images"])
+router = APIRouter(prefix="/api/v1/images", tags=["images"], route_class=UploadRoute)
 
 @router.post("/upload", response_model=ImageResponse, status_code=status.HTTP_201_CREATED)
 async def upload_image(
@@ -69,14 +73,13 @@ async def upload_image(
             detail="File must be an image"
         )
     
-    image_data = await file.read()
-    
-    return ImageController.upload_image(
-        image_data=image_data,
-        name=name,
+    return await ImageController.upload_image(
+        image_data=open_upload_stream(file),
+        name=name or file.filename,
         expiration=expiration,
         transaction_id=transaction_id,
-        db=db
+        db=db,
+        content_type=file.content_type
     )
 
 @router.post("/upload-url", response_model=ImageResponse, status_code=status.HTTP_201_CREATED)
@@ -96,7 +99,7 @@ async def upload_image_from_url(
     - **expiration**: Optional expiration time in seconds (60-15552000)
     - **transaction_id**: Optional transaction ID to associate with image
     """
-    return ImageController.upload_image_from_url(
+    return await ImageController.upload_image_from_url(
         image_url=image_url,
         name=name,
         expiration=expiration,
@@ -108,23 +111,24 @@ async def upload_image_from_url(
 async def get_image(
     image_id: UUID,
     user_id: UUID = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get image by ID
     """
-    return ImageController.get_image(image_id, db)
+    return await ImageController.get_image_async(image_id, db)
 
 @router.get("/transaction/{transaction_id}", response_model=List[ImageResponse], status_code=status.HTTP_200_OK)
 async def get_images_by_transaction(
     transaction_id: UUID,
     user_id: UUID = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get all images for a transaction
     """
-    return ImageController.get_images_by_transaction(transaction_id, db)
+    images = await ImageController.get_images_by_transaction_cached(transaction_id, db)
+    return list_response(ImageResponse, images)
 
 @router.delete("/{image_id}", status_code=status.HTTP_200_OK)
 async def delete_image(
@@ -135,4 +139,4 @@ async def delete_image(
     """
     Delete image by ID
     """
-    return ImageController.delete_image(image_id, db)
\ No newline at end of file
+    return await run_in_threadpool(ImageController.delete_image, image_id, db)
\ No newline at end of file
@@ -16,5 +16,9 @@ class ImageResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class ImageUploadError(BaseModel):
+    filename: Optional[str] = Field(None, description="Name of the file that failed")
+    error: str = Field(..., description="Reason the upload failed")
+
 
 
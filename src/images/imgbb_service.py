@@ -1,70 +1,59 @@
-import requests
+import httpx
 import os
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Union, BinaryIO
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Connection settings for the shared ImgBB client
+IMGBB_CONNECT_TIMEOUT = float(os.getenv("IMGBB_CONNECT_TIMEOUT", 5))
+IMGBB_READ_TIMEOUT = float(os.getenv("IMGBB_READ_TIMEOUT", 30))
+IMGBB_MAX_CONNECTIONS = int(os.getenv("IMGBB_MAX_CONNECTIONS", 20))
+IMGBB_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("IMGBB_MAX_KEEPALIVE_CONNECTIONS", 10))
+
 class ImgBBService:
-    BASE_URL = "https://api.imgbb.com/1/upload"
-    
-    def __init__(self):
+    BASE_URL = os.getenv("IMGBB_BASE_URL", "https://api.imgbb.com/1/upload")
+
+    def __init__(self, client: httpx.AsyncClient):
         self.api_key = os.getenv("IMAGE_API_KEY")
         if not self.api_key:
             raise ValueError("IMAGE_API_KEY not found in environment variables")
-    
-    def upload_image(
+        self.client = client
+
+    async def upload_image(
         self,
-        image_data: bytes,
+        image_data: Union[bytes, BinaryIO],
         name: Optional[str] = None,
-        expiration: Optional[int] = None
+        expiration: Optional[int] = None,
+        content_type: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Upload an image to ImgBB
-        
+
+        File objects are streamed to ImgBB in chunks rather than read into memory.
+
         Args:
-            image_data: Binary image data
+            image_data: Binary image data or a readable file object
             name: Optional name for the image
             expiration: Optional expiration time in seconds (60-15552000)
-        
+            content_type: Optional MIME type of the image
+
         Returns:
             Dictionary containing the ImgBB API response data
-        
+
         Raises:
-            requests.RequestException: If the API call fails
+            httpx.HTTPError: If the API call fails
             ValueError: If the response indicates an error
         """
         files = {
-            'image': image_data
-        }
-        
-        data = {
-            'key': self.api_key
+            'image': (name or 'upload', image_data, content_type)
         }
-        
-        if name:
-            data['name'] = name
-        
-        if expiration:
-            if not (60 <= expiration <= 15552000):
-                raise ValueError("Expiration must be between 60 and 15552000 seconds")
-            data['expiration'] = expiration
-        
-        try:
-            response = requests.post(self.BASE_URL, files=files, data=data, timeout=30)
-            response.raise_for_status()
-            
-            result = response.json()
-            
-            if not result.get('success'):
-                raise ValueError(f"ImgBB API error: {result.get('error', 'Unknown error')}")
-            
-            return result.get('data', {})
-        
-        except requests.RequestException as e:
-            raise requests.RequestException(f"Failed to upload image to ImgBB: {str(e)}")
-    
-    def upload_image_from_url(
+
+        data = self._build_form(name, expiration)
+
+        return await self._post(data=data, files=files)
+
+    async def upload_image_from_url(
         self,
         image_url: str,
         name: Optional[str] = None,
@@ -72,42 +61,94 @@ class ImgBBService:
     ) -> Dict[str, Any]:
         """
         Upload an image to ImgBB from a URL
-        
+
         Args:
             image_url: URL of the image to upload
             name: Optional name for the image
             expiration: Optional expiration time in seconds (60-15552000)
-        
+
         Returns:
             Dictionary containing the ImgBB API response data
-        
+
         Raises:
-            requests.RequestException: If the API call fails
+            httpx.HTTPError: If the API call fails
             ValueError: If the response indicates an error
         """
+        data = self._build_form(name, expiration)
+        data['image'] = image_url
+
+        return await self._post(data=data)
+
+    def _build_form(self, name: Optional[str], expiration: Optional[int]) -> Dict[str, Any]:
+        """Build the common form fields for an upload request"""
         data = {
-            'key': self.api_key,
-            'image': image_url
+            'key': self.api_key
         }
-        
+
         if name:
             data['name'] = name
-        
+
         if expiration:
             if not (60 <= expiration <= 15552000):
                 raise ValueError("Expiration must be between 60 and 15552000 seconds")
-            data['expiration'] = expiration
-        
+            data['expiration'] = str(expiration)
+
+        return data
+
+    async def _post(self, data: Dict[str, Any], files: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Send the upload request and unwrap the ImgBB response"""
         try:
-            response = requests.post(self.BASE_URL, data=data, timeout=30)
+            response = await self.client.post(self.BASE_URL, data=data, files=files)
             response.raise_for_status()
-            
+
             result = response.json()
-            
+
             if not result.get('success'):
                 raise ValueError(f"ImgBB API error: {result.get('error', 'Unknown error')}")
-            
+
             return result.get('data', {})
-        
-        except requests.RequestException as e:
-            raise requests.RequestException(f"Failed to upload image to ImgBB: {str(e)}")
+
+        except httpx.HTTPError as e:
+            raise httpx.HTTPError(f"Failed to upload image to ImgBB: {str(e)}")
+
+# Shared client, created and closed by the application lifespan
+_client: Optional[httpx.AsyncClient] = None
+
+def create_imgbb_client() -> httpx.AsyncClient:
+    """
+    Create the long-lived, connection-pooled client used for ImgBB uploads
+
+    Keep-alive connections are reused across requests and HTTP/2 is negotiated when available.
+    """
+    return httpx.AsyncClient(
+        http2=True,
+        timeout=httpx.Timeout(IMGBB_READ_TIMEOUT, connect=IMGBB_CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=IMGBB_MAX_CONNECTIONS,
+            max_keepalive_connections=IMGBB_MAX_KEEPALIVE_CONNECTIONS
+        )
+    )
+
+async def start_imgbb_client() -> None:
+    """Open the shared ImgBB client"""
+    global _client
+    if _client is None:
+        _client = create_imgbb_client()
+
+async def close_imgbb_client() -> None:
+    """Close the shared ImgBB client and its pooled connections"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+def get_imgbb_service() -> ImgBBService:
+    """
+    Get an ImgBB service bound to the shared client
+
+    Raises:
+        RuntimeError: If the client was not started by the application lifespan
+    """
+    if _client is None:
+        raise RuntimeError("ImgBB client is not started")
+    return ImgBBService(_client)
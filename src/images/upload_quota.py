@@ -0,0 +1,143 @@
+"""
+Upload Quotas
+
+Per-user token buckets for the image upload endpoints, charged in upload
+count and in bytes. Checked from the request headers before the body is read,
+so a client over its quota never ties up a worker or ImgBB bandwidth.
+Requests that end up uploading nothing (413s and idempotent replays) get
+their charge back.
+"""
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from src.config.rate_limit import (
+    limiter,
+    parse_rate,
+    rate_limit_exceeded_handler,
+    RateLimitExceeded,
+    UPLOAD_COUNT_RATE_LIMIT,
+    UPLOAD_BYTES_RATE_LIMIT
+)
+from src.config.idempotency import REPLAYED_HEADER
+from src.images.upload_stream import UploadTooLarge
+from src.users.core.jwt_token import decode_token
+
+UPLOAD_COUNT_LIMIT = parse_rate(UPLOAD_COUNT_RATE_LIMIT)
+UPLOAD_BYTES_LIMIT = parse_rate(UPLOAD_BYTES_RATE_LIMIT)
+QUOTA_MESSAGE = "Upload quota exceeded. Please try again later."
+
+# Paths charged for an upload, and whether their body carries the image bytes
+QUOTA_PATHS = {
+    "/api/v1/images/upload": True,
+    "/api/v1/images/upload-url": False,
+    "/api/v1/transactions/": True,
+}
+
+def get_upload_quota_key(request: Request) -> str:
+    """
+    Quota key: user id from the bearer token, or the client IP without one
+
+    The token signature and expiry are checked here; revocation is left to the
+    route's own authentication.
+    """
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        payload = decode_token(token.strip())
+        if payload and payload.get("sub"):
+            return f"user:{payload['sub']}"
+    return f"ip:{request.client.host if request.client else '127.0.0.1'}"
+
+class UploadQuotaMiddleware:
+    """
+    Enforce per-user upload count and byte quotas on the upload endpoints
+
+    Only uploads that are accepted count: the charge is given back when the
+    response is a 413 (body or file too large) or an idempotent replay
+    (Idempotent-Replayed header), since neither uploaded anything.
+    UploadSizeLimitMiddleware should wrap this one, so bodies whose
+    Content-Length is over the limit are refused before anything is charged.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in QUOTA_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        key = get_upload_quota_key(request)
+        carries_bytes = QUOTA_PATHS[scope["path"]]
+        content_length = request.headers.get("content-length")
+        is_multipart = request.headers.get("content-type", "").startswith("multipart/form-data")
+        # (limit scope, limit, cost) of each charge taken for this request
+        charges = []
+
+        try:
+            # Transactions are only charged an upload when they can carry files
+            if scope["path"] != "/api/v1/transactions/" or is_multipart:
+                await limiter.hit("upload_count", key, UPLOAD_COUNT_LIMIT, message=QUOTA_MESSAGE)
+                charges.append(("upload_count", UPLOAD_COUNT_LIMIT, 1))
+            if carries_bytes and content_length and content_length.isdigit():
+                await limiter.hit("upload_bytes", key, UPLOAD_BYTES_LIMIT, cost=int(content_length), message=QUOTA_MESSAGE)
+                charges.append(("upload_bytes", UPLOAD_BYTES_LIMIT, int(content_length)))
+        except RateLimitExceeded as exc:
+            await _refund(key, charges)
+            response = await rate_limit_exceeded_handler(request, exc)
+            await response(scope, receive, send)
+            return
+
+        accepted = True
+
+        async def tracking_send(message: Message) -> None:
+            nonlocal accepted
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                accepted = message["status"] != 413 and headers.get(REPLAYED_HEADER) != "true"
+            await send(message)
+
+        # Without a Content-Length the size is only known once the body has
+        # arrived; it is charged then, so it limits later requests. The request
+        # itself is still bounded by the upload count and UploadSizeLimitMiddleware.
+        received = 0
+
+        async def counting_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if not message.get("more_body", False) and await _charge_bytes(key, received):
+                    charges.append(("upload_bytes", UPLOAD_BYTES_LIMIT, received))
+            return message
+
+        counts_body = carries_bytes and not (content_length and content_length.isdigit())
+        try:
+            await self.app(scope, counting_receive if counts_body else receive, tracking_send)
+        except UploadTooLarge:
+            accepted = False
+            raise
+        finally:
+            if not accepted:
+                await _refund(key, charges)
+
+async def _charge_bytes(key: str, size: int) -> bool:
+    """
+    Charge bytes of a body that has already been received
+
+    Returns:
+        True if the bytes were charged
+    """
+    try:
+        await limiter.hit("upload_bytes", key, UPLOAD_BYTES_LIMIT, cost=size)
+        return True
+    except RateLimitExceeded:
+        # Already over quota: the next request from this key is refused up front
+        return False
+
+async def _refund(key: str, charges: list) -> None:
+    """Give back the quota charged for a request that was not accepted"""
+    for limit_scope, limit, cost in charges:
+        await limiter.refund(limit_scope, key, limit, cost=cost)
@@ -0,0 +1,230 @@
+"""
+Upload Streaming
+
+Keeps multipart image uploads out of worker memory:
+- request bodies are size-checked while the bytes arrive
+- file parts spill to disk once they pass a threshold (on routes using UploadRoute)
+- spooled files are handed to the storage backend as file objects, never read whole
+- bulk import bodies are read by their parser as they arrive, never spooled
+"""
+
+import io
+import json
+import os
+from typing import BinaryIO, Callable, Iterable, Optional
+import anyio
+from fastapi import HTTPException, Request, Response, UploadFile
+from fastapi.routing import APIRoute
+from multipart.multipart import parse_options_header
+from starlette._utils import AwaitableOrContextManager, AwaitableOrContextManagerWrapper
+from starlette.datastructures import FormData
+from starlette.formparsers import MultiPartException, MultiPartParser
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from src.users.core.error_handler import format_error_response
+
+# Largest single image accepted (ImgBB rejects files above 32 MB)
+MAX_IMAGE_UPLOAD_BYTES = int(os.getenv("MAX_IMAGE_UPLOAD_BYTES", 32 * 1024 * 1024))
+# Largest multipart request body accepted on upload endpoints
+MAX_UPLOAD_REQUEST_BYTES = int(os.getenv("MAX_UPLOAD_REQUEST_BYTES", 100 * 1024 * 1024))
+# Largest bulk import request body accepted
+MAX_IMPORT_REQUEST_BYTES = int(os.getenv("MAX_IMPORT_REQUEST_BYTES", 1024 * 1024 * 1024))
+# File parts larger than this are spooled to a temporary file instead of memory
+UPLOAD_SPOOL_THRESHOLD_BYTES = int(os.getenv("UPLOAD_SPOOL_THRESHOLD_BYTES", 1024 * 1024))
+
+# Request paths that accept image uploads
+UPLOAD_PATHS = (
+    "/api/v1/images/upload",
+    "/api/v1/transactions/",
+)
+
+# Request paths that accept bulk imports
+IMPORT_PATHS = (
+    "/api/v1/transactions/import",
+)
+
+class UploadTooLarge(HTTPException):
+    """
+    Raised from the wrapped receive channel once a body passes its limit
+
+    It is an HTTPException so that FastAPI's body parsing re-raises it as a 413
+    instead of turning it into a generic 400 parse error.
+    """
+
+    def __init__(self, limit: int):
+        super().__init__(status_code=413, detail=f"Request body exceeds {limit} bytes")
+
+class UploadSizeLimitMiddleware:
+    """
+    Reject oversized upload bodies before they are fully received
+
+    Requests with a Content-Length above the limit are refused straight away;
+    chunked bodies are counted as they stream in and cut off at the limit.
+    """
+
+    def __init__(self, app: ASGIApp, max_body_bytes: int = MAX_UPLOAD_REQUEST_BYTES, paths: Iterable[str] = UPLOAD_PATHS):
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+        self.paths = tuple(paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_body_bytes:
+            await _send_too_large(send, self.max_body_bytes)
+            return
+
+        received = 0
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_bytes:
+                    raise UploadTooLarge(self.max_body_bytes)
+            return message
+
+        async def tracking_send(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except UploadTooLarge:
+            if response_started:
+                raise
+            await _send_too_large(send, self.max_body_bytes)
+
+async def _send_too_large(send: Send, limit: int) -> None:
+    """Send a 413 response in the API's standard error format"""
+    body = json.dumps(format_error_response(413, f"Request body exceeds {limit} bytes")).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": 413,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("ascii")),
+            (b"connection", b"close"),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+class SpoolingMultiPartParser(MultiPartParser):
+    """Multipart parser that spools file parts through SpooledTemporaryFile(max_size=UPLOAD_SPOOL_THRESHOLD_BYTES)"""
+
+    max_file_size = UPLOAD_SPOOL_THRESHOLD_BYTES
+
+class UploadRequest(Request):
+    """Request whose multipart form is parsed with SpoolingMultiPartParser"""
+
+    def form(self, *, max_files: int = 1000, max_fields: int = 1000) -> AwaitableOrContextManager[FormData]:
+        return AwaitableOrContextManagerWrapper(self._spooled_form(max_files=max_files, max_fields=max_fields))
+
+    def _content_type(self) -> bytes:
+        content_type, _ = parse_options_header(self.headers.get("content-type"))
+        return content_type
+
+    async def _spooled_form(self, *, max_files: int, max_fields: int) -> FormData:
+        if self._form is None and self._content_type() == b"multipart/form-data":
+            parser = SpoolingMultiPartParser(self.headers, self.stream(), max_files=max_files, max_fields=max_fields)
+            try:
+                self._form = await parser.parse()
+            except MultiPartException as exc:
+                raise HTTPException(status_code=400, detail=exc.message)
+        # Other content types (and an already parsed form) are left to Starlette
+        return await super().form(max_files=max_files, max_fields=max_fields)
+
+class UploadRoute(APIRoute):
+    """
+    Route class for routers with upload endpoints
+
+    Only the multipart parsing of these routes changes; the rest of the app
+    keeps Starlette's parser defaults.
+
+    Example:
+        router = APIRouter(prefix="/api/v1/images", route_class=UploadRoute)
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def upload_route_handler(request: Request) -> Response:
+            return await handler(UploadRequest(request.scope, request.receive))
+
+        return upload_route_handler
+
+def open_upload_stream(file: UploadFile, max_bytes: int = MAX_IMAGE_UPLOAD_BYTES) -> BinaryIO:
+    """
+    Get a readable stream over an uploaded file without copying it into memory
+
+    Args:
+        file: Uploaded file (already spooled by the multipart parser)
+        max_bytes: Largest accepted file size
+
+    Returns:
+        File object positioned at the start of the upload
+
+    Raises:
+        HTTPException: If the file is larger than max_bytes
+    """
+    size = file.size
+    if size is None:
+        size = file.file.seek(0, os.SEEK_END)
+    if size > max_bytes:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File {file.filename} exceeds {max_bytes} bytes"
+        )
+    file.file.seek(0)
+    return file.file
+
+class _RequestBodyReader(io.RawIOBase):
+    """Raw blocking reader that pulls request body chunks from the event loop"""
+
+    def __init__(self, request: Request):
+        self._chunks = request.stream().__aiter__()
+        self._buffer = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    async def _next_chunk(self) -> Optional[bytes]:
+        try:
+            return await self._chunks.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    def readinto(self, buffer) -> int:
+        while not self._buffer:
+            chunk = anyio.from_thread.run(self._next_chunk)
+            if chunk is None:
+                return 0
+            self._buffer = memoryview(chunk)
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+def open_request_body(request: Request) -> BinaryIO:
+    """
+    Get a blocking file over a request body that is still arriving
+
+    Only use the file from a worker thread started with run_in_threadpool:
+    each read waits on the event loop for the next chunk, so the body is
+    parsed as it is received instead of being spooled first. Errors while
+    receiving (body too large, client disconnected) are raised by the read.
+
+    Args:
+        request: Request whose body has not been read yet
+
+    Returns:
+        Buffered binary file positioned at the start of the body
+    """
+    return io.BufferedReader(_RequestBodyReader(request), buffer_size=64 * 1024)
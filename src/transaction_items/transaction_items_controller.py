@@ -1,11 +1,27 @@
+from sqlalchemy import select, update, delete, Row, Select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.config.db import get_db
 from src.transaction_items.transaction_items_model import TransactionItem
+from src.transactions.transaction_model import Transaction
+from src.transactions.spending_rollup import record_item_spending, record_spending_many
+from src.transactions.collection_version import bump_version, bump_version_for_transaction, get_version_for_transaction_async
+from src.config.cache import response_cache, items_scope, transactions_scope
+from src.config.serialization import serialize_rows
+from src.transactions.transaction_rows import ITEM_COLUMNS
 from src.transaction_items.transaction_items_schema import TransactionItemCreate, TransactionItemResponse, TransactionItemUpdate, TransactionItemDelete
-from fastapi import Depends
+from fastapi import Depends, HTTPException
+from collections import defaultdict
 import uuid
+import os
 from uuid import UUID
-from typing import List
+from typing import List, Optional, Tuple
+
+# Largest number of items one bulk update or delete may touch
+TRANSACTION_ITEM_BULK_MAX_SIZE = int(os.getenv("TRANSACTION_ITEM_BULK_MAX_SIZE", 1000))
+
+# Columns of the owning transaction returned with changed items, for the rollup
+OWNER_COLUMNS = (Transaction.user_id, Transaction.category, Transaction.occurred_at)
 
 class TransactionItemController:
     @staticmethod
@@ -19,40 +35,204 @@ class TransactionItemController:
             transaction_id=transaction_item_data.transaction_id
         )
         db.add(db_transaction_item)
+        record_item_spending(
+            db,
+            transaction_item_data.transaction_id,
+            item_total=transaction_item_data.amount * transaction_item_data.quantity,
+            items=1
+        )
+        owner_id = bump_version_for_transaction(db, transaction_item_data.transaction_id)
         db.commit()
+        _invalidate_reads(transaction_item_data.transaction_id, owner_id)
         db.refresh(db_transaction_item)
         return db_transaction_item
     
     @staticmethod
-    def get_transaction_items(transaction_id:UUID,db:Session = Depends(get_db))->List[TransactionItemResponse]:
-        """Get all transaction items for a transaction"""
-        return db.query(TransactionItem).filter(TransactionItem.transaction_id == transaction_id).all()
+    async def get_transaction_items_cached(transaction_id:UUID, db:AsyncSession)->List[dict]:
+        """
+        Get all items for a transaction through the response cache, serialized
+
+        Entries are keyed on the owner's collection version, which every item
+        write bumps, so a worker never serves items older than the last commit
+        even before another worker's invalidation reaches its cache.
+        """
+        version = await get_version_for_transaction_async(db, transaction_id)
+
+        async def load() -> List[dict]:
+            # Plain column rows: nothing here is modified, so no ORM objects are built
+            result = await db.execute(select(*ITEM_COLUMNS).where(TransactionItem.transaction_id == transaction_id))
+            return serialize_rows(TransactionItemResponse, result.all())
+
+        return await response_cache.get_or_load(items_scope(transaction_id), version, load)
     
     @staticmethod
-    def update_transaction_item(transaction_item_id:UUID, transaction_item_data:TransactionItemUpdate, db:Session = Depends(get_db))->TransactionItemResponse:
-        """Update a transaction item"""
-        db_transaction_item = db.query(TransactionItem).filter(TransactionItem.transaction_item_id == transaction_item_id).first()
-        if not db_transaction_item:
-            return None
-        
-        if transaction_item_data.name is not None:
-            db_transaction_item.name = transaction_item_data.name
-        if transaction_item_data.amount is not None:
-            db_transaction_item.amount = transaction_item_data.amount
-        if transaction_item_data.quantity is not None:
-            db_transaction_item.quantity = transaction_item_data.quantity
-        
-        db.commit()
-        db.refresh(db_transaction_item)
-        return db_transaction_item
+    def update_transaction_item(transaction_item_id:UUID, transaction_item_data:TransactionItemUpdate, db:Session = Depends(get_db))->Optional[TransactionItemResponse]:
+        """Update a transaction item with one UPDATE ... RETURNING"""
+        rows = _update_items(db, [transaction_item_id], transaction_item_data)
+        return rows[0] if rows else None
+    
+    @staticmethod
+    def update_transaction_items(transaction_item_ids:List[UUID], transaction_item_data:TransactionItemUpdate, user_id:UUID, db:Session = Depends(get_db))->List[TransactionItemResponse]:
+        """
+        Apply the same change to many transaction items of one user in one statement
+
+        Args:
+            transaction_item_ids: Items to update
+            transaction_item_data: Fields to set (unset fields are left alone)
+            user_id: Owner the items must belong to
+            db: Database session
+
+        Returns:
+            The updated items; IDs that do not exist or belong to another user are left out
+
+        Raises:
+            HTTPException: If more than TRANSACTION_ITEM_BULK_MAX_SIZE IDs are given
+        """
+        _check_bulk_size(transaction_item_ids)
+        return _update_items(db, transaction_item_ids, transaction_item_data, user_id)
     
     @staticmethod
     def delete_transaction_item(transaction_item_id:UUID, db:Session = Depends(get_db))->bool:
-        """Delete a transaction item"""
-        db_transaction_item = db.query(TransactionItem).filter(TransactionItem.transaction_item_id == transaction_item_id).first()
-        if not db_transaction_item:
-            return False
-        
-        db.delete(db_transaction_item)
+        """Delete a transaction item with one DELETE ... RETURNING"""
+        return bool(_delete_items(db, [transaction_item_id]))
+    
+    @staticmethod
+    def delete_transaction_items(transaction_item_ids:List[UUID], user_id:UUID, db:Session = Depends(get_db))->List[UUID]:
+        """
+        Delete many transaction items of one user in one statement
+
+        Args:
+            transaction_item_ids: Items to delete
+            user_id: Owner the items must belong to
+            db: Database session
+
+        Returns:
+            IDs of the deleted items; IDs that do not exist or belong to another user are left out
+
+        Raises:
+            HTTPException: If more than TRANSACTION_ITEM_BULK_MAX_SIZE IDs are given
+        """
+        _check_bulk_size(transaction_item_ids)
+        return [row.transaction_item_id for row in _delete_items(db, transaction_item_ids, user_id)]
+
+def _check_bulk_size(transaction_item_ids:List[UUID]) -> None:
+    if len(transaction_item_ids) > TRANSACTION_ITEM_BULK_MAX_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {TRANSACTION_ITEM_BULK_MAX_SIZE} transaction items can be changed at once"
+        )
+
+def _update_items(db:Session, transaction_item_ids:List[UUID], transaction_item_data:TransactionItemUpdate, user_id:Optional[UUID] = None) -> List[Row]:
+    """
+    Update items with one UPDATE ... FROM ... RETURNING and apply the side effects
+
+    The old_item CTE locks the rows (in ID order, so concurrent bulk updates
+    cannot deadlock) and keeps their previous amount and quantity; the join
+    to transactions returns what the rollup needs, so no row is read before
+    or after the update. With user_id, only that user's items are touched.
+    """
+    values = transaction_item_data.model_dump(exclude_none=True)
+    if not transaction_item_ids:
+        return []
+    table = TransactionItem.__table__
+    if not values:
+        result = db.execute(_owned(select(*ITEM_COLUMNS).where(table.c.transaction_item_id.in_(transaction_item_ids)), user_id))
+        return result.all()
+
+    old_item = (
+        _owned(
+            select(table.c.transaction_item_id, table.c.amount, table.c.quantity)
+            .where(table.c.transaction_item_id.in_(transaction_item_ids)),
+            user_id
+        )
+        .order_by(table.c.transaction_item_id)
+        .with_for_update(of=table)
+        .cte("old_item")
+    )
+    try:
+        rows = db.execute(
+            update(table)
+            .where(table.c.transaction_item_id == old_item.c.transaction_item_id)
+            .where(Transaction.transaction_id == table.c.transaction_id)
+            .values({table.c[key]: value for key, value in values.items()})
+            .returning(
+                *ITEM_COLUMNS,
+                old_item.c.amount.label("old_amount"),
+                old_item.c.quantity.label("old_quantity"),
+                *OWNER_COLUMNS
+            )
+        ).all()
+        _apply_item_changes(db, [
+            (row, row.amount * row.quantity - row.old_amount * row.old_quantity, 0)
+            for row in rows
+        ])
         db.commit()
-        return True
\ No newline at end of file
+    except Exception:
+        db.rollback()
+        raise
+    _invalidate_rows(rows)
+    return rows
+
+def _delete_items(db:Session, transaction_item_ids:List[UUID], user_id:Optional[UUID] = None) -> List[Row]:
+    """
+    Delete items with one DELETE ... USING ... RETURNING and apply the side effects
+
+    With user_id, only that user's items are deleted.
+    """
+    if not transaction_item_ids:
+        return []
+    table = TransactionItem.__table__
+    statement = (
+        delete(table)
+        .where(table.c.transaction_id == Transaction.transaction_id)
+        .where(table.c.transaction_item_id.in_(transaction_item_ids))
+    )
+    if user_id is not None:
+        statement = statement.where(Transaction.user_id == user_id)
+    try:
+        rows = db.execute(statement.returning(*ITEM_COLUMNS, *OWNER_COLUMNS)).all()
+        _apply_item_changes(db, [(row, -(row.amount * row.quantity), -1) for row in rows])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    _invalidate_rows(rows)
+    return rows
+
+def _owned(query:Select, user_id:Optional[UUID]) -> Select:
+    """Restrict a select over transaction_items to one user's items (no-op without user_id)"""
+    if user_id is None:
+        return query
+    return query.join(Transaction, Transaction.transaction_id == TransactionItem.transaction_id).where(Transaction.user_id == user_id)
+
+def _apply_item_changes(db:Session, changes:List[Tuple[Row, float, int]]) -> None:
+    """
+    Add item deltas to the spending rollup and bump the owners' versions
+
+    Args:
+        db: Database session (not committed here)
+        changes: (row with OWNER_COLUMNS, item_total delta, item count delta)
+    """
+    # user_id -> (day, category) -> [amount, transactions, item_total, items]
+    deltas = defaultdict(lambda: defaultdict(lambda: [0, 0, 0.0, 0]))
+    for row, item_total, items in changes:
+        totals = deltas[row.user_id][(row.occurred_at.date(), row.category)]
+        totals[2] += item_total
+        totals[3] += items
+    for user_id, user_deltas in deltas.items():
+        record_spending_many(db, user_id, user_deltas)
+        bump_version(db, user_id)
+
+def _invalidate_rows(rows:List[Row]) -> None:
+    """Drop cached reads that include the changed items"""
+    scopes = {items_scope(row.transaction_id) for row in rows}
+    scopes.update(transactions_scope(row.user_id) for row in rows)
+    if scopes:
+        response_cache.invalidate_nowait(*scopes)
+
+def _invalidate_reads(transaction_id:UUID, owner_id:Optional[UUID]) -> None:
+    """Drop cached reads that include a transaction's items"""
+    scopes = [items_scope(transaction_id)]
+    if owner_id is not None:
+        scopes.append(transactions_scope(owner_id))
+    response_cache.invalidate_nowait(*scopes)
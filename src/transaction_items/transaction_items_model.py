@@ -1,14 +1,27 @@
-from sqlalchemy import Column, String, Integer, UUID, ForeignKey, Float
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, UUID, ForeignKey, Float, Computed, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from src.config.db import Base
 import uuid 
 
 class TransactionItem(Base):
     __tablename__="transaction_items"
 
-    transaction_item_id=Column(UUID(as_uuid=True), default=uuid.uuid4, primary_key=True, index=True)
+    transaction_item_id=Column(UUID(as_uuid=True), default=uuid.uuid4, primary_key=True)
     name=Column(String(100),nullable=False)
     amount=Column(Float,nullable=False)
     quantity=Column(Integer,nullable=False)
     transaction_id=Column(UUID(as_uuid=True), ForeignKey("transactions.transaction_id"), nullable=False)
-    transaction = relationship("Transaction", back_populates="items")
\ No newline at end of file
+    transaction = relationship("Transaction", back_populates="items")
+    # Maintained by PostgreSQL on every insert/update; deferred so only search queries load it
+    search_vector = deferred(Column(TSVECTOR, Computed("to_tsvector('simple'::regconfig, coalesce(name, ''))", persisted=True)))
+
+    __table_args__ = (
+        # Search joins items back to their transaction
+        Index("ix_transaction_items_transaction_id", "transaction_id"),
+        # Full-text and typo-tolerant search
+        Index("ix_transaction_items_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_transaction_items_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    )
+    # Don't fetch search_vector back with RETURNING after every insert
+    __mapper_args__ = {"eager_defaults": False}
\ No newline at end of file
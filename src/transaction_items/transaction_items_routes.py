@@ -1,12 +1,16 @@
 from fastapi import APIRouter, Depends, status, Header, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 from typing import List, Optional
-from src.config.db import get_db
+from src.config.db import get_db, get_async_db
 from src.transaction_items.transaction_items_model import TransactionItem
-from src.transaction_items.transaction_items_schema import TransactionItemCreate, TransactionItemResponse, TransactionItemUpdate, TransactionItemDelete
+from src.transaction_items.transaction_items_schema import TransactionItemCreate, TransactionItemResponse, TransactionItemUpdate, TransactionItemDelete, TransactionItemBulkUpdate, TransactionItemBulkDelete, TransactionItemBulkUpdateResponse, TransactionItemBulkDeleteResponse
 from src.transaction_items.transaction_items_controller import TransactionItemController
 from src.users.core.jwt_token import verify_token
+from src.transactions.transaction_routes import get_current_user
+from src.config.serialization import list_response
 
 
 
@@ -15,22 +19,79 @@ router = APIRouter(prefix="/api/v1/transaction_items", tags=["transaction_items"
 @router.post("/", response_model=TransactionItemResponse, status_code=status.HTTP_201_CREATED)
 async def create_transaction_item(transaction_item_data: TransactionItemCreate, db: Session = Depends(get_db)):
    
-    return TransactionItemController.create_transaction_item(transaction_item_data, db)
+    return await run_in_threadpool(TransactionItemController.create_transaction_item, transaction_item_data, db)
 
 @router.get("/", response_model=List[TransactionItemResponse], status_code=status.HTTP_200_OK)
-async def get_transaction_items(transaction_id: UUID, db: Session = Depends(get_db)):
-    return TransactionItemController.get_transaction_items(transaction_id, db)
+async def get_transaction_items(transaction_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    items = await TransactionItemController.get_transaction_items_cached(transaction_id, db)
+    return list_response(TransactionItemResponse, items)
+
+@router.patch("/", response_model=TransactionItemBulkUpdateResponse, status_code=status.HTTP_200_OK)
+async def update_transaction_items(
+    transaction_item_data: TransactionItemBulkUpdate,
+    user_id: UUID = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Apply the same name/amount/quantity change to many of the caller's transaction items in one statement
+
+    IDs that do not exist or belong to another user are listed in `not_found`;
+    404 if none of the IDs can be updated.
+    """
+    changes = TransactionItemUpdate(**transaction_item_data.model_dump(exclude={"transaction_item_ids"}))
+    items = await run_in_threadpool(
+        TransactionItemController.update_transaction_items,
+        transaction_item_data.transaction_item_ids,
+        changes,
+        user_id,
+        db
+    )
+    if not items:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Transaction items not found")
+    found = {item.transaction_item_id for item in items}
+    return {
+        "updated": len(items),
+        "items": items,
+        "not_found": [item_id for item_id in dict.fromkeys(transaction_item_data.transaction_item_ids) if item_id not in found]
+    }
+
+@router.delete("/", response_model=TransactionItemBulkDeleteResponse, status_code=status.HTTP_200_OK)
+async def delete_transaction_items(
+    transaction_item_data: TransactionItemBulkDelete,
+    user_id: UUID = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Delete many of the caller's transaction items in one statement
+
+    IDs that do not exist or belong to another user are listed in `not_found`;
+    404 if none of the IDs can be deleted.
+    """
+    deleted = await run_in_threadpool(
+        TransactionItemController.delete_transaction_items,
+        transaction_item_data.transaction_item_ids,
+        user_id,
+        db
+    )
+    if not deleted:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Transaction items not found")
+    found = set(deleted)
+    return {
+        "deleted": len(deleted),
+        "transaction_item_ids": deleted,
+        "not_found": [item_id for item_id in dict.fromkeys(transaction_item_data.transaction_item_ids) if item_id not in found]
+    }
 
 @router.put("/{transaction_item_id}", response_model=TransactionItemResponse, status_code=status.HTTP_200_OK)
 async def update_transaction_item(transaction_item_id: UUID, transaction_item_data: TransactionItemUpdate, db: Session = Depends(get_db)):
-    item = TransactionItemController.update_transaction_item(transaction_item_id, transaction_item_data, db)
+    item = await run_in_threadpool(TransactionItemController.update_transaction_item, transaction_item_id, transaction_item_data, db)
     if not item:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Transaction item not found")
     return item
 
 @router.delete("/{transaction_item_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_transaction_item(transaction_item_id: UUID, db: Session = Depends(get_db)):
-    success = TransactionItemController.delete_transaction_item(transaction_item_id, db)
+    success = await run_in_threadpool(TransactionItemController.delete_transaction_item, transaction_item_id, db)
     if not success:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Transaction item not found")
     return None
\ No newline at end of file
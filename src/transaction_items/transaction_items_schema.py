@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
 class TransactionItemCreate(BaseModel):
@@ -21,4 +21,20 @@ class TransactionItemUpdate(BaseModel):
     quantity: Optional[int] = Field(None,description="Transaction item quantity")
 
 class TransactionItemDelete(BaseModel):
-    transaction_item_id: UUID = Field(...,description="Transaction item ID")
\ No newline at end of file
+    transaction_item_id: UUID = Field(...,description="Transaction item ID")
+
+class TransactionItemBulkUpdate(TransactionItemUpdate):
+    transaction_item_ids: List[UUID] = Field(...,min_length=1,description="Transaction items to update")
+
+class TransactionItemBulkDelete(BaseModel):
+    transaction_item_ids: List[UUID] = Field(...,min_length=1,description="Transaction items to delete")
+
+class TransactionItemBulkUpdateResponse(BaseModel):
+    updated:int = Field(...,description="Number of transaction items updated")
+    items: List[TransactionItemResponse] = Field(default_factory=list, description="Updated transaction items")
+    not_found: List[UUID] = Field(default_factory=list, description="Requested IDs that do not exist")
+
+class TransactionItemBulkDeleteResponse(BaseModel):
+    deleted:int = Field(...,description="Number of transaction items deleted")
+    transaction_item_ids: List[UUID] = Field(default_factory=list, description="Deleted transaction items")
+    not_found: List[UUID] = Field(default_factory=list, description="Requested IDs that do not exist")
@@ -0,0 +1,94 @@
+"""
+Collection Versions
+
+Per-user version of the transaction collection, used as a strong ETag so
+polling clients get 304 Not Modified without any rows being loaded.
+
+Bump functions only add statements to the caller's session, so the new
+version is committed atomically with the write it describes.
+"""
+
+import hashlib
+from typing import Optional
+from uuid import UUID
+from sqlalchemy import select, literal
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.transactions.collection_version_model import UserCollectionVersion
+from src.transactions.transaction_model import Transaction
+
+def _upsert(statement):
+    """Turn an insert of version 1 into an increment when the row exists"""
+    table = UserCollectionVersion.__table__
+    return statement.on_conflict_do_update(
+        index_elements=[table.c.user_id],
+        set_={"version": table.c.version + 1}
+    )
+
+def bump_version(db: Session, user_id: UUID) -> None:
+    """
+    Increment a user's collection version
+
+    Args:
+        db: Database session (not committed here)
+        user_id: Owner of the changed collection
+    """
+    table = UserCollectionVersion.__table__
+    db.execute(_upsert(insert(table).values(user_id=user_id, version=1)))
+
+def bump_version_for_transaction(db: Session, transaction_id) -> Optional[UUID]:
+    """
+    Increment the collection version of a transaction's owner
+
+    Resolves the owner inside the same statement, so it costs one round trip.
+
+    Args:
+        db: Database session (not committed here)
+        transaction_id: Transaction that was changed
+
+    Returns:
+        The owner's user_id, or None if the transaction does not exist
+    """
+    if transaction_id is None:
+        return None
+    table = UserCollectionVersion.__table__
+    owner = select(Transaction.user_id, literal(1)).where(Transaction.transaction_id == transaction_id)
+    statement = _upsert(insert(table).from_select([table.c.user_id, table.c.version], owner))
+    return db.execute(statement.returning(table.c.user_id)).scalar()
+
+async def get_version_async(db: AsyncSession, user_id: UUID) -> int:
+    """Current collection version of a user (0 before the first write)"""
+    result = await db.execute(
+        select(UserCollectionVersion.version).where(UserCollectionVersion.user_id == user_id)
+    )
+    return result.scalar() or 0
+
+async def get_version_for_transaction_async(db: AsyncSession, transaction_id) -> int:
+    """Current collection version of a transaction's owner (0 if there is none yet)"""
+    result = await db.execute(
+        select(UserCollectionVersion.version)
+        .join(Transaction, Transaction.user_id == UserCollectionVersion.user_id)
+        .where(Transaction.transaction_id == transaction_id)
+    )
+    return result.scalar() or 0
+
+def collection_etag(version: int, *params) -> str:
+    """
+    Strong ETag for one view of a user's collection
+
+    Args:
+        version: Collection version
+        params: Query parameters that shape the response (page, filters, ...)
+    """
+    shape = hashlib.sha256(repr(params).encode("utf-8")).hexdigest()[:16]
+    return f'"v{version}-{shape}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison, as RFC 9110 requires)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (candidate.strip() for candidate in if_none_match.split(","))
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
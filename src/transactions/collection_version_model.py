@@ -0,0 +1,9 @@
+from sqlalchemy import Column, BigInteger, UUID, ForeignKey
+from src.config.db import Base
+
+class UserCollectionVersion(Base):
+    """Per-user counter bumped by every write to the user's transactions, items or images"""
+    __tablename__ = "user_collection_versions"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.user_id"), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,113 @@
+"""
+Spending Rollup
+
+Keeps daily_category_spend in step with transaction and item writes.
+Every function only adds statements to the caller's session, so the rollup
+is committed in the same database transaction as the write it reflects.
+
+Rows are bucketed by the UTC day the transaction occurred on.
+"""
+
+from datetime import date, datetime
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from src.transactions.spending_rollup_model import DailyCategorySpend
+from src.transactions.transaction_model import Transaction
+
+def record_spending(
+    db: Session,
+    user_id: UUID,
+    category: str,
+    day: Optional[date] = None,
+    amount: int = 0,
+    transactions: int = 0,
+    item_total: float = 0,
+    items: int = 0
+) -> None:
+    """
+    Add deltas to a (user, category, day) rollup row, creating it if needed
+
+    Args:
+        db: Database session (not committed here)
+        user_id: Owner of the transaction
+        category: Transaction category
+        day: UTC day the transaction occurred on (defaults to today)
+        amount: Change in transaction amount total
+        transactions: Change in transaction count
+        item_total: Change in item total (amount x quantity)
+        items: Change in item count
+    """
+    _upsert(db, [{
+        "user_id": user_id,
+        "day": day or datetime.utcnow().date(),
+        "category": category,
+        "total_amount": amount,
+        "transaction_count": transactions,
+        "item_total": item_total,
+        "item_count": items
+    }])
+
+def record_spending_many(db: Session, user_id: UUID, deltas: Dict[Tuple[date, str], Tuple[int, int, float, int]]) -> None:
+    """
+    Add deltas to many (user, day, category) rollup rows in one statement
+
+    Args:
+        db: Database session (not committed here)
+        user_id: Owner of the transactions
+        deltas: (day, category) -> (amount, transactions, item_total, items)
+    """
+    if not deltas:
+        return
+    _upsert(db, [
+        {
+            "user_id": user_id,
+            "day": day,
+            "category": category,
+            "total_amount": amount,
+            "transaction_count": transactions,
+            "item_total": item_total,
+            "item_count": items
+        }
+        for (day, category), (amount, transactions, item_total, items) in deltas.items()
+    ])
+
+def _upsert(db: Session, rows: list) -> None:
+    """Insert rollup rows, adding to the counters of rows that already exist"""
+    table = DailyCategorySpend.__table__
+    statement = insert(table).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.day, table.c.category],
+        set_={
+            "total_amount": table.c.total_amount + statement.excluded.total_amount,
+            "transaction_count": table.c.transaction_count + statement.excluded.transaction_count,
+            "item_total": table.c.item_total + statement.excluded.item_total,
+            "item_count": table.c.item_count + statement.excluded.item_count
+        }
+    )
+    db.execute(statement)
+
+def record_item_spending(db: Session, transaction_id: UUID, item_total: float, items: int) -> None:
+    """
+    Add item deltas to the rollup row of the item's transaction
+
+    Args:
+        db: Database session (not committed here)
+        transaction_id: Transaction the item belongs to
+        item_total: Change in item total (amount x quantity)
+        items: Change in item count
+    """
+    owner = db.query(Transaction.user_id, Transaction.category, Transaction.occurred_at).filter(
+        Transaction.transaction_id == transaction_id
+    ).first()
+    if owner is None:
+        return
+    record_spending(
+        db,
+        owner.user_id,
+        owner.category,
+        day=owner.occurred_at.date(),
+        item_total=item_total,
+        items=items
+    )
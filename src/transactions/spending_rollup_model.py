@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, Integer, BigInteger, Float, Date, UUID, ForeignKey
+from src.config.db import Base
+
+class DailyCategorySpend(Base):
+    """Per-user, per-category, per-day spending totals, maintained on every write"""
+    __tablename__ = "daily_category_spend"
+
+    # Primary key order (user_id, day, category) serves date-range scans for one user
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.user_id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    category = Column(String(50), primary_key=True)
+    total_amount = Column(BigInteger, nullable=False, default=0)
+    transaction_count = Column(Integer, nullable=False, default=0)
+    item_total = Column(Float, nullable=False, default=0)
+    item_count = Column(Integer, nullable=False, default=0)
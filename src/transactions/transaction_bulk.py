@@ -0,0 +1,199 @@
+"""
+Bulk Transaction Writes
+
+Validation and set-based insert of many transactions with their items,
+shared by the import and batch endpoints. Rows are loaded with PostgreSQL COPY when the
+driver supports it (psycopg2), encoded as the server reads them, and with a
+multi-row INSERT otherwise.
+The spending rollup and the collection version are updated once per call
+with aggregated deltas. Nothing is committed here.
+"""
+
+import itertools
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID
+from pydantic import ValidationError
+from sqlalchemy import insert, Table
+from sqlalchemy.orm import Session
+from src.transactions.transaction_model import Transaction
+from src.transaction_items.transaction_items_model import TransactionItem
+from src.transactions.transaction_schema import TransactionCreate
+from src.transactions.spending_rollup import record_spending_many
+from src.transactions.collection_version import bump_version
+
+TRANSACTION_COPY_COLUMNS = ("transaction_id", "name", "amount", "category", "user_id", "occurred_at", "created_at")
+ITEM_COPY_COLUMNS = ("transaction_item_id", "name", "amount", "quantity", "transaction_id")
+
+def validate_transaction(raw: Any, user_id: UUID) -> TransactionCreate:
+    """
+    Validate one raw transaction from an import or batch request
+
+    Raises:
+        ValueError: With a message suitable for a per-entry error report
+    """
+    if isinstance(raw, Exception):
+        raise ValueError(f"Invalid JSON: {raw}")
+    if not isinstance(raw, dict):
+        raise ValueError("Expected a JSON object")
+    try:
+        return TransactionCreate(**{**raw, "user_id": user_id})
+    except ValidationError as e:
+        error = e.errors()[0]
+        location = ".".join(str(part) for part in error["loc"])
+        raise ValueError(f"{location}: {error['msg']}" if location else error["msg"])
+    except TypeError as e:
+        raise ValueError(str(e))
+
+# Characters with a meaning in COPY's text format
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+def _copy_line(row: Sequence[Any]) -> str:
+    """Encode a row as one line of COPY ... FROM STDIN (text format)"""
+    fields = []
+    for value in row:
+        if value is None:
+            fields.append("\\N")
+        elif isinstance(value, str):
+            fields.append(value.translate(_COPY_ESCAPES))
+        elif isinstance(value, datetime):
+            fields.append(value.isoformat())
+        else:
+            fields.append(str(value))
+    return "\t".join(fields) + "\n"
+
+def _transaction_line(row: Tuple) -> str:
+    """_copy_line for TRANSACTION_COPY_COLUMNS, skipping the per-value type checks"""
+    transaction_id, name, amount, category, user_id, occurred_at, created_at = row
+    return (
+        f"{transaction_id.hex}\t{name.translate(_COPY_ESCAPES)}\t{amount}\t{category.translate(_COPY_ESCAPES)}\t"
+        f"{user_id.hex}\t{occurred_at.isoformat()}\t{created_at.isoformat()}\n"
+    )
+
+def _item_line(row: Tuple) -> str:
+    """_copy_line for ITEM_COPY_COLUMNS, skipping the per-value type checks"""
+    transaction_item_id, name, amount, quantity, transaction_id = row
+    return f"{transaction_item_id.hex}\t{name.translate(_COPY_ESCAPES)}\t{amount}\t{quantity}\t{transaction_id.hex}\n"
+
+class _CopySource:
+    """
+    File-like COPY input that encodes rows only when PostgreSQL asks for more
+
+    Rows are produced (and, for the import, parsed and validated) while the
+    server is still loading the previous ones. An exception raised by the
+    rows is kept so it can be re-raised as itself rather than as the
+    driver's generic COPY failure.
+    """
+
+    def __init__(self, rows: Iterator[Sequence[Any]], encode: Callable[[Sequence[Any]], str] = _copy_line):
+        self._rows = rows
+        self._encode = encode
+        self.error: Optional[BaseException] = None
+
+    def read(self, size: int = -1) -> str:
+        lines = []
+        length = 0
+        try:
+            encode = self._encode
+            for row in self._rows:
+                line = encode(row)
+                lines.append(line)
+                length += len(line)
+                if 0 <= size <= length:
+                    break
+        except BaseException as e:
+            self.error = e
+            raise
+        return "".join(lines)
+
+def _load_rows(
+    db: Session,
+    table: Table,
+    columns: Sequence[str],
+    rows: Iterable[Tuple],
+    encode: Callable[[Sequence[Any]], str] = _copy_line
+) -> None:
+    """
+    Load rows into a table inside the session's transaction
+
+    Uses COPY FROM STDIN on psycopg2 connections, consuming rows lazily and
+    turning each into a line with encode; other drivers get a multi-row INSERT.
+    """
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        return
+    rows = itertools.chain((first,), rows)
+
+    dbapi_connection = db.connection().connection.dbapi_connection
+    cursor = dbapi_connection.cursor()
+    try:
+        if hasattr(cursor, "copy_expert"):
+            source = _CopySource(rows, encode)
+            try:
+                cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN", source)
+            except Exception as e:
+                if source.error is not None:
+                    raise source.error from e
+                raise
+            return
+    finally:
+        cursor.close()
+
+    db.execute(insert(table), [dict(zip(columns, row)) for row in rows])
+
+def bulk_insert_transactions(db: Session, user_id: UUID, transactions: Iterable[TransactionCreate]) -> List[UUID]:
+    """
+    Insert many transactions of one user with their items
+
+    Args:
+        db: Database session (not committed here)
+        user_id: Owner of every transaction
+        transactions: Validated transactions; an iterator is consumed while
+            the rows are being loaded, so it can still be producing them
+
+    Returns:
+        IDs of the new transactions, in input order
+    """
+    created_at = datetime.utcnow()
+    transaction_ids = []
+    item_rows = []
+    # (day, category) -> [amount, transactions, item_total, items]
+    rollup = defaultdict(lambda: [0, 0, 0.0, 0])
+
+    def transaction_rows() -> Iterator[Tuple]:
+        # Consumed by the COPY, so transactions are read as the server loads them
+        for transaction in transactions:
+            transaction_id = uuid.uuid4()
+            occurred_at = transaction.occurred_at or created_at
+            transaction_ids.append(transaction_id)
+
+            totals = rollup[(occurred_at.date(), transaction.category)]
+            totals[0] += transaction.amount
+            totals[1] += 1
+            for item in transaction.items or []:
+                item_rows.append((uuid.uuid4(), item.name, item.amount, item.quantity, transaction_id))
+                totals[2] += item.amount * item.quantity
+                totals[3] += 1
+
+            yield (
+                transaction_id,
+                transaction.name,
+                transaction.amount,
+                transaction.category,
+                user_id,
+                occurred_at,
+                created_at
+            )
+
+    _load_rows(db, Transaction.__table__, TRANSACTION_COPY_COLUMNS, transaction_rows(), _transaction_line)
+    # Items follow their transactions, which the foreign key needs
+    _load_rows(db, TransactionItem.__table__, ITEM_COPY_COLUMNS, item_rows, _item_line)
+
+    record_spending_many(db, user_id, rollup)
+    if transaction_ids:
+        bump_version(db, user_id)
+
+    return transaction_ids
@@ -1,45 +1,436 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select, insert, Select, func, tuple_, literal, or_, union_all
+from sqlalchemy.orm import Session, selectinload, joinedload
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.config.db import get_db
 from src.transactions.transaction_model import Transaction
 from src.transaction_items.transaction_items_model import TransactionItem
 from src.transactions.transaction_schema import TransactionCreate, TransactionResponse
-from fastapi import Depends
+from src.transactions.transaction_cursor import encode_cursor, decode_cursor, DEFAULT_PAGE_SIZE
+from src.transactions.spending_rollup import record_spending
+from src.transactions.collection_version import bump_version
+from src.transactions.transaction_bulk import bulk_insert_transactions, validate_transaction
+from src.config.cache import response_cache, transactions_scope
+from src.config.serialization import serialize_rows
+from src.transactions.transaction_rows import transaction_rows_query, with_children, TRANSACTION_COLUMNS, ITEM_COLUMNS
+from src.transactions.spending_rollup_model import DailyCategorySpend
+from fastapi import Depends, HTTPException
 import uuid
 from uuid import UUID
-from typing import List
+from typing import Any, List, Optional, Tuple
+from datetime import date, datetime, timezone
+import os
+
+# Strategy used to load Transaction.items and Transaction.images for responses:
+# "selectin" issues one extra IN query per relationship, "joined" uses LEFT OUTER JOINs
+TRANSACTION_RELATIONSHIP_LOADING = os.getenv("TRANSACTION_RELATIONSHIP_LOADING", "selectin")
+# Largest number of entries accepted by one batch create request
+TRANSACTION_BATCH_MAX_SIZE = int(os.getenv("TRANSACTION_BATCH_MAX_SIZE", 1000))
+
+def transaction_load_options() -> list:
+    """Loader options that fetch items and images in a fixed number of queries"""
+    if TRANSACTION_RELATIONSHIP_LOADING == "joined":
+        return [joinedload(Transaction.items), joinedload(Transaction.images)]
+    return [selectinload(Transaction.items), selectinload(Transaction.images)]
 
 class TransactionController:
     @staticmethod
-    def create_transaction(transaction_data:TransactionCreate,db:Session  = Depends(get_db))->TransactionResponse:
-        """Create a new transaction with items"""
-        db_transaction = Transaction(
-            transaction_id=uuid.uuid4(),
-            name=transaction_data.name,
-            amount=transaction_data.amount,
-            category=transaction_data.category,
-            user_id=transaction_data.user_id
-        )
-        db.add(db_transaction)
-        db.commit()
-        db.refresh(db_transaction)
-        
-        db_transaction.items = []
-        if transaction_data.items:
-            for item_data in transaction_data.items:
-                db_item = TransactionItem(
-                    transaction_item_id=uuid.uuid4(),
-                    name=item_data.name,
-                    amount=item_data.amount,
-                    quantity=item_data.quantity,
-                    transaction_id=db_transaction.transaction_id
+    def create_transaction(transaction_data:TransactionCreate,db:Session  = Depends(get_db))->dict:
+        """
+        Create a new transaction with items in one database transaction
+
+        The transaction row and all of its items are inserted with
+        INSERT ... RETURNING (items as one multi-row statement), the rollup
+        and collection version are updated, and everything is committed once.
+        The response is built from the returned rows, so nothing is refreshed
+        or reloaded after the commit.
+
+        Args:
+            transaction_data: Validated transaction with optional items
+            db: Database session
+
+        Returns:
+            Dict shaped like TransactionResponse (no images yet)
+        """
+        created_at = datetime.utcnow()
+        occurred_at = to_utc_naive(transaction_data.occurred_at) or created_at
+        transaction_id = uuid.uuid4()
+        items = transaction_data.items or []
+
+        try:
+            transaction_row = db.execute(
+                insert(Transaction)
+                .values(
+                    transaction_id=transaction_id,
+                    name=transaction_data.name,
+                    amount=transaction_data.amount,
+                    category=transaction_data.category,
+                    user_id=transaction_data.user_id,
+                    occurred_at=occurred_at,
+                    created_at=created_at
                 )
-                db.add(db_item)
-                db_transaction.items.append(db_item)
+                .returning(*TRANSACTION_COLUMNS)
+            ).one()
+
+            item_rows = []
+            if items:
+                item_rows = db.execute(
+                    insert(TransactionItem).returning(*ITEM_COLUMNS, sort_by_parameter_order=True),
+                    [
+                        {
+                            "transaction_item_id": uuid.uuid4(),
+                            "name": item_data.name,
+                            "amount": item_data.amount,
+                            "quantity": item_data.quantity,
+                            "transaction_id": transaction_id
+                        }
+                        for item_data in items
+                    ]
+                ).all()
+
+            record_spending(
+                db,
+                transaction_data.user_id,
+                transaction_data.category,
+                day=occurred_at.date(),
+                amount=transaction_data.amount,
+                transactions=1,
+                item_total=sum(item.amount * item.quantity for item in items),
+                items=len(items)
+            )
+            bump_version(db, transaction_data.user_id)
             db.commit()
-        
-        return db_transaction
+        except Exception:
+            db.rollback()
+            raise
+
+        response_cache.invalidate_nowait(transactions_scope(transaction_data.user_id))
+        return {**transaction_row._mapping, "items": item_rows, "images": []}
+
+    @staticmethod
+    def create_transactions_batch(entries:List[Any], user_id:UUID, db:Session)->dict:
+        """
+        Create many transactions of one user in one database transaction
+
+        Entries are validated one by one; the valid ones are inserted together
+        with set-based inserts (see transaction_bulk.py) and committed once.
+        If that write fails, every valid entry is reported with the error.
+
+        Args:
+            entries: Raw entries shaped like TransactionCreate (user_id is ignored)
+            user_id: Owner of the transactions
+            db: Database session
+
+        Returns:
+            Dict shaped like TransactionBatchResponse, results in request order
+
+        Raises:
+            HTTPException: If the batch is larger than TRANSACTION_BATCH_MAX_SIZE
+        """
+        if len(entries) > TRANSACTION_BATCH_MAX_SIZE:
+            raise HTTPException(
+                status_code=400,
+                detail=f"A batch can hold at most {TRANSACTION_BATCH_MAX_SIZE} transactions"
+            )
+
+        results = [{"index": index, "transaction_id": None, "error": None} for index in range(len(entries))]
+        valid = []
+        for index, raw in enumerate(entries):
+            try:
+                valid.append((index, validate_transaction(raw, user_id)))
+            except ValueError as e:
+                results[index]["error"] = str(e)
+
+        created = 0
+        if valid:
+            try:
+                transaction_ids = bulk_insert_transactions(db, user_id, [transaction for _, transaction in valid])
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                for index, _ in valid:
+                    results[index]["error"] = f"Failed to save: {str(e).splitlines()[0]}"
+            else:
+                for (index, _), transaction_id in zip(valid, transaction_ids):
+                    results[index]["transaction_id"] = transaction_id
+                created = len(valid)
+                response_cache.invalidate_nowait(transactions_scope(user_id))
+
+        return {"created": created, "failed": len(entries) - created, "results": results}
+
+    @staticmethod
+    def get_transaction(transaction_id:UUID,db:Session = Depends(get_db))->Optional[TransactionResponse]:
+        """Get a single transaction with its items and images loaded"""
+        result = db.execute(
+            _transaction_query(transaction_id).execution_options(populate_existing=True)
+        )
+        return result.unique().scalars().first()
+
+    @staticmethod
+    def get_transactions(
+        user_id:UUID,
+        db:Session = Depends(get_db),
+        limit:int = DEFAULT_PAGE_SIZE,
+        after:Optional[str] = None,
+        occurred_from:Optional[datetime] = None,
+        occurred_to:Optional[datetime] = None
+    )->Tuple[List[TransactionResponse], Optional[str]]:
+        """
+        Get one page of transactions for a user with items, newest first
+
+        Pages are ordered by (occurred_at, transaction_id) descending and served
+        from the (user_id, occurred_at, transaction_id) index, so date filters and
+        deep pages cost the same as the first page.
+
+        Args:
+            user_id: Owner of the transactions
+            db: Database session
+            limit: Maximum number of transactions to return
+            after: Cursor returned with the previous page
+            occurred_from: Only transactions that occurred at or after this time
+            occurred_to: Only transactions that occurred before this time
+
+        Returns:
+            Tuple of (transactions, next_cursor); next_cursor is None on the last page
+        """
+        result = db.execute(_transactions_page_query(user_id, limit, after, occurred_from, occurred_to))
+        return _split_page(result.unique().scalars().all(), limit)
+
+    @staticmethod
+    async def get_transaction_rows_async(
+        user_id:UUID,
+        db:AsyncSession,
+        limit:int = DEFAULT_PAGE_SIZE,
+        after:Optional[str] = None,
+        occurred_from:Optional[datetime] = None,
+        occurred_to:Optional[datetime] = None
+    )->Tuple[List[dict], Optional[str]]:
+        """
+        Get one page of a user's transactions with items and images as Core rows
+
+        Runs the same keyset query over plain columns, then fetches items and
+        images with one query each, without building ORM objects.
+
+        Returns:
+            Tuple of (transactions shaped like TransactionResponse, next_cursor)
+        """
+        result = await db.execute(
+            _transactions_page_query(user_id, limit, after, occurred_from, occurred_to, base=transaction_rows_query())
+        )
+        rows, next_cursor = _split_page(result.all(), limit)
+        return await with_children(db, rows), next_cursor
 
     @staticmethod
-    def get_transactions(user_id:UUID,db:Session = Depends(get_db))->List[TransactionResponse]:
-        """Get all transactions for a user with items"""
-        return db.query(Transaction).filter(Transaction.user_id == user_id).all()
\ No newline at end of file
+    async def get_transactions_cached(
+        user_id:UUID,
+        db:AsyncSession,
+        version:int,
+        limit:int = DEFAULT_PAGE_SIZE,
+        after:Optional[str] = None,
+        occurred_from:Optional[datetime] = None,
+        occurred_to:Optional[datetime] = None
+    )->Tuple[List[dict], Optional[str]]:
+        """
+        Read-through cached version of get_transaction_rows_async
+
+        Pages are keyed on the user's collection version as well as the page
+        parameters, so a worker whose cache missed an invalidation still never
+        serves a page older than the version it was asked for.
+
+        Args:
+            version: Current collection version of the user
+
+        Returns:
+            Tuple of (serialized transactions, next_cursor)
+        """
+        async def load() -> dict:
+            transactions, next_cursor = await TransactionController.get_transaction_rows_async(
+                user_id,
+                db,
+                limit=limit,
+                after=after,
+                occurred_from=occurred_from,
+                occurred_to=occurred_to
+            )
+            return {
+                "transactions": serialize_rows(TransactionResponse, transactions),
+                "next_cursor": next_cursor
+            }
+
+        key = (version, limit, after, occurred_from, occurred_to)
+        page = await response_cache.get_or_load(transactions_scope(user_id), key, load)
+        return page["transactions"], page["next_cursor"]
+
+    @staticmethod
+    async def get_spending_summary(user_id:UUID, date_from:date, date_to:date, db:AsyncSession)->List[dict]:
+        """
+        Sum a user's spending per category over a day range
+
+        Reads the daily_category_spend rollup, so the cost depends on the
+        number of days in the range, not on the number of transactions.
+
+        Args:
+            user_id: Owner of the transactions
+            date_from: First day of the range (inclusive)
+            date_to: Last day of the range (inclusive)
+            db: Async database session
+
+        Returns:
+            One dict per category, ordered by total amount descending
+        """
+        total_amount = func.sum(DailyCategorySpend.total_amount).label("total_amount")
+        result = await db.execute(
+            select(
+                DailyCategorySpend.category,
+                total_amount,
+                func.sum(DailyCategorySpend.transaction_count).label("transaction_count"),
+                func.sum(DailyCategorySpend.item_total).label("item_total"),
+                func.sum(DailyCategorySpend.item_count).label("item_count")
+            )
+            .where(
+                DailyCategorySpend.user_id == user_id,
+                DailyCategorySpend.day >= date_from,
+                DailyCategorySpend.day <= date_to
+            )
+            .group_by(DailyCategorySpend.category)
+            .order_by(total_amount.desc())
+        )
+        return [dict(row._mapping) for row in result]
+
+    @staticmethod
+    async def search_transactions_async(
+        user_id:UUID,
+        query:str,
+        db:AsyncSession,
+        limit:int = DEFAULT_PAGE_SIZE,
+        offset:int = 0
+    )->List[dict]:
+        """
+        Search a user's transactions by name, category and item names
+
+        Matches full words through the search_vector GIN indexes and
+        misspelled words through the trigram indexes.
+
+        Args:
+            user_id: Owner of the transactions
+            query: Search text
+            db: Async database session
+            limit: Maximum number of transactions to return
+            offset: Number of ranked results to skip
+
+        Returns:
+            Serialized transactions (see serialize_rows), most relevant first
+        """
+        matches = (await db.execute(_search_query(user_id, query, limit, offset))).all()
+        if not matches:
+            return []
+
+        ids = [match.transaction_id for match in matches]
+        result = await db.execute(transaction_rows_query().where(Transaction.transaction_id.in_(ids)))
+        rows = {row.transaction_id: row for row in result}
+        transactions = await with_children(db, [rows[transaction_id] for transaction_id in ids if transaction_id in rows])
+        return serialize_rows(TransactionResponse, transactions)
+
+def _search_query(user_id:UUID, query:str, limit:int, offset:int) -> Select:
+    """Rank the ids of a user's transactions matching a search text"""
+    ts_query = func.websearch_to_tsquery(literal("simple").cast(REGCONFIG), query)
+    text = literal(query)
+
+    transaction_matches = (
+        select(
+            Transaction.transaction_id,
+            (func.ts_rank(Transaction.search_vector, ts_query) + func.word_similarity(text, Transaction.name)).label("rank")
+        )
+        .where(
+            Transaction.user_id == user_id,
+            or_(Transaction.search_vector.op("@@")(ts_query), text.op("<%")(Transaction.name))
+        )
+    )
+    item_matches = (
+        select(
+            TransactionItem.transaction_id,
+            (func.ts_rank(TransactionItem.search_vector, ts_query) + func.word_similarity(text, TransactionItem.name)).label("rank")
+        )
+        .join(Transaction, Transaction.transaction_id == TransactionItem.transaction_id)
+        .where(
+            Transaction.user_id == user_id,
+            or_(TransactionItem.search_vector.op("@@")(ts_query), text.op("<%")(TransactionItem.name))
+        )
+    )
+
+    candidates = union_all(transaction_matches, item_matches).subquery()
+    rank = func.max(candidates.c.rank).label("rank")
+    return (
+        select(candidates.c.transaction_id, rank)
+        .group_by(candidates.c.transaction_id)
+        .order_by(rank.desc(), candidates.c.transaction_id)
+        .limit(limit)
+        .offset(offset)
+    )
+
+def _transaction_query(transaction_id:UUID) -> Select:
+    """Select a single transaction with relationships eagerly loaded"""
+    return (
+        select(Transaction)
+        .options(*transaction_load_options())
+        .where(Transaction.transaction_id == transaction_id)
+    )
+
+def to_utc_naive(value:Optional[datetime]) -> Optional[datetime]:
+    """Convert a datetime to the naive UTC form timestamps are stored in"""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def _transactions_page_query(
+    user_id:UUID,
+    limit:int,
+    after:Optional[str],
+    occurred_from:Optional[datetime] = None,
+    occurred_to:Optional[datetime] = None,
+    base:Optional[Select] = None
+) -> Select:
+    """
+    Build the keyset query for one page of a user's transactions
+
+    Selects ORM objects with relationships eagerly loaded, or the columns of
+    base when given.
+    """
+    if base is None:
+        base = select(Transaction).options(*transaction_load_options())
+    query = base.where(Transaction.user_id == user_id)
+
+    if occurred_from is not None:
+        query = query.where(Transaction.occurred_at >= to_utc_naive(occurred_from))
+    if occurred_to is not None:
+        query = query.where(Transaction.occurred_at < to_utc_naive(occurred_to))
+
+    if after:
+        cursor = decode_cursor(after)
+        try:
+            last_occurred_at = datetime.fromisoformat(str(cursor["t"]))
+            last_id = UUID(str(cursor["id"]))
+        except (KeyError, ValueError):
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid pagination cursor"
+            )
+        # Row comparison keeps the range on the index instead of an OR of two predicates
+        query = query.where(
+            tuple_(Transaction.occurred_at, Transaction.transaction_id) < tuple_(last_occurred_at, last_id)
+        )
+
+    # Fetch one extra row to know whether another page exists
+    return (
+        query.order_by(Transaction.occurred_at.desc(), Transaction.transaction_id.desc())
+        .limit(limit + 1)
+    )
+
+def _split_page(rows:list, limit:int) -> Tuple[list, Optional[str]]:
+    """Trim the look-ahead row and build the cursor for the next page"""
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor({"t": last.occurred_at.isoformat(), "id": str(last.transaction_id)})
+    return rows, next_cursor
@@ -0,0 +1,51 @@
+"""
+Transaction Cursor
+
+Opaque cursors for keyset pagination of transaction lists
+"""
+
+import base64
+import json
+from typing import Any, Dict
+from fastapi import HTTPException
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    """
+    Encode the sort key of the last row on a page into an opaque cursor
+
+    Args:
+        values: Sort key values of the last returned row
+
+    Returns:
+        URL-safe cursor string
+    """
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Args:
+        cursor: Cursor string from a previous page
+
+    Returns:
+        Dictionary with the sort key values
+
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, dict):
+            raise ValueError("cursor must decode to an object")
+        return values
+    except (ValueError, UnicodeError):
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid pagination cursor"
+        )
@@ -0,0 +1,127 @@
+"""
+Transaction Export
+
+Streams a user's whole ledger as CSV or NDJSON. Rows are read through a
+server-side cursor in fixed-size batches and written out batch by batch,
+so memory use does not grow with the size of the ledger.
+
+Items are flattened: a transaction with n items produces n rows carrying
+the transaction's columns, and a transaction without items produces one
+row with empty item columns.
+"""
+
+import csv
+import io
+import os
+import zlib
+from datetime import datetime
+from typing import AsyncIterator, Optional
+from uuid import UUID
+from sqlalchemy import select, Select
+from src.config.db import AsyncSessionLocal
+from src.config.serialization import dumps
+from src.transactions.transaction_model import Transaction
+from src.transaction_items.transaction_items_model import TransactionItem
+
+# Rows fetched from the cursor (and written out) per batch
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 2000))
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+EXPORT_COLUMNS = (
+    Transaction.transaction_id,
+    Transaction.occurred_at,
+    Transaction.created_at,
+    Transaction.name,
+    Transaction.category,
+    Transaction.amount,
+    TransactionItem.transaction_item_id.label("item_id"),
+    TransactionItem.name.label("item_name"),
+    TransactionItem.amount.label("item_amount"),
+    TransactionItem.quantity.label("item_quantity"),
+)
+EXPORT_HEADER = [column.key for column in EXPORT_COLUMNS]
+
+def _export_query(user_id: UUID, occurred_from: Optional[datetime], occurred_to: Optional[datetime]) -> Select:
+    """Flattened transaction/item rows of a user, oldest first"""
+    query = (
+        select(*EXPORT_COLUMNS)
+        .outerjoin(TransactionItem, TransactionItem.transaction_id == Transaction.transaction_id)
+        .where(Transaction.user_id == user_id)
+    )
+    if occurred_from is not None:
+        query = query.where(Transaction.occurred_at >= occurred_from)
+    if occurred_to is not None:
+        query = query.where(Transaction.occurred_at < occurred_to)
+    return query.order_by(Transaction.occurred_at, Transaction.transaction_id)
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def _encode_csv(rows, include_header: bool) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if include_header:
+        writer.writerow(EXPORT_HEADER)
+    writer.writerows([_csv_value(value) for value in row] for row in rows)
+    return buffer.getvalue().encode("utf-8")
+
+def _encode_ndjson(rows) -> bytes:
+    return b"".join(dumps(dict(row._mapping)) + b"\n" for row in rows)
+
+async def stream_export(
+    user_id: UUID,
+    export_format: str,
+    occurred_from: Optional[datetime] = None,
+    occurred_to: Optional[datetime] = None,
+    gzip: bool = False
+) -> AsyncIterator[bytes]:
+    """
+    Yield an export of a user's transactions chunk by chunk
+
+    Opens its own session because the response keeps streaming after the
+    route (and its request-scoped session) has returned.
+
+    Args:
+        user_id: Owner of the transactions
+        export_format: "csv" or "ndjson"
+        occurred_from: Only transactions that occurred at or after this time (naive UTC)
+        occurred_to: Only transactions that occurred before this time (naive UTC)
+        gzip: Compress the stream with gzip on the fly
+
+    Yields:
+        Encoded (and possibly compressed) chunks of the export
+    """
+    # wbits=31 selects the gzip container
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None
+    include_header = export_format == "csv"
+
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(
+            _export_query(user_id, occurred_from, occurred_to).execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        async for rows in result.partitions():
+            if export_format == "csv":
+                chunk = _encode_csv(rows, include_header)
+                include_header = False
+            else:
+                chunk = _encode_ndjson(rows)
+
+            if compressor is not None:
+                chunk = compressor.compress(chunk)
+            if chunk:
+                yield chunk
+
+    if include_header:
+        # Empty ledger: a CSV still gets its header line
+        chunk = _encode_csv([], True)
+        yield compressor.compress(chunk) if compressor is not None else chunk
+    if compressor is not None:
+        yield compressor.flush()
@@ -1,14 +1,41 @@
-from sqlalchemy import Column, String, Integer, UUID, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, UUID, ForeignKey, Index, DateTime, Computed, DDL, event
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from src.config.db import Base
 import uuid
+from datetime import datetime
 class Transaction(Base):
     __tablename__ = "transactions"
     
-    transaction_id=Column(UUID(as_uuid=True), default=uuid.uuid4, primary_key=True, index=True)
+    transaction_id=Column(UUID(as_uuid=True), default=uuid.uuid4, primary_key=True)
     name = Column(String(100), nullable=False)
     amount= Column(Integer,nullable=False)
     category= Column(String(50),nullable=False)
     user_id= Column(UUID(as_uuid=True), ForeignKey("users.user_id"), nullable=False)
+    # Both stored as naive UTC; occurred_at is when the spending happened, created_at when it was recorded
+    occurred_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Maintained by PostgreSQL on every insert/update; deferred so only search queries load it
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed("to_tsvector('simple'::regconfig, coalesce(name, '') || ' ' || coalesce(category, ''))", persisted=True)
+    ))
     items = relationship("TransactionItem", back_populates="transaction")
     images = relationship("Image", back_populates="transaction")
+
+    __table_args__ = (
+        # Serves date-range filters and chronological keyset pagination of a user's transactions
+        Index("ix_transactions_user_id_occurred_at", "user_id", "occurred_at", "transaction_id"),
+        # Full-text and typo-tolerant search
+        Index("ix_transactions_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_transactions_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    )
+    # Don't fetch search_vector back with RETURNING after every insert
+    __mapper_args__ = {"eager_defaults": False}
+
+# Trigram indexes need pg_trgm before the table is created
+event.listen(
+    Transaction.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
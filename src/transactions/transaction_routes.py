@@ -1,16 +1,27 @@
-from fastapi import APIRouter, Depends, status, Header, HTTPException, Form, File, UploadFile
+from fastapi import APIRouter, Body, Depends, status, Header, HTTPException, Form, File, UploadFile, Query, Response, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
-from typing import List, Optional
+from typing import Any, List, Optional
+from datetime import date, datetime
 import json
-from src.config.db import get_db
+from src.config.db import get_db, get_async_db
 from src.transactions.transaction_model import Transaction
-from src.transactions.transaction_schema import TransactionCreate, TransactionResponse
-from src.transactions.transaction_controller import TransactionController
+from src.transactions.transaction_schema import TransactionCreate, TransactionResponse, SpendingSummaryResponse, TransactionImportResponse, TransactionBatchResponse
+from src.transactions.transaction_controller import TransactionController, to_utc_naive
+from src.transactions.transaction_cursor import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from src.config.serialization import list_response, serialize_rows
+from src.config.idempotency import idempotent_response, request_fingerprint
+from src.transactions.transaction_export import stream_export, EXPORT_FORMATS
+from src.transactions.transaction_import import import_transactions as run_import
+from src.images.upload_stream import UploadRoute, open_request_body
+from src.transactions.collection_version import get_version_async, collection_etag, etag_matches
 from src.users.core.jwt_token import verify_token
 from src.images.image_controller import ImageController
 
-def get_current_user(authorization: str = Header(None), db: Session = Depends(get_db)) -> UUID:
+async def get_current_user(authorization: str = Header(None), db: AsyncSession = Depends(get_async_db)) -> UUID:
     """Extract and verify user_id from JWT token"""
     if not authorization:
         raise HTTPException(
@@ -31,7 +42,7 @@ def get_current_user(authorization: str = Header(None), db: Session = Depends(ge
             detail="Invalid authorization header format"
         )
     
-    payload = verify_token(token, db)
+    payload = await verify_token(token, db)
     if not payload:
         raise HTTPException(
             status_code=401,
@@ -47,15 +58,18 @@ def get_current_user(authorization: str = Header(None), db: Session = Depends(ge
     
     return UUID(user_id)
 
-router = APIRouter(prefix="/api/v1/transactions", tags=["transactions"])
+router = APIRouter(prefix="/api/v1/transactions", tags=["transactions"], route_class=UploadRoute)
 
 @router.post("/", response_model=TransactionResponse, status_code=status.HTTP_201_CREATED)
 async def create_transaction(
+    request: Request,
     name: str = Form(...),
     amount: int = Form(...),
     category: str = Form(...),
+    occurred_at: Optional[datetime] = Form(None),
     items: Optional[str] = Form(None),
     files: List[UploadFile] = File(default=[]),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     user_id: UUID = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -65,50 +79,235 @@ async def create_transaction(
     - **name**: Transaction name (required)
     - **amount**: Transaction amount (required)
     - **category**: Transaction category (required)
+    - **occurred_at**: When the spending happened, ISO 8601 (optional, defaults to now)
     - **items**: JSON array of transaction items (optional)
     - **files**: Image files to attach (optional)
+    - **Idempotency-Key** header: Retries with the same key get the first
+      response back instead of creating (and uploading) everything again
+    
+    Images are uploaded concurrently. Files that fail to upload are listed in
+    `image_errors` instead of failing the whole request.
     """
-    transaction_items = []
-    if items:
-        try:
-            transaction_items = json.loads(items)
-        except json.JSONDecodeError:
-            raise HTTPException(
-                status_code=400,
-                detail="Invalid items JSON format"
+    async def create():
+        transaction_items = []
+        if items:
+            try:
+                transaction_items = json.loads(items)
+            except json.JSONDecodeError:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Invalid items JSON format"
+                )
+        
+        transaction_data = TransactionCreate(
+            name=name,
+            amount=amount,
+            category=category,
+            user_id=user_id,
+            occurred_at=occurred_at,
+            items=transaction_items
+        )
+        
+        transaction = await run_in_threadpool(TransactionController.create_transaction, transaction_data, db)
+        
+        image_errors = []
+        image_files = [file for file in files if file.content_type and file.content_type.startswith('image/')]
+        if image_files:
+            images, image_errors = await ImageController.upload_images(
+                files=image_files,
+                transaction_id=transaction["transaction_id"],
+                db=db
             )
+            if images:
+                # Saved images were committed separately; reload with items and images eagerly fetched
+                transaction = await run_in_threadpool(TransactionController.get_transaction, transaction["transaction_id"], db)
+                transaction.image_errors = image_errors
+                return status.HTTP_201_CREATED, serialize_rows(TransactionResponse, [transaction])[0]
+        
+        transaction["image_errors"] = image_errors
+        return status.HTTP_201_CREATED, serialize_rows(TransactionResponse, [transaction])[0]
     
-    transaction_data = TransactionCreate(
-        name=name,
-        amount=amount,
-        category=category,
-        user_id=user_id,
-        items=transaction_items
+    fingerprint = request_fingerprint(
+        name, amount, category, occurred_at, items,
+        [(file.filename, file.content_type, file.size) for file in files]
     )
-    
-    transaction = TransactionController.create_transaction(transaction_data, db)
-    
-    if files:
-        for file in files:
-            if file.content_type and file.content_type.startswith('image/'):
-                try:
-                    image_data = await file.read()
-                    ImageController.upload_image(
-                        image_data=image_data,
-                        name=file.filename,
-                        transaction_id=transaction.transaction_id,
-                        db=db
-                    )
-                except Exception as e:
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"Failed to upload image {file.filename}: {str(e)}"
-                    )
-    
-    db.refresh(transaction)
-    return transaction
+    return await idempotent_response(user_id, idempotency_key, request.url.path, fingerprint, create)
+
+@router.post("/batch", response_model=TransactionBatchResponse, status_code=status.HTTP_200_OK)
+async def create_transactions_batch(
+    request: Request,
+    entries: List[Any] = Body(..., description="Transactions shaped like the JSON create payload"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    user_id: UUID = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Create many transactions in one request
+
+    - **body**: JSON array of `{name, amount, category, occurred_at, items}`
+      objects, at most `TRANSACTION_BATCH_MAX_SIZE` of them
+    - **Idempotency-Key** header: Retries with the same key get the first
+      response back instead of creating the batch again
+
+    Meant for clients replaying queued offline expenses. Valid entries are
+    created together; `results` has one entry per input, in order, with
+    either the new `transaction_id` or the `error` that rejected it.
+    """
+    async def create():
+        result = await run_in_threadpool(TransactionController.create_transactions_batch, entries, user_id, db)
+        return status.HTTP_200_OK, serialize_rows(TransactionBatchResponse, [result])[0]
+
+    return await idempotent_response(user_id, idempotency_key, request.url.path, request_fingerprint(entries), create)
 
 @router.get("/", response_model=List[TransactionResponse], status_code=status.HTTP_200_OK)
-async def get_transactions(user_id: UUID = Depends(get_current_user), db: Session = Depends(get_db)):
-    """Get all transactions for authenticated user"""
-    return TransactionController.get_transactions(user_id, db)
+async def get_transactions(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    occurred_from: Optional[datetime] = Query(None, alias="from", description="Only transactions that occurred at or after this time"),
+    occurred_to: Optional[datetime] = Query(None, alias="to", description="Only transactions that occurred before this time"),
+    if_none_match: Optional[str] = Header(None),
+    user_id: UUID = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get a page of transactions for authenticated user, newest first
+
+    - **limit**: Page size (1-200, default 50)
+    - **after**: Cursor of the previous page; omit for the first page
+    - **from**: Start of the time range, ISO 8601 (inclusive)
+    - **to**: End of the time range, ISO 8601 (exclusive)
+
+    When more transactions exist, the cursor for the next page is returned
+    in the `X-Next-Cursor` response header.
+
+    Every response carries an `ETag`. Sending it back in `If-None-Match`
+    returns 304 Not Modified when nothing changed since.
+    """
+    occurred_from, occurred_to = to_utc_naive(occurred_from), to_utc_naive(occurred_to)
+    if occurred_from and occurred_to and occurred_from >= occurred_to:
+        raise HTTPException(
+            status_code=400,
+            detail="'from' must be before 'to'"
+        )
+
+    # Answered from the version row alone, before any transaction is loaded
+    version = await get_version_async(db, user_id)
+    etag = collection_etag(version, user_id, limit, after, occurred_from, occurred_to)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
+    transactions, next_cursor = await TransactionController.get_transactions_cached(
+        user_id,
+        db,
+        version,
+        limit=limit,
+        after=after,
+        occurred_from=occurred_from,
+        occurred_to=occurred_to
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return list_response(TransactionResponse, transactions, response)
+
+@router.get("/summary", response_model=SpendingSummaryResponse, status_code=status.HTTP_200_OK)
+async def get_spending_summary(
+    date_from: Optional[date] = Query(None, alias="from", description="First day (inclusive), defaults to the start of this month"),
+    date_to: Optional[date] = Query(None, alias="to", description="Last day (inclusive), defaults to today"),
+    user_id: UUID = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get spending per category for a date range
+
+    - **from**: First day of the range, e.g. 2026-01-01
+    - **to**: Last day of the range, e.g. 2026-12-31
+
+    Served from the daily rollup table, so month and year ranges cost the
+    same however many transactions the user has.
+    """
+    date_to = date_to or datetime.utcnow().date()
+    date_from = date_from or date_to.replace(day=1)
+    if date_from > date_to:
+        raise HTTPException(
+            status_code=400,
+            detail="'from' must not be after 'to'"
+        )
+
+    categories = await TransactionController.get_spending_summary(user_id, date_from, date_to, db)
+    return SpendingSummaryResponse(
+        date_from=date_from,
+        date_to=date_to,
+        total_amount=sum(category["total_amount"] for category in categories),
+        transaction_count=sum(category["transaction_count"] for category in categories),
+        categories=categories
+    )
+
+@router.get("/search", response_model=List[TransactionResponse], status_code=status.HTTP_200_OK)
+async def search_transactions(
+    q: str = Query(..., min_length=1, max_length=200, description="Search text"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    user_id: UUID = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Search transactions by name, category and item names
+
+    - **q**: Search text; supports quoted phrases, `or` and `-word`, and tolerates typos
+    - **limit**: Page size (1-200, default 50)
+    - **offset**: Number of results to skip
+
+    Results are ranked by relevance, most relevant first.
+    """
+    transactions = await TransactionController.search_transactions_async(user_id, q, db, limit=limit, offset=offset)
+    return list_response(TransactionResponse, transactions)
+
+@router.get("/export", status_code=status.HTTP_200_OK)
+async def export_transactions(
+    format: str = Query("csv", pattern="^(csv|ndjson)$", description="csv or ndjson"),
+    occurred_from: Optional[datetime] = Query(None, alias="from", description="Only transactions that occurred at or after this time"),
+    occurred_to: Optional[datetime] = Query(None, alias="to", description="Only transactions that occurred before this time"),
+    gzip: bool = Query(False, description="Compress the export with gzip"),
+    user_id: UUID = Depends(get_current_user)
+):
+    """
+    Export all transactions of the authenticated user, oldest first
+
+    - **format**: `csv` (default) or `ndjson`
+    - **from** / **to**: Optional time range, ISO 8601
+    - **gzip**: Send the body gzip-encoded
+
+    Items are flattened to one row per item. The export is streamed, so
+    it starts immediately and works for ledgers of any size.
+    """
+    occurred_from, occurred_to = to_utc_naive(occurred_from), to_utc_naive(occurred_to)
+    filename = f"transactions-{datetime.utcnow():%Y%m%d}.{format}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(
+        stream_export(user_id, format, occurred_from, occurred_to, gzip=gzip),
+        media_type=EXPORT_FORMATS[format],
+        headers=headers
+    )
+
+@router.post("/import", response_model=TransactionImportResponse, status_code=status.HTTP_200_OK)
+async def import_transactions(
+    request: Request,
+    format: str = Query("csv", pattern="^(csv|ndjson)$", description="csv or ndjson"),
+    user_id: UUID = Depends(get_current_user)
+):
+    """
+    Bulk import transactions from a CSV or NDJSON request body
+
+    - **format**: `csv` (default, same columns as the export) or `ndjson`
+      (one transaction per line with nested `items`)
+
+    Valid transactions are imported in chunks even when others fail;
+    rejected ones are listed in `errors` with their line number.
+    """
+    # Parsed and loaded off the event loop while the body is still arriving
+    return await run_in_threadpool(run_import, open_request_body(request), format, user_id)
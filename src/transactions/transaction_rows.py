@@ -0,0 +1,101 @@
+"""
+Transaction Rows
+
+Read-only list queries that select plain columns with Core instead of
+hydrating ORM objects. Rows come back as compact named tuples (no identity
+map, no attribute instrumentation) and are serialized as they are.
+"""
+
+from collections import defaultdict
+from typing import Dict, List, Sequence
+from uuid import UUID
+from sqlalchemy import select, Select, Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.transactions.transaction_model import Transaction
+from src.transaction_items.transaction_items_model import TransactionItem
+from src.images.image_model import Image
+
+# Columns of each response model
+TRANSACTION_COLUMNS = (
+    Transaction.transaction_id,
+    Transaction.name,
+    Transaction.amount,
+    Transaction.category,
+    Transaction.user_id,
+    Transaction.occurred_at,
+    Transaction.created_at,
+)
+ITEM_COLUMNS = (
+    TransactionItem.transaction_item_id,
+    TransactionItem.name,
+    TransactionItem.amount,
+    TransactionItem.quantity,
+    TransactionItem.transaction_id,
+)
+IMAGE_COLUMNS = (
+    Image.id,
+    Image.image_id,
+    Image.url,
+    Image.transaction_id,
+)
+
+def transaction_rows_query() -> Select:
+    """Select the response columns of transactions"""
+    return select(*TRANSACTION_COLUMNS)
+
+async def fetch_item_rows(db: AsyncSession, transaction_ids: Sequence[UUID]) -> Dict[UUID, List[Row]]:
+    """
+    Fetch the items of several transactions in one query
+
+    Returns:
+        Item rows grouped by transaction_id
+    """
+    grouped = defaultdict(list)
+    if transaction_ids:
+        result = await db.execute(
+            select(*ITEM_COLUMNS).where(TransactionItem.transaction_id.in_(transaction_ids))
+        )
+        for row in result:
+            grouped[row.transaction_id].append(row)
+    return grouped
+
+async def fetch_image_rows(db: AsyncSession, transaction_ids: Sequence[UUID]) -> Dict[UUID, List[Row]]:
+    """
+    Fetch the images of several transactions in one query
+
+    Returns:
+        Image rows grouped by transaction_id
+    """
+    grouped = defaultdict(list)
+    if transaction_ids:
+        result = await db.execute(
+            select(*IMAGE_COLUMNS).where(Image.transaction_id.in_(transaction_ids))
+        )
+        for row in result:
+            grouped[row.transaction_id].append(row)
+    return grouped
+
+async def with_children(db: AsyncSession, rows: Sequence[Row]) -> List[dict]:
+    """
+    Attach item and image rows to transaction rows
+
+    Costs two queries however many transactions there are.
+
+    Args:
+        db: Async database session
+        rows: Transaction rows selected with TRANSACTION_COLUMNS
+
+    Returns:
+        One dict per transaction, shaped like TransactionResponse
+    """
+    transaction_ids = [row.transaction_id for row in rows]
+    items = await fetch_item_rows(db, transaction_ids)
+    images = await fetch_image_rows(db, transaction_ids)
+    return [
+        {
+            **row._mapping,
+            "items": items.get(row.transaction_id, []),
+            "images": images.get(row.transaction_id, []),
+        }
+        for row in rows
+    ]
@@ -1,27 +1,78 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List
 from uuid import UUID
+from datetime import date, datetime, timezone
+
+# Range of the INTEGER columns amounts and quantities are stored in
+INT32_MIN = -2**31
+INT32_MAX = 2**31 - 1
 
 class TransactionItemCreateInline(BaseModel):
-    name: str = Field(...,description="Transaction item name")
+    name: str = Field(...,max_length=100,description="Transaction item name")
     amount: float = Field(...,description="Transaction item amount")
-    quantity: int = Field(...,description="Transaction item quantity")
+    quantity: int = Field(...,ge=INT32_MIN,le=INT32_MAX,description="Transaction item quantity")
 
 class TransactionCreate(BaseModel):
-    name: str = Field(...,description="Transaction name")
-    amount: int = Field(...,description="Transaction amount")
-    category: str = Field(...,description="Transaction category")
+    name: str = Field(...,max_length=100,description="Transaction name")
+    amount: int = Field(...,ge=INT32_MIN,le=INT32_MAX,description="Transaction amount")
+    category: str = Field(...,max_length=50,description="Transaction category")
     user_id: Optional[UUID] = Field(None,description="User ID (set from token)")
+    occurred_at: Optional[datetime] = Field(None,description="When the spending happened (defaults to now)")
     items: Optional[List[TransactionItemCreateInline]] = Field(default_factory=list, description="Transaction items")
 
+    @field_validator('occurred_at')
+    @classmethod
+    def normalize_occurred_at(cls, v: Optional[datetime]) -> Optional[datetime]:
+        """Store timestamps as naive UTC like the rest of the schema"""
+        if v is not None and v.tzinfo is not None:
+            return v.astimezone(timezone.utc).replace(tzinfo=None)
+        return v
+
 class TransactionResponse(BaseModel):
     transaction_id: UUID = Field(...,description="Transaction ID")
     name:str = Field(...,description="Transaction name")
     amount:int = Field(...,description="Transaction amount")
     category:str = Field(...,description="Transaction category")
     user_id:UUID = Field(...,description="User ID")
+    occurred_at:datetime = Field(...,description="When the spending happened (UTC)")
+    created_at:datetime = Field(...,description="When the transaction was recorded (UTC)")
     items: List['TransactionItemResponse'] = Field(default_factory=list, description="Transaction items")
     images: List['ImageResponse'] = Field(default_factory=list, description="Transaction images")
+    image_errors: List['ImageUploadError'] = Field(default_factory=list, description="Images that failed to upload")
+
+class CategorySpending(BaseModel):
+    category:str = Field(...,description="Transaction category")
+    total_amount:int = Field(...,description="Sum of transaction amounts")
+    transaction_count:int = Field(...,description="Number of transactions")
+    item_total:float = Field(...,description="Sum of item amount x quantity")
+    item_count:int = Field(...,description="Number of items")
+
+class SpendingSummaryResponse(BaseModel):
+    date_from:date = Field(...,description="First day of the range")
+    date_to:date = Field(...,description="Last day of the range")
+    total_amount:int = Field(...,description="Sum of transaction amounts over all categories")
+    transaction_count:int = Field(...,description="Number of transactions over all categories")
+    categories: List[CategorySpending] = Field(default_factory=list, description="Spending per category")
+
+class TransactionImportError(BaseModel):
+    line:int = Field(...,description="Line of the input the transaction starts on")
+    error:str = Field(...,description="Why the transaction was not imported")
+
+class TransactionImportResponse(BaseModel):
+    imported:int = Field(...,description="Number of transactions imported")
+    items:int = Field(...,description="Number of transaction items imported")
+    failed:int = Field(...,description="Number of transactions rejected")
+    errors: List[TransactionImportError] = Field(default_factory=list, description="Rejected transactions (first ones only)")
+
+class TransactionBatchResult(BaseModel):
+    index:int = Field(...,description="Position of the entry in the request")
+    transaction_id:Optional[UUID] = Field(None,description="ID of the created transaction")
+    error:Optional[str] = Field(None,description="Why the entry was not created")
+
+class TransactionBatchResponse(BaseModel):
+    created:int = Field(...,description="Number of transactions created")
+    failed:int = Field(...,description="Number of entries rejected")
+    results: List[TransactionBatchResult] = Field(default_factory=list, description="One result per entry, in request order")
 
 class TransactionUpdate(BaseModel):
    name:Optional[str] = Field(None,description="Transaction name")
@@ -32,5 +83,5 @@ class TransactionDelete(BaseModel):
     transaction_id:UUID = Field(...,description="Transaction ID")
 
 from src.transaction_items.transaction_items_schema import TransactionItemResponse
-from src.images.image_schema import ImageResponse
+from src.images.image_schema import ImageResponse, ImageUploadError
 TransactionResponse.model_rebuild()
\ No newline at end of file
@@ -3,8 +3,9 @@ from jose import JWTError, jwt
 from typing import Optional
 from uuid import UUID
 import os
+import uuid
 from dotenv import load_dotenv
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 load_dotenv()
 
@@ -21,7 +22,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
+    # jti identifies the token for revocation without storing the token itself
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -33,7 +35,7 @@ def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None)
     else:
         expire = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
     
-    to_encode.update({"exp": expire, "type": "refresh"})
+    to_encode.update({"exp": expire, "type": "refresh", "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -48,7 +50,7 @@ def decode_token(token: str) -> Optional[dict]:
     except JWTError:
         return None
 
-def verify_token(token: str, db: Session = None) -> Optional[dict]:
+async def verify_token(token: str, db: AsyncSession = None) -> Optional[dict]:
     """
     Verify and decode JWT token
     
@@ -56,7 +58,7 @@ def verify_token(token: str, db: Session = None) -> Optional[dict]:
     
     Args:
         token: JWT token to verify
-        db: Database session (optional, for blacklist check)
+        db: Async database session (optional, for blacklist check)
         
     Returns:
         Token payload if valid, None if invalid or blacklisted
@@ -67,7 +69,7 @@ def verify_token(token: str, db: Session = None) -> Optional[dict]:
         # Check if token is blacklisted (if db session provided)
         if db is not None:
             from src.users.services.token_blacklist_service import is_token_blacklisted
-            if is_token_blacklisted(token, db):
+            if await is_token_blacklisted(token, db, payload):
                 return None  # Token is blacklisted
         
         return payload
@@ -76,7 +78,7 @@ def verify_token(token: str, db: Session = None) -> Optional[dict]:
 
 def get_user_id_from_token(token: str) -> Optional[UUID]:
     """Extract user_id from token"""
-    payload = verify_token(token)
+    payload = decode_token(token)
     if payload is None:
         return None
     return payload.get("sub")
\ No newline at end of file
@@ -1,21 +1,31 @@
 from passlib.context import CryptContext
+from passlib.hash import bcrypt as bcrypt_handler
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import HTTPException
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
+import asyncio
+import multiprocessing
 import os
+import time
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashing pool settings
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", 64))
+# Lowest bcrypt cost ever used for new hashes (passlib's default)
+BCRYPT_MIN_ROUNDS = 12
+BCRYPT_MAX_ROUNDS = 15
+# bcrypt cost for new hashes, shared by every worker; pick it with
+# `python -m src.users.core.user_password_hash` (tunes for BCRYPT_TARGET_MS)
+BCRYPT_ROUNDS = max(BCRYPT_MIN_ROUNDS, int(os.getenv("BCRYPT_ROUNDS", BCRYPT_MIN_ROUNDS)))
+BCRYPT_TARGET_MS = float(os.getenv("BCRYPT_TARGET_MS", 250))
 
-def get_password_hash(password: str) -> str:
-    """Hash a password using bcrypt"""
-    # Truncate password to 72 bytes (bcrypt limit)
-    password = password[:72]
-    return pwd_context.hash(password)
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a plain password against a hashed password"""
-    # Truncate password to 72 bytes (bcrypt limit)
-    plain_password = plain_password[:72]
-    return pwd_context.verify(plain_password, hashed_password)
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS
+)
 
 def is_password_valid(password: str) -> bool:
     """Validate password strength"""
@@ -24,4 +34,144 @@ def is_password_valid(password: str) -> bool:
     has_upper = any(c.isupper() for c in password)
     has_lower = any(c.islower() for c in password)
     has_digit = any(c.isdigit() for c in password)
-    return has_upper and has_lower and has_digit
\ No newline at end of file
+    return has_upper and has_lower and has_digit
+
+def configure_bcrypt_rounds(rounds: int) -> None:
+    """
+    Use a bcrypt cost factor for new hashes
+
+    Hashes made with a lower cost are reported by needs_rehash, so they are
+    upgraded the next time the user signs in; higher costs are left alone.
+    Costs below BCRYPT_MIN_ROUNDS are raised to it.
+    """
+    global pwd_context
+    rounds = max(BCRYPT_MIN_ROUNDS, rounds)
+    pwd_context = CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds
+    )
+    _stats["rounds"] = rounds
+
+def needs_rehash(hashed_password: str) -> bool:
+    """Check if a stored hash was made with a lower cost factor than the configured one"""
+    return pwd_context.needs_update(hashed_password)
+
+# Functions below run inside the process pool
+
+def _hash_in_worker(password: str, rounds: int) -> str:
+    # Truncate password to 72 bytes (bcrypt limit)
+    return bcrypt_handler.using(rounds=rounds).hash(password[:72])
+
+def _verify_in_worker(plain_password: str, hashed_password: str) -> bool:
+    return bcrypt_handler.verify(plain_password[:72], hashed_password)
+
+def _time_rounds_in_worker(rounds: int) -> float:
+    hasher = bcrypt_handler.using(rounds=rounds)
+    started = time.perf_counter()
+    hasher.hash("cost-factor-benchmark")
+    return (time.perf_counter() - started) * 1000
+
+_executor: Optional[ProcessPoolExecutor] = None
+_stats = {
+    "workers": 0,
+    "rounds": None,
+    "in_flight": 0,
+    "max_in_flight": 0,
+    "completed": 0,
+    "failed": 0,
+    "rejected": 0,
+    "rehashed": 0
+}
+
+async def _run_in_pool(func, *args):
+    """
+    Run a hashing function on the process pool
+
+    Raises:
+        HTTPException: If too many hashing jobs are already queued
+    """
+    if _stats["in_flight"] >= PASSWORD_HASH_MAX_QUEUE:
+        _stats["rejected"] += 1
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy. Please try again later."
+        )
+
+    _stats["in_flight"] += 1
+    _stats["max_in_flight"] = max(_stats["max_in_flight"], _stats["in_flight"])
+    try:
+        loop = asyncio.get_running_loop()
+        # Without a started pool (scripts, tests) fall back to the default thread pool
+        result = await loop.run_in_executor(_executor, func, *args)
+    except BaseException:
+        _stats["failed"] += 1
+        raise
+    finally:
+        _stats["in_flight"] -= 1
+    _stats["completed"] += 1
+    return result
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the process pool"""
+    return await _run_in_pool(_hash_in_worker, password, _stats["rounds"] or BCRYPT_ROUNDS)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password on the process pool
+
+    Returns:
+        Tuple of (is_valid, new_hash); new_hash is set when the stored hash
+        uses an outdated cost factor and should be saved in its place
+    """
+    is_valid = await _run_in_pool(_verify_in_worker, plain_password, hashed_password)
+    if not is_valid or not needs_rehash(hashed_password):
+        return is_valid, None
+
+    _stats["rehashed"] += 1
+    return True, await hash_password_async(plain_password)
+
+async def tune_bcrypt_rounds(target_ms: float = BCRYPT_TARGET_MS) -> int:
+    """
+    Pick the highest bcrypt cost whose hash time on this host stays within target_ms
+
+    Never goes below BCRYPT_MIN_ROUNDS. Only used to suggest a BCRYPT_ROUNDS
+    value: workers tuning themselves could settle on different costs and
+    rehash the same users back and forth.
+    """
+    rounds = BCRYPT_MIN_ROUNDS
+    while rounds < BCRYPT_MAX_ROUNDS:
+        elapsed_ms = await _run_in_pool(_time_rounds_in_worker, rounds + 1)
+        if elapsed_ms > target_ms:
+            break
+        rounds += 1
+    return rounds
+
+async def start_password_hasher() -> None:
+    """Start the hashing pool and apply the configured bcrypt cost factor"""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=PASSWORD_HASH_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        _stats["workers"] = PASSWORD_HASH_WORKERS
+
+    configure_bcrypt_rounds(BCRYPT_ROUNDS)
+
+def stop_password_hasher() -> None:
+    """Shut down the hashing pool"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+        _stats["workers"] = 0
+
+def get_password_hash_stats() -> dict:
+    """Queue depth and throughput of the hashing pool"""
+    return dict(_stats)
+
+if __name__ == "__main__":
+    # Suggest a BCRYPT_ROUNDS value for this host
+    print(f"BCRYPT_ROUNDS={asyncio.run(tune_bcrypt_rounds())}")
@@ -45,9 +45,15 @@ def upgrade(engine):
             """))
             
             # Create index on token for faster lookups
-            connection.execute(text("""
-                CREATE INDEX IF NOT EXISTS idx_token_blacklist_token ON token_blacklist(token)
-            """))
+            # (skipped once migration 004 has replaced the token column)
+            has_token_column = connection.execute(text("""
+                SELECT 1 FROM information_schema.columns
+                WHERE table_name = 'token_blacklist' AND column_name = 'token'
+            """)).first() is not None
+            if has_token_column:
+                connection.execute(text("""
+                    CREATE INDEX IF NOT EXISTS idx_token_blacklist_token ON token_blacklist(token)
+                """))
             
             # Create index on expires_at for cleanup queries
             connection.execute(text("""
@@ -0,0 +1,116 @@
+"""
+Migration 004: Key Token Blacklist on jti Digests
+
+What this does:
+- Adds a jti_digest column (32-byte SHA-256) to token_blacklist
+- Converts existing rows by hashing their stored token
+- Drops the 500-character token column and its two indexes
+
+Why we need it:
+- Tokens now carry a jti claim, so the full JWT no longer has to be stored
+- A fixed-width binary key keeps the index several times smaller
+- Comparing 32 bytes is cheaper than comparing long strings
+
+When to use:
+- Run this AFTER migration 003
+- It's safe to run multiple times
+"""
+
+from sqlalchemy import text
+
+def upgrade(engine):
+    """
+    UPGRADE = Replace the token column with jti_digest
+    
+    Existing rows were issued without a jti, so they are keyed on
+    sha256(token), which is what the application uses for such tokens.
+    """
+    print("\n" + "="*60)
+    print("MIGRATION 004: Keying Token Blacklist on jti Digests")
+    print("="*60)
+    
+    try:
+        with engine.connect() as connection:
+            # Add the new key column
+            connection.execute(text("""
+                ALTER TABLE token_blacklist
+                ADD COLUMN IF NOT EXISTS jti_digest BYTEA
+            """))
+            
+            # Convert existing rows (only when the old column is still there)
+            has_token_column = connection.execute(text("""
+                SELECT 1 FROM information_schema.columns
+                WHERE table_name = 'token_blacklist' AND column_name = 'token'
+            """)).first() is not None
+            
+            if has_token_column:
+                connection.execute(text("""
+                    UPDATE token_blacklist
+                    SET jti_digest = sha256(convert_to(token, 'UTF8'))
+                    WHERE jti_digest IS NULL
+                """))
+                print("✓ Existing tokens converted to digests")
+            
+            connection.execute(text("""
+                ALTER TABLE token_blacklist
+                ALTER COLUMN jti_digest SET NOT NULL
+            """))
+            
+            # Unique index on the digest serves lookups
+            connection.execute(text("""
+                CREATE UNIQUE INDEX IF NOT EXISTS token_blacklist_jti_digest_key
+                ON token_blacklist(jti_digest)
+            """))
+            
+            # Drop the old token indexes and column
+            connection.execute(text("DROP INDEX IF EXISTS idx_token_blacklist_token"))
+            connection.execute(text("DROP INDEX IF EXISTS ix_token_blacklist_token"))
+            connection.execute(text("ALTER TABLE token_blacklist DROP COLUMN IF EXISTS token"))
+            
+            connection.commit()
+            
+            print("✓ jti_digest column added")
+            print("✓ Old token column and indexes removed")
+            print("\nTable columns:")
+            print("  • id (SERIAL) - Primary key")
+            print("  • jti_digest (BYTEA) - SHA-256 of the token's jti")
+            print("  • blacklisted_at (TIMESTAMP) - When token was revoked")
+            print("  • expires_at (TIMESTAMP) - When token naturally expires")
+            print("="*60 + "\n")
+            
+    except Exception as e:
+        print(f"✗ Error converting token blacklist: {str(e)}")
+        raise
+
+def downgrade(engine):
+    """
+    DOWNGRADE = Restore the token column
+    
+    WARNING: Digests cannot be turned back into tokens!
+    All current revocations are removed.
+    """
+    print("\n" + "="*60)
+    print("MIGRATION 004: Rolling Back - Restoring Token Column")
+    print("="*60)
+    print("⚠️  WARNING: This will REMOVE all blacklisted token records!\n")
+    
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("DELETE FROM token_blacklist"))
+            connection.execute(text("""
+                ALTER TABLE token_blacklist
+                ADD COLUMN IF NOT EXISTS token VARCHAR(500) UNIQUE
+            """))
+            connection.execute(text("""
+                CREATE INDEX IF NOT EXISTS idx_token_blacklist_token ON token_blacklist(token)
+            """))
+            connection.execute(text("ALTER TABLE token_blacklist DROP COLUMN IF EXISTS jti_digest"))
+            connection.commit()
+            
+            print("✓ token column restored")
+            print("✓ jti_digest column removed")
+            print("="*60 + "\n")
+            
+    except Exception as e:
+        print(f"✗ Error restoring token column: {str(e)}")
+        raise
@@ -4,6 +4,8 @@ Migrations package for users module
 Migration files:
 - 001_create_users_table.py
 - 002_add_timestamps.py
+- 003_create_token_blacklist.py
+- 004_token_blacklist_jti_digest.py
 
 Usage:
     from src.users.migrations.runner import MigrationRunner
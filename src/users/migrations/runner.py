@@ -26,6 +26,8 @@ class MigrationRunner:
         This runs:
         1. Migration 001: Create users table
         2. Migration 002: Add timestamps
+        3. Migration 003: Create token blacklist
+        4. Migration 004: Key token blacklist on jti digests
         
         Safe to run multiple times!
         """
@@ -49,6 +51,7 @@ class MigrationRunner:
                 ("001", "001_create_users_table.py"),
                 ("002", "002_add_timestamps.py"),
                 ("003", "003_create_token_blacklist.py"),
+                ("004", "004_token_blacklist_jti_digest.py"),
             ]
             
             for migration_num, filename in migration_files:
@@ -160,6 +163,7 @@ class MigrationRunner:
         
         try:
             migration_files = [
+                ("004", "004_token_blacklist_jti_digest.py"),
                 ("003", "003_create_token_blacklist.py"),
                 ("002", "002_add_timestamps.py"),
                 ("001", "001_create_users_table.py"),
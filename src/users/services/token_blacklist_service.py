@@ -5,18 +5,36 @@ Handles token revocation and validation
 """
 
 from datetime import datetime, timedelta
+from typing import Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text, select, delete
+import asyncio
+import os
 from src.users.token_blacklist_model import TokenBlacklist
 from src.users.core.jwt_token import decode_token
+from src.users.services.token_revocation_cache import revocation_cache, token_digest
 
-def blacklist_token(token: str, db: Session) -> bool:
+# Maximum rows removed by one DELETE when purging expired tokens
+TOKEN_BLACKLIST_SWEEP_BATCH_SIZE = int(os.getenv("TOKEN_BLACKLIST_SWEEP_BATCH_SIZE", 1000))
+
+# Run statistics of the background sweeper, updated by token_blacklist_sweeper
+sweeper_stats = {
+    "runs": 0,
+    "deleted_total": 0,
+    "last_deleted": 0,
+    "last_run_at": None,
+    "last_duration_ms": None,
+    "last_error": None
+}
+
+async def blacklist_token(token: str, db: AsyncSession) -> bool:
     """
     Add a token to the blacklist (revoke it)
     
     Args:
         token: JWT token to blacklist
-        db: Database session
+        db: Async database session
         
     Returns:
         True if successful, False otherwise
@@ -32,44 +50,79 @@ def blacklist_token(token: str, db: Session) -> bool:
         if not exp:
             return False
         
-        expires_at = datetime.fromtimestamp(exp)
+        # Stored as naive UTC, like every other timestamp in the schema
+        expires_at = datetime.utcfromtimestamp(exp)
         
         # Create blacklist entry
+        digest = token_digest(token, payload)
         blacklisted = TokenBlacklist(
-            token=token,
+            jti_digest=digest,
             expires_at=expires_at
         )
         
         db.add(blacklisted)
-        db.commit()
+        await db.commit()
+        
+        revocation_cache.add(digest, exp)
         
         return True
     except Exception as e:
+        await db.rollback()
         print(f"Error blacklisting token: {str(e)}")
         return False
 
-def is_token_blacklisted(token: str, db: Session) -> bool:
+async def is_token_blacklisted(token: str, db: AsyncSession, payload: Optional[dict] = None) -> bool:
     """
     Check if a token is blacklisted
     
+    Answered from the in-process revocation cache once it is loaded,
+    falling back to the database until then
+    
     Args:
         token: JWT token to check
-        db: Database session
+        db: Async database session
+        payload: Decoded claims of the token (decoded here if not given)
         
     Returns:
         True if token is blacklisted, False otherwise
     """
+    if payload is None:
+        payload = decode_token(token)
+    digest = token_digest(token, payload)
+    
+    if revocation_cache.loaded:
+        return revocation_cache.contains(digest)
+    
     try:
-        blacklisted = db.query(TokenBlacklist).filter(
-            TokenBlacklist.token == token
-        ).first()
+        result = await db.execute(
+            select(TokenBlacklist.id).where(TokenBlacklist.jti_digest == digest).limit(1)
+        )
         
-        return blacklisted is not None
+        return result.first() is not None
     except Exception as e:
         print(f"Error checking token blacklist: {str(e)}")
         return False
 
-def cleanup_expired_tokens(db: Session) -> int:
+def _expired_tokens_batch(now: datetime, batch_size: int):
+    """
+    DELETE statement for one batch of expired tokens
+    
+    Picks the oldest rows through the expires_at index so each batch only
+    locks a bounded number of rows.
+    """
+    expired_ids = (
+        select(TokenBlacklist.id)
+        .where(TokenBlacklist.expires_at < now)
+        .order_by(TokenBlacklist.expires_at)
+        .limit(batch_size)
+    )
+    return (
+        delete(TokenBlacklist)
+        .where(TokenBlacklist.id.in_(expired_ids))
+        .execution_options(synchronize_session=False)
+    )
+
+def cleanup_expired_tokens(db: Session, batch_size: int = TOKEN_BLACKLIST_SWEEP_BATCH_SIZE) -> int:
     """
     Delete expired tokens from blacklist
     
@@ -78,22 +131,50 @@ def cleanup_expired_tokens(db: Session) -> int:
     
     Args:
         db: Database session
+        batch_size: Maximum rows deleted per statement
         
     Returns:
         Number of tokens deleted
     """
+    deleted = 0
     try:
-        # Delete tokens that have expired
-        result = db.query(TokenBlacklist).filter(
-            TokenBlacklist.expires_at < datetime.utcnow()
-        ).delete()
-        
-        db.commit()
+        now = datetime.utcnow()
+        while True:
+            # Delete tokens that have expired, one bounded batch per commit
+            result = db.execute(_expired_tokens_batch(now, batch_size))
+            db.commit()
+            deleted += result.rowcount
+            if result.rowcount < batch_size:
+                break
         
-        return result
+        return deleted
     except Exception as e:
+        db.rollback()
         print(f"Error cleaning up expired tokens: {str(e)}")
-        return 0
+        return deleted
+
+async def sweep_expired_tokens(db: AsyncSession, batch_size: int = TOKEN_BLACKLIST_SWEEP_BATCH_SIZE) -> int:
+    """
+    Async version of cleanup_expired_tokens used by the background sweeper
+    
+    Yields to the event loop between batches.
+    
+    Args:
+        db: Async database session
+        batch_size: Maximum rows deleted per statement
+        
+    Returns:
+        Number of tokens deleted
+    """
+    deleted = 0
+    now = datetime.utcnow()
+    while True:
+        result = await db.execute(_expired_tokens_batch(now, batch_size))
+        await db.commit()
+        deleted += result.rowcount
+        if result.rowcount < batch_size:
+            return deleted
+        await asyncio.sleep(0)
 
 def get_blacklist_stats(db: Session) -> dict:
     """
@@ -115,7 +196,8 @@ def get_blacklist_stats(db: Session) -> dict:
         return {
             "total_blacklisted": total_blacklisted,
             "active_blacklisted": active,
-            "expired": expired
+            "expired": expired,
+            "sweeper": dict(sweeper_stats)
         }
     except Exception as e:
         print(f"Error getting blacklist stats: {str(e)}")
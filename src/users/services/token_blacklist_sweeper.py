@@ -0,0 +1,65 @@
+"""
+Token Blacklist Sweeper
+
+Background task that purges expired rows from token_blacklist in bounded batches
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime
+from typing import Optional
+from src.config.db import AsyncSessionLocal
+from src.users.services.token_blacklist_service import sweep_expired_tokens, sweeper_stats
+
+# Seconds between sweeps
+TOKEN_BLACKLIST_SWEEP_SECONDS = float(os.getenv("TOKEN_BLACKLIST_SWEEP_SECONDS", 600))
+
+_sweeper_task: Optional[asyncio.Task] = None
+
+async def run_sweep() -> int:
+    """
+    Run one sweep and record its statistics
+    
+    Returns:
+        Number of tokens deleted
+    """
+    started = time.perf_counter()
+    sweeper_stats["last_run_at"] = datetime.utcnow().isoformat()
+    try:
+        async with AsyncSessionLocal() as db:
+            deleted = await sweep_expired_tokens(db)
+        sweeper_stats["last_error"] = None
+    except Exception as e:
+        deleted = 0
+        sweeper_stats["last_error"] = str(e)
+        print(f"Error sweeping expired tokens: {str(e)}")
+    
+    sweeper_stats["runs"] += 1
+    sweeper_stats["last_deleted"] = deleted
+    sweeper_stats["deleted_total"] += deleted
+    sweeper_stats["last_duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return deleted
+
+async def _sweep_forever() -> None:
+    """Sweep on a fixed interval until cancelled"""
+    while True:
+        await run_sweep()
+        await asyncio.sleep(TOKEN_BLACKLIST_SWEEP_SECONDS)
+
+def start_blacklist_sweeper() -> None:
+    """Start the background sweeper"""
+    global _sweeper_task
+    if _sweeper_task is None:
+        _sweeper_task = asyncio.create_task(_sweep_forever())
+
+async def stop_blacklist_sweeper() -> None:
+    """Stop the background sweeper"""
+    global _sweeper_task
+    if _sweeper_task is not None:
+        _sweeper_task.cancel()
+        try:
+            await _sweeper_task
+        except asyncio.CancelledError:
+            pass
+        _sweeper_task = None
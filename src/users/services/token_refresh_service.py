@@ -4,7 +4,7 @@ Token Refresh Service
 Handles token refresh with automatic rotation and blacklisting
 """
 
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.users.core.jwt_token import (
     create_access_token,
     create_refresh_token,
@@ -14,7 +14,7 @@ from src.users.core.jwt_token import (
 from src.users.services.token_blacklist_service import blacklist_token
 from fastapi import HTTPException
 
-def refresh_access_token(refresh_token: str, db: Session) -> dict:
+async def refresh_access_token(refresh_token: str, db: AsyncSession) -> dict:
     """
     Refresh access token using refresh token
     
@@ -27,7 +27,7 @@ def refresh_access_token(refresh_token: str, db: Session) -> dict:
     
     Args:
         refresh_token: Current refresh token
-        db: Database session
+        db: Async database session
         
     Returns:
         Dictionary with new access_token and refresh_token
@@ -37,7 +37,7 @@ def refresh_access_token(refresh_token: str, db: Session) -> dict:
     """
     
     # Step 1: Verify refresh token
-    payload = verify_token(refresh_token, db)
+    payload = await verify_token(refresh_token, db)
     if not payload:
         raise HTTPException(
             status_code=401,
@@ -62,7 +62,7 @@ def refresh_access_token(refresh_token: str, db: Session) -> dict:
     
     # Step 2: Blacklist old refresh token (rotation)
     try:
-        blacklist_token(refresh_token, db)
+        await blacklist_token(refresh_token, db)
     except Exception as e:
         print(f"Warning: Could not blacklist old refresh token: {str(e)}")
         # Don't fail the refresh, just log the warning
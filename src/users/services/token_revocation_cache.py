@@ -0,0 +1,177 @@
+"""
+Token Revocation Cache
+
+Per-process set of revoked token digests so that authenticated requests
+can check revocation without a database round-trip
+
+A revocation is seen at once by the worker that wrote it; other workers
+pick it up on their next sync, so for up to TOKEN_REVOCATION_SYNC_SECONDS
+(default 5) they still accept the revoked token. Set it to 0 to skip the
+cache and check the token_blacklist table on every request instead.
+"""
+
+import asyncio
+import hashlib
+import heapq
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.config.db import AsyncSessionLocal
+from src.users.token_blacklist_model import TokenBlacklist
+
+# How often revocations written by other workers are pulled from the table (0 disables the cache)
+TOKEN_REVOCATION_SYNC_SECONDS = float(os.getenv("TOKEN_REVOCATION_SYNC_SECONDS", 5))
+# Overlap between sync windows so rows committed out of order are not missed
+TOKEN_REVOCATION_SYNC_OVERLAP = timedelta(seconds=30)
+
+def token_digest(token: str, payload: Optional[dict] = None) -> bytes:
+    """
+    Fixed-width key used to revoke a token
+
+    Keyed on the jti claim; tokens issued before jti was added fall back to
+    a digest of the raw token string.
+
+    Args:
+        token: Encoded JWT
+        payload: Decoded claims of the token, if already available
+    """
+    jti = payload.get("jti") if payload else None
+    if jti:
+        return hashlib.sha256(f"jti:{jti}".encode("utf-8")).digest()
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+class TokenRevocationCache:
+    """
+    Hash set of revoked token digests with expiry-based eviction
+
+    Entries are dropped once the token expires, because an expired token is
+    rejected by JWT validation anyway.
+    """
+
+    def __init__(self):
+        self._entries: Dict[bytes, float] = {}
+        self._expiry_heap: List[Tuple[float, bytes]] = []
+        self._last_synced_at: Optional[datetime] = None
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, digest: bytes, expires_at: float) -> None:
+        """
+        Mark a token digest as revoked
+
+        Args:
+            digest: Token digest from token_digest()
+            expires_at: Unix timestamp when the token expires
+        """
+        if expires_at <= time.time():
+            return
+        self._entries[digest] = expires_at
+        heapq.heappush(self._expiry_heap, (expires_at, digest))
+
+    def contains(self, digest: bytes) -> bool:
+        """Check if a token digest is revoked and not yet expired"""
+        expires_at = self._entries.get(digest)
+        return expires_at is not None and expires_at > time.time()
+
+    def evict_expired(self) -> int:
+        """
+        Drop entries whose tokens have expired
+
+        Returns:
+            Number of entries removed
+        """
+        now = time.time()
+        removed = 0
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            expires_at, digest = heapq.heappop(self._expiry_heap)
+            if self._entries.get(digest) == expires_at:
+                del self._entries[digest]
+                removed += 1
+        return removed
+
+    async def sync(self, db: AsyncSession) -> int:
+        """
+        Load revocations from the token_blacklist table
+
+        The first call loads every unexpired row; later calls only fetch rows
+        blacklisted since the previous sync (with a small overlap).
+
+        Args:
+            db: Async database session
+
+        Returns:
+            Number of rows read
+        """
+        started_at = datetime.utcnow()
+        query = select(TokenBlacklist.jti_digest, TokenBlacklist.expires_at).where(
+            TokenBlacklist.expires_at > started_at
+        )
+        if self._last_synced_at is not None:
+            query = query.where(
+                TokenBlacklist.blacklisted_at >= self._last_synced_at - TOKEN_REVOCATION_SYNC_OVERLAP
+            )
+
+        result = await db.execute(query)
+        rows = result.all()
+        for digest, expires_at in rows:
+            # expires_at is naive UTC; a bare .timestamp() would read it as local time
+            self.add(bytes(digest), expires_at.replace(tzinfo=timezone.utc).timestamp())
+
+        self.evict_expired()
+        self._last_synced_at = started_at
+        self.loaded = True
+        return len(rows)
+
+    def stats(self) -> dict:
+        """Size and freshness of the cache"""
+        return {
+            "loaded": self.loaded,
+            "entries": len(self._entries),
+            "last_synced_at": self._last_synced_at.isoformat() if self._last_synced_at else None
+        }
+
+# Process-wide cache shared by the blacklist service
+revocation_cache = TokenRevocationCache()
+
+_sync_task: Optional[asyncio.Task] = None
+
+async def _sync_forever() -> None:
+    """Periodically pull revocations written by other workers"""
+    while True:
+        await asyncio.sleep(TOKEN_REVOCATION_SYNC_SECONDS)
+        try:
+            async with AsyncSessionLocal() as db:
+                await revocation_cache.sync(db)
+        except Exception as e:
+            print(f"Error syncing token revocation cache: {str(e)}")
+
+async def start_revocation_cache() -> None:
+    """Seed the cache from the table and start the background sync"""
+    global _sync_task
+    if TOKEN_REVOCATION_SYNC_SECONDS <= 0:
+        # Never loaded: every revocation check goes to the database
+        return
+    try:
+        async with AsyncSessionLocal() as db:
+            await revocation_cache.sync(db)
+    except Exception as e:
+        # Until the cache is loaded, revocation checks fall back to the database
+        print(f"Error seeding token revocation cache: {str(e)}")
+    if _sync_task is None:
+        _sync_task = asyncio.create_task(_sync_forever())
+
+async def stop_revocation_cache() -> None:
+    """Stop the background sync"""
+    global _sync_task
+    if _sync_task is not None:
+        _sync_task.cancel()
+        try:
+            await _sync_task
+        except asyncio.CancelledError:
+            pass
+        _sync_task = None
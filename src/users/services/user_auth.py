@@ -1,22 +1,24 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 from typing import Dict
 
 from src.users.user_model import User
 from src.users.user_schema import UserCreate, UserLogin, UserResponse
-from src.users.core.user_password_hash import get_password_hash, verify_password
+from src.users.core.user_password_hash import hash_password_async, verify_password_async
 from src.users.core.jwt_token import create_access_token, create_refresh_token
 
-def sign_up(user_data: UserCreate, db: Session) -> Dict:
+async def sign_up(user_data: UserCreate, db: AsyncSession) -> Dict:
     """Create a new user account and return tokens"""
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    result = await db.execute(select(User).where(User.email == user_data.email))
+    existing_user = result.scalars().first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await hash_password_async(user_data.password)
     new_user = User(
         name=user_data.name,
         email=user_data.email,
@@ -25,8 +27,8 @@ def sign_up(user_data: UserCreate, db: Session) -> Dict:
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     
     access_token = create_access_token(data={"sub": str(new_user.user_id)})
     refresh_token = create_refresh_token(data={"sub": str(new_user.user_id)})
@@ -43,21 +45,28 @@ def sign_up(user_data: UserCreate, db: Session) -> Dict:
         "token_type": "bearer"
     }
 
-def sign_in(login_data: UserLogin, db: Session) -> Dict:
+async def sign_in(login_data: UserLogin, db: AsyncSession) -> Dict:
     """Authenticate user and return tokens"""
-    user = db.query(User).filter(User.email == login_data.email).first()
+    result = await db.execute(select(User).where(User.email == login_data.email))
+    user = result.scalars().first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
         )
     
-    if not verify_password(login_data.password, user.password):
+    is_valid, new_hash = await verify_password_async(login_data.password, user.password)
+    if not is_valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
         )
     
+    # Upgrade hashes made with an outdated bcrypt cost factor
+    if new_hash:
+        user.password = new_hash
+        await db.commit()
+    
     access_token = create_access_token(data={"sub": str(user.user_id)})
     refresh_token = create_refresh_token(data={"sub": str(user.user_id)})
     
@@ -2,9 +2,12 @@
 Token Blacklist Model
 
 Stores revoked/blacklisted tokens to prevent their use after logout
+
+Tokens are keyed by a SHA-256 digest of their jti claim (or of the raw token
+for tokens issued before jti was added), never by the token string itself.
 """
 
-from sqlalchemy import Column, String, DateTime, Integer
+from sqlalchemy import Column, DateTime, Integer, LargeBinary, Index
 from datetime import datetime
 from src.config.db import Base
 
@@ -12,9 +15,14 @@ class TokenBlacklist(Base):
     __tablename__ = "token_blacklist"
     
     id = Column(Integer, primary_key=True, index=True)
-    token = Column(String(500), unique=True, nullable=False, index=True)
+    jti_digest = Column(LargeBinary(32), unique=True, nullable=False)
     blacklisted_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     expires_at = Column(DateTime, nullable=False)
     
+    __table_args__ = (
+        # Same name as migration 003, used by the expired-token sweeper
+        Index("idx_token_blacklist_expires_at", "expires_at"),
+    )
+    
     def __repr__(self):
         return f"<TokenBlacklist token_id={self.id} expires_at={self.expires_at}>"
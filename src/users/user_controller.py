@@ -6,7 +6,7 @@ import uuid
 from src.config.db import get_db
 from src.users.user_model import User
 from src.users.user_schema import UserCreate, UserResponse
-from src.users.core.user_password_hash import get_password_hash
+from src.users.core.user_password_hash import hash_password_async
 
 class UserController:
     @staticmethod
@@ -21,7 +21,7 @@ class UserController:
             )
         
         # Create new user
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await hash_password_async(user_data.password)
         db_user = User(
             user_id=uuid.uuid4(),
             name=user_data.name,
@@ -78,7 +78,7 @@ class UserController:
         user.name = user_data.name
         user.email = user_data.email
         if user_data.password:
-            user.password = get_password_hash(user_data.password)
+            user.password = await hash_password_async(user_data.password)
         if user_data.age is not None:
             user.age = user_data.age
         
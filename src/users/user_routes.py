@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends, status, Request, Header, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
-from src.config.db import get_db
+from src.config.db import get_async_db
 from src.users.user_controller import UserController
 from src.users.user_schema import UserCreate, UserResponse, UserLogin, AuthResponse, LogoutResponse, RefreshResponse
 from src.users.services.user_auth import sign_up, sign_in
@@ -15,27 +15,27 @@ router = APIRouter(prefix="/api/v1/users", tags=["users"])
 
 @router.post("/signup", response_model=AuthResponse, status_code=status.HTTP_201_CREATED)
 @limiter.limit(SIGNUP_RATE_LIMIT)
-async def signup(request: Request, user_data: UserCreate, db: Session = Depends(get_db)):
+async def signup(request: Request, user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Create a new user account
     
     Rate Limited: 3 attempts per minute per IP
     """
-    return sign_up(user_data, db)
+    return await sign_up(user_data, db)
 
 @router.post("/signin", response_model=AuthResponse, status_code=status.HTTP_200_OK)
 @limiter.limit(SIGNIN_RATE_LIMIT)
-async def signin(request: Request, login_data: UserLogin, db: Session = Depends(get_db)):
+async def signin(request: Request, login_data: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """
     Authenticate user
     
     Rate Limited: 5 attempts per minute per IP
     Protects against brute-force attacks
     """
-    return sign_in(login_data, db)
+    return await sign_in(login_data, db)
 
 @router.post("/logout", response_model=LogoutResponse, status_code=status.HTTP_200_OK)
-async def logout(authorization: str = Header(None), db: Session = Depends(get_db)):
+async def logout(authorization: str = Header(None), db: AsyncSession = Depends(get_async_db)):
     """
     Logout user by revoking their token
     
@@ -65,7 +65,7 @@ async def logout(authorization: str = Header(None), db: Session = Depends(get_db
         )
     
     # Blacklist the token
-    success = blacklist_token(token, db)
+    success = await blacklist_token(token, db)
     
     if not success:
         raise HTTPException(
@@ -79,7 +79,7 @@ async def logout(authorization: str = Header(None), db: Session = Depends(get_db
     }
 
 @router.post("/refresh", response_model=RefreshResponse, status_code=status.HTTP_200_OK)
-async def refresh(authorization: str = Header(None), db: Session = Depends(get_db)):
+async def refresh(authorization: str = Header(None), db: AsyncSession = Depends(get_async_db)):
     """
     Refresh access token using refresh token
     
@@ -118,4 +118,4 @@ async def refresh(authorization: str = Header(None), db: Session = Depends(get_d
         )
     
     # Refresh the token (handles rotation and blacklisting)
-    return refresh_access_token(token, db)
+    return await refresh_access_token(token, db)
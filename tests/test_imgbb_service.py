@@ -0,0 +1,167 @@
+"""
+ImgBB uploads against a local stand-in for the ImgBB API
+
+The stand-in is a small ASGI app served by uvicorn on 127.0.0.1, so the
+shared client opens real TCP connections and the tests can see how many
+it uses and how many uploads are in flight at once.
+"""
+
+import asyncio
+import io
+import socket
+import threading
+import time
+import pytest
+import uvicorn
+from starlette.applications import Starlette
+from starlette.datastructures import Headers
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from fastapi import UploadFile
+from src.images import image_controller, imgbb_service
+from src.images.image_controller import ImageController
+from src.images.imgbb_service import ImgBBService
+
+class FakeImgBB:
+    """Stand-in for the ImgBB upload endpoint that records what it sees"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.connections = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.uploads = []
+
+    async def upload(self, request: Request) -> JSONResponse:
+        self.connections.add(request.client)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            form = await request.form()
+            image = form["image"]
+            name = image.filename if hasattr(image, "filename") else form.get("name")
+            await asyncio.sleep(self.delay)
+            if form.get("key") != "test-key":
+                return JSONResponse({"success": False, "error": {"message": "Invalid API key"}}, status_code=400)
+            if name and name.startswith("broken"):
+                return JSONResponse({"success": False, "error": {"message": "Invalid image"}}, status_code=400)
+            self.uploads.append(name)
+            return JSONResponse({
+                "success": True,
+                "data": {
+                    "id": f"id-{name}",
+                    "url": f"https://i.ibb.co/{name}",
+                    "display_url": f"https://i.ibb.co/{name}",
+                    "delete_url": f"https://ibb.co/{name}/delete",
+                    "size": 3,
+                    "image": {"filename": name, "mime": "image/png"}
+                }
+            })
+        finally:
+            self.in_flight -= 1
+
+@pytest.fixture
+def imgbb(monkeypatch):
+    """FakeImgBB served on a free local port, with ImgBBService pointed at it"""
+    fake = FakeImgBB(delay=0.05)
+    app = Starlette(routes=[Route("/1/upload", fake.upload, methods=["POST"])])
+
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, log_level="warning", lifespan="off"))
+    thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    monkeypatch.setenv("IMAGE_API_KEY", "test-key")
+    monkeypatch.setattr(ImgBBService, "BASE_URL", f"http://127.0.0.1:{port}/1/upload")
+    yield fake
+
+    server.should_exit = True
+    thread.join(timeout=10)
+    sock.close()
+
+def upload_file(name: str, content: bytes = b"png") -> UploadFile:
+    return UploadFile(
+        io.BytesIO(content),
+        size=len(content),
+        filename=name,
+        headers=Headers({"content-type": "image/png"})
+    )
+
+def run_with_client(coroutine_function):
+    """Run coroutine_function with the shared ImgBB client started, as the lifespan does"""
+    async def main():
+        await imgbb_service.start_imgbb_client()
+        try:
+            return await coroutine_function()
+        finally:
+            await imgbb_service.close_imgbb_client()
+    return asyncio.run(main())
+
+def test_uploads_reuse_one_connection(imgbb):
+    async def upload_several():
+        for n in range(5):
+            # A new service per request, as the routes get one, still shares the pooled client
+            service = imgbb_service.get_imgbb_service()
+            data = await service.upload_image(b"png", f"image-{n}.png", content_type="image/png")
+            assert data["id"] == f"id-image-{n}.png"
+
+    run_with_client(upload_several)
+
+    assert len(imgbb.uploads) == 5
+    assert len(imgbb.connections) == 1
+
+def test_upload_images_caps_concurrency(imgbb, monkeypatch):
+    saved = []
+    monkeypatch.setattr(image_controller, "_save_images", lambda db, images, transaction_id=None: saved.extend(images))
+
+    files = [upload_file(f"image-{n}.png") for n in range(10)]
+    images, errors = run_with_client(lambda: ImageController.upload_images(files, concurrency=3))
+
+    assert errors == []
+    assert sorted(image.image_id for image in images) == sorted(f"id-image-{n}.png" for n in range(10))
+    assert saved == images
+    assert imgbb.max_in_flight == 3
+    # Uploads in flight at once share the pool instead of each opening a fresh connection per file
+    assert len(imgbb.connections) <= 3
+
+def test_upload_images_reports_failures_per_file(imgbb, monkeypatch):
+    saved = []
+    monkeypatch.setattr(image_controller, "_save_images", lambda db, images, transaction_id=None: saved.extend(images))
+
+    files = [upload_file("first.png"), upload_file("broken.png"), upload_file("last.png")]
+    images, errors = run_with_client(lambda: ImageController.upload_images(files))
+
+    assert [image.filename for image in images] == ["first.png", "last.png"]
+    assert saved == images
+    assert len(errors) == 1
+    assert errors[0]["filename"] == "broken.png"
+    assert "Failed to upload image to ImgBB" in errors[0]["error"]
+
+def test_upload_images_reports_failed_save_for_every_uploaded_file(imgbb, monkeypatch):
+    def fail_save(db, images, transaction_id=None):
+        raise RuntimeError("database is down")
+    monkeypatch.setattr(image_controller, "_save_images", fail_save)
+
+    files = [upload_file("first.png"), upload_file("broken.png")]
+    images, errors = run_with_client(lambda: ImageController.upload_images(files))
+
+    assert images == []
+    assert {error["filename"] for error in errors} == {"first.png", "broken.png"}
+    assert any(error["error"] == "Failed to save image: database is down" for error in errors)
+
+def test_upload_images_reports_a_missing_client_per_file():
+    files = [upload_file("first.png"), upload_file("second.png")]
+    # No lifespan: the shared client was never started
+    images, errors = asyncio.run(ImageController.upload_images(files))
+
+    assert images == []
+    assert errors == [
+        {"filename": "first.png", "error": "ImgBB client is not started"},
+        {"filename": "second.png", "error": "ImgBB client is not started"},
+    ]
@@ -0,0 +1,31 @@
+"""
+Pooled password hashing and its health counters
+"""
+
+import asyncio
+import pytest
+from src.users.core import user_password_hash
+from src.users.core.user_password_hash import get_password_hash_stats, hash_password_async, verify_password_async
+
+def broken_hash(password, rounds):
+    raise ValueError("bcrypt backend unavailable")
+
+def test_stats_count_successes_and_failures_apart(monkeypatch):
+    monkeypatch.setattr(user_password_hash, "BCRYPT_ROUNDS", 4)
+    monkeypatch.setitem(user_password_hash._stats, "rounds", 4)
+    before = get_password_hash_stats()
+
+    async def run():
+        hashed = await hash_password_async("Secret123")
+        assert (await verify_password_async("Secret123", hashed))[0]
+        assert not (await verify_password_async("Wrong1234", hashed))[0]
+        monkeypatch.setattr(user_password_hash, "_hash_in_worker", broken_hash)
+        with pytest.raises(ValueError):
+            await hash_password_async("Secret123")
+
+    asyncio.run(run())
+    after = get_password_hash_stats()
+    # The correct password also rehashes: 4 rounds is below the configured cost
+    assert after["completed"] - before["completed"] == 4
+    assert after["failed"] - before["failed"] == 1
+    assert after["in_flight"] == 0
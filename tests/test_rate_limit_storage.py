@@ -0,0 +1,66 @@
+"""
+mmap rate limit storage shared by forked workers
+"""
+
+import asyncio
+import fcntl
+import multiprocessing
+import threading
+from src.config.rate_limit_storage import MMapStorage
+
+def _hit(storage, done):
+    asyncio.run(storage.acquire("login:1.2.3.4", 60, 5))
+    done.set()
+
+def test_forked_worker_waits_for_the_parents_lock(tmp_path):
+    storage = MMapStorage(str(tmp_path / "ratelimit"), slots=64)
+    # Opened in the parent before the fork, as when the app is imported by a preloading master
+    asyncio.run(storage.acquire("login:1.2.3.4", 60, 5))
+
+    context = multiprocessing.get_context("fork")
+    done = context.Event()
+    fcntl.flock(storage._fd, fcntl.LOCK_EX)
+    try:
+        worker = context.Process(target=_hit, args=(storage, done))
+        worker.start()
+        # A shared open file description would let the child through at once
+        assert not done.wait(0.5)
+    finally:
+        fcntl.flock(storage._fd, fcntl.LOCK_UN)
+    assert done.wait(5)
+    worker.join(5)
+    assert worker.exitcode == 0
+
+    # Both processes counted against the same table
+    assert asyncio.run(storage.acquire("login:1.2.3.4", 60, 1)) > 0
+
+def test_waiting_for_the_lock_does_not_block_the_event_loop(tmp_path):
+    path = str(tmp_path / "ratelimit")
+    storage = MMapStorage(path, slots=64)
+    asyncio.run(storage.reset())
+
+    async def run():
+        # Another worker holds the table for 0.2 s
+        with open(path, "rb") as other:
+            fcntl.flock(other, fcntl.LOCK_EX)
+            # Released from a thread, so a blocked event loop cannot hold it up
+            release = threading.Timer(0.2, fcntl.flock, (other, fcntl.LOCK_UN))
+            release.start()
+
+            ticks = 0
+
+            async def tick():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0.01)
+
+            ticker = asyncio.create_task(tick())
+            retry_after = await storage.acquire("login:1.2.3.4", 60, 5)
+            ticker.cancel()
+            release.join()
+            return retry_after, ticks
+
+    retry_after, ticks = asyncio.run(run())
+    assert retry_after == 0
+    assert ticks >= 10
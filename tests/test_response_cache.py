@@ -0,0 +1,78 @@
+"""
+Cached item and image lists must reflect a write committed by another
+worker, whose invalidation never reaches this worker's memory cache;
+and the memory backend must never evict pinned entries.
+"""
+
+import asyncio
+import json
+import pytest
+from src.config.cache import CacheBackend, MemoryCache, response_cache
+from src.images.image_model import Image
+from src.transaction_items.transaction_items_controller import TransactionItemController
+from src.transaction_items.transaction_items_schema import TransactionItemUpdate
+from src.transactions.collection_version import bump_version_for_transaction
+
+def create_transaction(client, items: int) -> str:
+    response = client.post("/api/v1/transactions/", data={
+        "name": "Groceries",
+        "amount": "10",
+        "category": "food",
+        "items": json.dumps([{"name": f"Item {i}", "amount": 2.5, "quantity": 1} for i in range(items)])
+    })
+    assert response.status_code == 201
+    return response.json()
+
+def test_items_cache_sees_writes_from_other_workers(client, db, monkeypatch):
+    transaction = create_transaction(client, items=2)
+    transaction_id = transaction["transaction_id"]
+
+    first = client.get("/api/v1/transaction_items/", params={"transaction_id": transaction_id})
+    assert {item["amount"] for item in first.json()} == {2.5}
+
+    # Written by another worker: this worker's cache is not invalidated
+    monkeypatch.setattr(response_cache, "invalidate_nowait", lambda *scopes: None)
+    item_id = transaction["items"][0]["transaction_item_id"]
+    TransactionItemController.update_transaction_item(item_id, TransactionItemUpdate(amount=7.5), db)
+
+    second = client.get("/api/v1/transaction_items/", params={"transaction_id": transaction_id})
+    assert sorted(item["amount"] for item in second.json()) == [2.5, 7.5]
+
+def test_images_cache_sees_writes_from_other_workers(client, db):
+    transaction_id = create_transaction(client, items=0)["transaction_id"]
+
+    first = client.get(f"/api/v1/images/transaction/{transaction_id}")
+    assert first.json() == []
+
+    # Committed elsewhere, with no invalidation at all
+    db.add(Image(image_id="elsewhere", url="https://i.ibb.co/x.png", transaction_id=transaction_id))
+    bump_version_for_transaction(db, transaction_id)
+    db.commit()
+
+    second = client.get(f"/api/v1/images/transaction/{transaction_id}")
+    assert [image["image_id"] for image in second.json()] == ["elsewhere"]
+
+def test_pinned_entries_survive_lru_eviction():
+    async def run():
+        cache = MemoryCache(max_entries=2)
+        assert await cache.add("idempotency:u", "claim", {"state": "running"}, pin=True)
+        for n in range(5):
+            await cache.set("other", n, n)
+        assert await cache.get("idempotency:u", "claim") == {"state": "running"}
+        assert cache.stats()["entries"] == 2
+
+        # Replacing the claim with the finished response unpins it
+        await cache.set("idempotency:u", "claim", {"state": "done"})
+        for n in range(5, 7):
+            await cache.set("other", n, n)
+        assert await cache.get("idempotency:u", "claim") is None
+
+    asyncio.run(run())
+
+def test_incomplete_backends_cannot_be_created():
+    class LookupOnly(CacheBackend):
+        async def _lookup(self, scope, key):
+            return None, None
+
+    with pytest.raises(TypeError, match="abstract"):
+        LookupOnly()
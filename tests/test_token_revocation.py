@@ -0,0 +1,67 @@
+"""
+Revoked tokens stay revoked whatever the server's local time zone is
+"""
+
+import time
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import select
+from src.config.db import AsyncSessionLocal
+from src.users.core.jwt_token import create_access_token, decode_token
+from src.users.services.token_blacklist_service import blacklist_token, cleanup_expired_tokens, is_token_blacklisted
+from src.users.services.token_revocation_cache import TokenRevocationCache, token_digest
+from src.users.token_blacklist_model import TokenBlacklist
+
+@pytest.fixture(params=["Etc/GMT+5", "Etc/GMT-9"])
+def local_time_zone(request, monkeypatch):
+    """Run with the process clock in a zone west or east of UTC"""
+    monkeypatch.setenv("TZ", request.param)
+    time.tzset()
+    yield request.param
+    monkeypatch.undo()
+    time.tzset()
+
+async def revoke(token: str) -> bool:
+    async with AsyncSessionLocal() as db:
+        return await blacklist_token(token, db)
+
+async def fresh_cache() -> TokenRevocationCache:
+    cache = TokenRevocationCache()
+    async with AsyncSessionLocal() as db:
+        await cache.sync(db)
+    return cache
+
+def test_revocation_survives_the_sweep_and_reaches_other_workers(client, db, local_time_zone):
+    token = create_access_token({"sub": "someone"}, expires_delta=timedelta(hours=1))
+    payload = decode_token(token)
+    digest = token_digest(token, payload)
+
+    assert client.portal.call(revoke, token)
+    row = db.scalar(select(TokenBlacklist).where(TokenBlacklist.jti_digest == digest))
+    assert abs(row.expires_at - (datetime.utcnow() + timedelta(hours=1))) < timedelta(seconds=5)
+
+    cleanup_expired_tokens(db)
+    assert db.scalar(select(TokenBlacklist.id).where(TokenBlacklist.jti_digest == digest)) is not None
+
+    # Another worker's cache, loaded from the table
+    cache = client.portal.call(fresh_cache)
+    assert cache.contains(digest)
+    assert abs(cache._entries[digest] - payload["exp"]) < 1
+
+async def check_from_table(token: str) -> bool:
+    async with AsyncSessionLocal() as db:
+        return await is_token_blacklisted(token, db)
+
+def test_disabled_cache_checks_the_table(client, monkeypatch):
+    from src.users.services import token_revocation_cache
+    from src.users.services.token_revocation_cache import revocation_cache
+
+    monkeypatch.setattr(token_revocation_cache, "TOKEN_REVOCATION_SYNC_SECONDS", 0)
+    monkeypatch.setattr(revocation_cache, "loaded", False)
+    client.portal.call(token_revocation_cache.start_revocation_cache)
+    assert not revocation_cache.loaded
+
+    token = create_access_token({"sub": "someone"})
+    assert not client.portal.call(check_from_table, token)
+    assert client.portal.call(revoke, token)
+    assert client.portal.call(check_from_table, token)
@@ -0,0 +1,103 @@
+"""
+Bulk import: chunked loading, per-line errors, and a body that fails
+while it is still being read.
+"""
+
+import io
+import json
+import pytest
+from sqlalchemy import select, func
+from src.transactions import transaction_import
+from src.transactions.transaction_import import import_transactions
+from src.transactions.transaction_model import Transaction
+from src.transaction_items.transaction_items_model import TransactionItem
+
+CSV_HEADER = "name,amount,category,occurred_at,item_name,item_amount,item_quantity,transaction_id\n"
+
+def count_rows(db, user_id):
+    transactions = db.scalar(select(func.count()).select_from(Transaction).where(Transaction.user_id == user_id))
+    items = db.scalar(
+        select(func.count()).select_from(TransactionItem).join(Transaction).where(Transaction.user_id == user_id)
+    )
+    return transactions, items
+
+def test_csv_import_groups_items_and_reports_bad_lines(client, db, user_id, monkeypatch):
+    monkeypatch.setattr(transaction_import, "IMPORT_CHUNK_SIZE", 2)
+    body = CSV_HEADER + (
+        "Groceries,30,food,2024-03-01T10:00:00Z,Milk,1.5,2,a\n"
+        "Groceries,30,food,2024-03-01T10:00:00Z,Bread,3,1,a\n"
+        "Broken,not-a-number,food,,,,,\n"
+        "Bus,3,travel,2024-03-02T08:00:00,,,,\n"
+        "Tab\tand \\ backslash,4,misc,2024-03-02T09:00:00,\"Line\nbreak\",1,1,b\n"
+    )
+
+    response = client.post("/api/v1/transactions/import", params={"format": "csv"}, content=body.encode())
+
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["imported"], report["items"], report["failed"]) == (3, 3, 1)
+    assert [error["line"] for error in report["errors"]] == [4]
+    assert count_rows(db, user_id) == (3, 3)
+    names = set(db.scalars(select(Transaction.name).where(Transaction.user_id == user_id)))
+    assert "Tab\tand \\ backslash" in names
+    assert "Line\nbreak" in set(db.scalars(select(TransactionItem.name).join(Transaction).where(Transaction.user_id == user_id)))
+
+    summary = client.get("/api/v1/transactions/summary", params={"from": "2024-03-01", "to": "2024-03-31"}).json()
+    assert summary["total_amount"] == 37 and summary["transaction_count"] == 3
+    food = next(category for category in summary["categories"] if category["category"] == "food")
+    assert food["item_total"] == 6.0 and food["item_count"] == 2
+
+def test_csv_import_reads_spreadsheet_exports(client, db, user_id):
+    # Byte order mark and CRLF line ends, as written by spreadsheet programs
+    body = "\ufeff" + (CSV_HEADER + "Rent,900,home,2024-03-01T00:00:00Z,,,,\nCoffee,3,food,,\"Flat\nwhite\",3,1,\n").replace("\n", "\r\n")
+
+    response = client.post("/api/v1/transactions/import", params={"format": "csv"}, content=body.encode())
+
+    report = response.json()
+    assert (report["imported"], report["items"], report["failed"]) == (2, 1, 0), report
+    assert set(db.scalars(select(Transaction.name).where(Transaction.user_id == user_id))) == {"Rent", "Coffee"}
+    assert list(db.scalars(select(TransactionItem.name).join(Transaction).where(Transaction.user_id == user_id))) == ["Flat\r\nwhite"]
+
+def test_ndjson_import_spans_chunks(client, db, user_id, monkeypatch):
+    monkeypatch.setattr(transaction_import, "IMPORT_CHUNK_SIZE", 10)
+    lines = [
+        json.dumps({"name": f"T{n}", "amount": n, "category": "food", "items": [{"name": "x", "amount": 1, "quantity": 1}]})
+        for n in range(35)
+    ]
+    lines.insert(12, "{not json")
+
+    response = client.post("/api/v1/transactions/import", params={"format": "ndjson"}, content="\n".join(lines).encode())
+
+    report = response.json()
+    assert (report["imported"], report["items"], report["failed"]) == (35, 35, 1)
+    assert report["errors"][0]["line"] == 13
+    assert count_rows(db, user_id) == (35, 35)
+
+class FailingBody(io.RawIOBase):
+    """Body that breaks after some bytes, like a client that disconnects"""
+
+    def __init__(self, data: bytes, fail_after: int):
+        self._data = io.BytesIO(data)
+        self._fail_after = fail_after
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self._data.tell() >= self._fail_after:
+            raise ConnectionResetError("client went away")
+        chunk = self._data.read(min(len(buffer), self._fail_after - self._data.tell()))
+        buffer[:len(chunk)] = chunk
+        return len(chunk)
+
+def test_body_failure_keeps_committed_chunks_and_drops_the_partial_one(db, user_id, monkeypatch):
+    monkeypatch.setattr(transaction_import, "IMPORT_CHUNK_SIZE", 10)
+    lines = [json.dumps({"name": f"T{n}", "amount": n, "category": "food"}) + "\n" for n in range(30)]
+    data = "".join(lines).encode()
+    # Fails in the middle of the third chunk
+    fail_after = len("".join(lines[:25]).encode()) + 5
+
+    with pytest.raises(ConnectionResetError):
+        import_transactions(io.BufferedReader(FailingBody(data, fail_after), buffer_size=64), "ndjson", user_id)
+
+    assert count_rows(db, user_id) == (20, 0)
@@ -0,0 +1,90 @@
+"""
+Listing transactions must cost a fixed number of queries, however many
+transactions (with items and images) are returned.
+"""
+
+import json
+import pytest
+from src.images.image_model import Image
+from src.transactions import transaction_controller
+from src.transactions.transaction_bulk import bulk_insert_transactions
+from src.transactions.transaction_controller import TransactionController
+from src.transactions.transaction_schema import TransactionCreate
+
+def add_transactions(db, user_id, count, items=2, images=1):
+    transaction_ids = bulk_insert_transactions(db, user_id, [
+        TransactionCreate(
+            name=f"Transaction {n}",
+            amount=n,
+            category="groceries",
+            items=[{"name": f"Item {i}", "amount": 1.5, "quantity": 2} for i in range(items)]
+        )
+        for n in range(count)
+    ])
+    db.add_all(
+        Image(image_id=f"img-{transaction_id}-{i}", url="https://i.ibb.co/x.png", transaction_id=transaction_id)
+        for transaction_id in transaction_ids
+        for i in range(images)
+    )
+    db.commit()
+    return transaction_ids
+
+@pytest.mark.parametrize("count", [1, 10, 50])
+def test_list_endpoint_query_count_is_constant(client, db, user_id, count_statements, count):
+    add_transactions(db, user_id, count)
+
+    count_statements.clear()
+    response = client.get("/api/v1/transactions/", params={"limit": 100})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body) == count
+    assert all(len(t["items"]) == 2 and len(t["images"]) == 1 for t in body)
+    # Collection version, transaction page, items, images
+    assert len(count_statements) == 4, count_statements.statements
+
+@pytest.mark.parametrize("strategy", ["selectin", "joined"])
+@pytest.mark.parametrize("count", [1, 25])
+def test_orm_list_query_count_is_constant(db, user_id, count_statements, monkeypatch, strategy, count):
+    monkeypatch.setattr(transaction_controller, "TRANSACTION_RELATIONSHIP_LOADING", strategy)
+    add_transactions(db, user_id, count)
+    db.expire_all()
+
+    count_statements.clear()
+    transactions, _ = TransactionController.get_transactions(user_id, db, limit=100)
+    # Touch the relationships the response serializes
+    assert sum(len(t.items) + len(t.images) for t in transactions) == count * 3
+    assert len(count_statements) == (1 if strategy == "joined" else 3), count_statements.statements
+
+@pytest.mark.parametrize("items", [0, 5, 50])
+def test_create_query_count_is_constant(client, count_statements, items):
+    count_statements.clear()
+    response = client.post("/api/v1/transactions/", data={
+        "name": "Coffee",
+        "amount": "4",
+        "category": "food",
+        "items": json.dumps([{"name": "Cup", "amount": 4.0, "quantity": 1}] * items)
+    })
+
+    assert response.status_code == 201
+    assert len(response.json()["items"]) == items
+    # Transaction, items (when any), rollup, collection version
+    assert len(count_statements) == (4 if items else 3), count_statements.statements
+
+def test_only_search_reads_search_vectors(client, db, user_id, count_statements):
+    add_transactions(db, user_id, 3)
+    db.expire_all()
+
+    count_statements.clear()
+    transactions, _ = TransactionController.get_transactions(user_id, db, limit=100)
+    assert all(t.items for t in transactions)
+    client.get("/api/v1/transactions/")
+    client.post("/api/v1/transactions/", data={
+        "name": "Coffee",
+        "amount": "4",
+        "category": "food",
+        "items": json.dumps([{"name": "Cup", "amount": 4.0, "quantity": 1}])
+    })
+
+    assert count_statements.statements
+    assert not [s for s in count_statements.statements if "search_vector" in s]
@@ -0,0 +1,103 @@
+"""
+Listing and counting a user's transactions must be served from the
+(user_id, occurred_at, transaction_id) index: a range scan in index order,
+with no Sort, however deep the page.
+"""
+
+import json
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import select, func
+from sqlalchemy.dialects import postgresql
+from src.transactions.transaction_bulk import bulk_insert_transactions
+from src.transactions.transaction_controller import _transactions_page_query
+from src.transactions.transaction_model import Transaction
+from src.transactions.transaction_rows import transaction_rows_query
+from src.transactions.transaction_schema import TransactionCreate
+from src.users.user_model import User
+
+INDEX = "ix_transactions_user_id_occurred_at"
+USERS = 40
+TRANSACTIONS_PER_USER = 500
+START = datetime(2024, 1, 1)
+
+@pytest.fixture(scope="module")
+def populated(database):
+    """Transactions of many users spread over a year, with fresh statistics"""
+    from src.config.db import SessionLocal, engine
+
+    db = SessionLocal()
+    try:
+        user_ids = [uuid.uuid4() for _ in range(USERS)]
+        db.add_all(User(user_id=u, name="Plan", email=f"{u}@example.com", password="x") for u in user_ids)
+        db.commit()
+        for user_id in user_ids:
+            bulk_insert_transactions(db, user_id, [
+                TransactionCreate(
+                    name=f"Transaction {n}",
+                    amount=n + 1,
+                    category="groceries",
+                    occurred_at=START + timedelta(hours=17 * n)
+                )
+                for n in range(TRANSACTIONS_PER_USER)
+            ])
+        db.commit()
+    finally:
+        db.close()
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.exec_driver_sql("VACUUM ANALYZE transactions")
+    return user_ids[0]
+
+def explain(query) -> dict:
+    """EXPLAIN a Core query and return its root plan node"""
+    from src.config.db import engine
+
+    compiled = query.compile(dialect=postgresql.dialect())
+    params = {k: str(v) if isinstance(v, uuid.UUID) else v for k, v in compiled.params.items()}
+    with engine.connect() as connection:
+        result = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", params).scalar()
+    return result[0]["Plan"]
+
+def plan_nodes(plan: dict) -> list:
+    nodes = [plan]
+    for child in plan.get("Plans", []):
+        nodes.extend(plan_nodes(child))
+    return nodes
+
+def assert_index_range_scan(plan: dict, node_types=("Index Scan", "Index Scan Backward", "Index Only Scan")) -> None:
+    nodes = plan_nodes(plan)
+    assert not any(node["Node Type"] in ("Sort", "Incremental Sort", "Seq Scan") for node in nodes), json.dumps(plan, indent=1)
+    scans = [node for node in nodes if node.get("Index Name") == INDEX]
+    assert scans and all(node["Node Type"] in node_types for node in scans), json.dumps(plan, indent=1)
+
+@pytest.mark.parametrize("filtered", [False, True])
+def test_first_page_uses_keyset_index(populated, filtered):
+    query = _transactions_page_query(
+        populated, 50, None,
+        occurred_from=START + timedelta(days=30) if filtered else None,
+        occurred_to=START + timedelta(days=200) if filtered else None,
+        base=transaction_rows_query()
+    )
+    assert_index_range_scan(explain(query))
+
+def test_deep_page_uses_keyset_index(populated):
+    from src.transactions.transaction_cursor import encode_cursor
+
+    # Hundreds of older rows remain past the cursor, so sorting them would not be free
+    cursor = encode_cursor({"t": (START + timedelta(days=300)).isoformat(), "id": str(uuid.uuid4())})
+    query = _transactions_page_query(populated, 50, cursor, base=transaction_rows_query())
+    assert_index_range_scan(explain(query))
+
+def test_range_count_is_index_only(populated):
+    query = (
+        select(func.count())
+        .select_from(Transaction)
+        .where(
+            Transaction.user_id == populated,
+            Transaction.occurred_at >= START + timedelta(days=30),
+            Transaction.occurred_at < START + timedelta(days=200)
+        )
+    )
+    assert_index_range_scan(explain(query), node_types=("Index Only Scan",))
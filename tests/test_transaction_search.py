@@ -0,0 +1,44 @@
+"""
+Search endpoint, on both the validated and the fast serialization path
+"""
+
+import json
+import pytest
+from sqlalchemy import func, literal, select
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from src.config import idempotency, serialization
+from src.transactions import transaction_controller
+from src.transactions.transaction_model import Transaction
+
+def full_text_search_query(user_id, query, limit, offset):
+    """_search_query without the pg_trgm typo matching"""
+    ts_query = func.websearch_to_tsquery(literal("simple").cast(REGCONFIG), query)
+    rank = func.ts_rank(Transaction.search_vector, ts_query).label("rank")
+    return (
+        select(Transaction.transaction_id, rank)
+        .where(Transaction.user_id == user_id, Transaction.search_vector.op("@@")(ts_query))
+        .order_by(rank.desc(), Transaction.transaction_id)
+        .limit(limit)
+        .offset(offset)
+    )
+
+@pytest.mark.parametrize("fast", [False, True])
+def test_search_returns_transactions_with_items(client, database, monkeypatch, fast):
+    monkeypatch.setattr(serialization, "FAST_JSON_RESPONSES", fast)
+    monkeypatch.setattr(idempotency, "FAST_JSON_RESPONSES", fast)
+    if not database:
+        monkeypatch.setattr(transaction_controller, "_search_query", full_text_search_query)
+
+    created = client.post("/api/v1/transactions/", data={
+        "name": "Weekly groceries",
+        "amount": "30",
+        "category": "food",
+        "items": json.dumps([{"name": "Milk", "amount": 1.5, "quantity": 2}])
+    })
+    assert created.status_code == 201
+    client.post("/api/v1/transactions/", data={"name": "Bus ticket", "amount": "3", "category": "travel"})
+
+    response = client.get("/api/v1/transactions/search", params={"q": "groceries"})
+
+    assert response.status_code == 200
+    assert response.json() == [created.json()]
@@ -0,0 +1,56 @@
+"""
+Upload quotas only count uploads that were accepted
+"""
+
+import pytest
+from src.config.rate_limit import limiter, parse_rate
+from src.images import upload_quota
+from src.images.upload_stream import UploadSizeLimitMiddleware, UPLOAD_PATHS
+
+# Multipart transaction without files: charged one upload, never reaches ImgBB
+FORM = {"name": (None, "Coffee"), "amount": (None, "4"), "category": (None, "food")}
+
+@pytest.fixture
+def quota(client, monkeypatch):
+    """Two uploads per hour, starting from a clean limiter"""
+    monkeypatch.setattr(upload_quota, "UPLOAD_COUNT_LIMIT", parse_rate("2/hour"))
+    client.portal.call(limiter.storage.reset)
+    yield
+    client.portal.call(limiter.storage.reset)
+
+def upload_size_limit(app) -> UploadSizeLimitMiddleware:
+    """The UploadSizeLimitMiddleware guarding the upload paths"""
+    layer = app.middleware_stack
+    while not (isinstance(layer, UploadSizeLimitMiddleware) and layer.paths == UPLOAD_PATHS):
+        layer = layer.app
+    return layer
+
+def test_idempotent_replays_are_not_charged(client, quota):
+    headers = {"Idempotency-Key": "coffee-1"}
+    for _ in range(3):
+        assert client.post("/api/v1/transactions/", files=FORM, headers=headers).status_code == 201
+
+    assert client.post("/api/v1/transactions/", files=FORM).status_code == 201
+    assert client.post("/api/v1/transactions/", files=FORM).status_code == 429
+
+@pytest.mark.parametrize("chunked", [False, True])
+def test_oversized_bodies_are_not_charged(client, app, quota, monkeypatch, chunked):
+    monkeypatch.setattr(upload_size_limit(app), "max_body_bytes", 1024)
+    form = {**FORM, "note": (None, "x" * 4096)}
+    if chunked:
+        body = client.build_request("POST", "/", files=form)
+        content_type = body.headers["content-type"]
+        payload = body.read()
+        response = client.post(
+            "/api/v1/transactions/",
+            content=(payload[i:i + 512] for i in range(0, len(payload), 512)),
+            headers={"content-type": content_type}
+        )
+    else:
+        response = client.post("/api/v1/transactions/", files=form)
+    assert response.status_code == 413
+
+    monkeypatch.setattr(upload_size_limit(app), "max_body_bytes", 1024 * 1024)
+    assert client.post("/api/v1/transactions/", files=FORM).status_code == 201
+    assert client.post("/api/v1/transactions/", files=FORM).status_code == 201
+    assert client.post("/api/v1/transactions/", files=FORM).status_code == 429
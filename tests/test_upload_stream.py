@@ -0,0 +1,50 @@
+"""
+Multipart spooling is configured on upload routes only
+"""
+
+from fastapi import APIRouter, FastAPI, File, Form, UploadFile
+from fastapi.testclient import TestClient
+from starlette.formparsers import MultiPartParser
+from src.images import upload_stream
+from src.images.upload_stream import UploadRoute
+
+def build_app(route_class=None) -> FastAPI:
+    router = APIRouter(route_class=route_class) if route_class else APIRouter()
+
+    @router.post("/upload")
+    async def upload(file: UploadFile = File(...), note: str = Form("")):
+        return {"on_disk": file.file._rolled, "size": len(await file.read()), "note": note}
+
+    app = FastAPI()
+    app.include_router(router)
+    return app
+
+def test_upload_route_spools_at_the_configured_threshold(monkeypatch):
+    monkeypatch.setattr(upload_stream.SpoolingMultiPartParser, "max_file_size", 1024)
+    client = TestClient(build_app(UploadRoute))
+
+    small = client.post("/upload", files={"file": ("a.png", b"x" * 512)}, data={"note": "hi"})
+    large = client.post("/upload", files={"file": ("b.png", b"x" * 4096)})
+
+    assert small.json() == {"on_disk": False, "size": 512, "note": "hi"}
+    assert large.json() == {"on_disk": True, "size": 4096, "note": ""}
+
+def test_other_routes_keep_starlettes_parser(monkeypatch):
+    monkeypatch.setattr(upload_stream.SpoolingMultiPartParser, "max_file_size", 1024)
+    client = TestClient(build_app())
+
+    response = client.post("/upload", files={"file": ("b.png", b"x" * 4096)})
+
+    assert MultiPartParser.max_file_size == 1024 * 1024
+    assert response.json()["on_disk"] is False
+
+def test_malformed_multipart_is_a_400():
+    client = TestClient(build_app(UploadRoute))
+
+    response = client.post(
+        "/upload",
+        content=b"--x\r\nContent-Disposition: form-data; name=\"file\"; filename=\"a.png\"\r\n\r\nabc\r\n--x--\r\n",
+        headers={"content-type": "multipart/form-data"}
+    )
+
+    assert response.status_code == 400